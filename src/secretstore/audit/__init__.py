@@ -0,0 +1,5 @@
+from secretstore.audit.dao import AuditDAO
+from secretstore.audit.entity import AuditEvent
+from secretstore.audit.manager import AuditManager
+
+__all__ = ["AuditDAO", "AuditEvent", "AuditManager"]
@@ -0,0 +1,106 @@
+from typing import TYPE_CHECKING
+
+from secretstore.audit.entity import AuditEvent
+from secretstore.utils import Singleton, transaction
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+_TABLE_NAME = "audit_log"
+_TABLE = f"""create table if not exists
+ {_TABLE_NAME}(
+    timestamp real,
+    fingerprint text,
+    store_name text,
+    action text
+)"""
+_INDEXES = (
+    f"create index if not exists {_TABLE_NAME}_timestamp on {_TABLE_NAME}(timestamp)",
+    f"create index if not exists {_TABLE_NAME}_store on {_TABLE_NAME}(store_name, timestamp)",
+    f"create index if not exists {_TABLE_NAME}_fingerprint on {_TABLE_NAME}(fingerprint, timestamp)",
+)
+
+
+class AuditDAO(metaclass=Singleton):
+    """Data Access Object for the audit log. The log is local, it is neither synced nor backed up."""
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the DAO and create the table and its indexes if they don't exist
+
+        :param connection: The sqlite connection to use
+        """
+        self._connection = connection
+        self._connection.execute(_TABLE)
+        for index in _INDEXES:
+            self._connection.execute(index)
+
+    def save_many(self, events: list[AuditEvent], wait: bool = True):
+        """
+        Save events in a single transaction
+
+        :param events: The events to save
+        :param wait: Wait for the database lock like the other writes.
+            If False, raise sqlite3.OperationalError at once when the database is locked
+        """
+        if wait or self._connection.in_transaction:
+            self._save_many(events)
+            return
+
+        (timeout,) = self._connection.execute("pragma busy_timeout").fetchone()
+        self._connection.execute("pragma busy_timeout=0")
+        try:
+            self._save_many(events)
+        finally:
+            self._connection.execute(f"pragma busy_timeout={timeout}")
+
+    def _save_many(self, events: list[AuditEvent]):
+        with transaction(self._connection) as conn:
+            conn.executemany(
+                f"insert into {_TABLE_NAME} values (?,?,?,?)",
+                [(e.timestamp, e.fingerprint, e.store_name, e.action) for e in events],
+            )
+
+    def find(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        store_name: str | None = None,
+        fingerprint: str | None = None,
+        action: str | None = None,
+        limit: int | None = None,
+    ) -> list[AuditEvent]:
+        """
+        Find the events matching all the set filters, oldest first
+
+        :param since: The minimum timestamp, included
+        :param until: The maximum timestamp, excluded
+        :param store_name: The store name
+        :param fingerprint: The identity fingerprint
+        :param action: The action
+        :param limit: The maximum number of events, the most recent ones
+        :return: The events
+        """
+        conditions = []
+        params: list = []
+        for condition, value in (
+            ("timestamp >= ?", since),
+            ("timestamp < ?", until),
+            ("store_name = ?", store_name),
+            ("fingerprint = ?", fingerprint),
+            ("action = ?", action),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+
+        query = f"select timestamp, fingerprint, store_name, action from {_TABLE_NAME}"
+        if conditions:
+            query += " where " + " and ".join(conditions)
+        query += " order by timestamp desc"
+        if limit is not None:
+            query += " limit ?"
+            params.append(limit)
+
+        rows = self._connection.execute(query, params).fetchall()
+        return [AuditEvent(*row) for row in reversed(rows)]
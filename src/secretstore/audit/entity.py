@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class AuditEvent:
+    """
+    AuditEvent dataclass. An access to a store.
+    Fields:
+        - timestamp: The time of the access, in seconds since the epoch
+        - fingerprint: The identity which opened the store key. For a deletion, the first identity of the ssh agent.
+            None if there was none
+        - store_name: The store name
+        - action: create, read, update, share or delete
+    """
+
+    timestamp: float
+    fingerprint: str | None
+    store_name: str
+    action: str
@@ -0,0 +1,117 @@
+import logging
+import sqlite3
+import time
+from typing import TYPE_CHECKING
+
+from secretstore.audit.dao import AuditDAO
+from secretstore.audit.entity import AuditEvent
+from secretstore.exceptions import AuditEventsNotWritten
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+
+class AuditManager:
+    """
+    Audit Manager. Records which identity accessed which store and when.
+    Events are queued in memory and written in batches, in a single transaction, when MAX_PENDING events are queued,
+    when the oldest one waited FLUSH_INTERVAL seconds or when the manager is closed.
+    Recording an event is only an append, so reads don't pay an insert and a commit each.
+    The flush runs in the thread recording, since the sqlite connection belongs to it.
+    A batch flush doesn't wait for the database lock: events not written stay queued for the next flush.
+    Once MAX_QUEUED events are queued, the flush waits for the lock like the other writes,
+    and the operation recorded fails if they still can't be written. No event is ever dropped.
+    Nothing is written inside an open transaction, the events would be lost if it rolled back.
+    """
+
+    MAX_PENDING = 256
+    MAX_QUEUED = 4096
+    FLUSH_INTERVAL = 1.0
+
+    CREATE = "create"
+    READ = "read"
+    UPDATE = "update"
+    SHARE = "share"
+    DELETE = "delete"
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the Manager. The owner closes it to write the pending events
+
+        :param connection: The sqlite connection to use
+        """
+        self._connection = connection
+        self._dao = AuditDAO(connection)
+        self._pending: list[AuditEvent] = []
+
+    def record(self, action: str, store_name: str, fingerprint: str | None):
+        """
+        Queue an event, and flush the queue if it is full or old enough.
+        Raise AuditEventsNotWritten if MAX_QUEUED events are queued and can't be written
+
+        :param action: CREATE, READ, UPDATE, SHARE or DELETE
+        :param store_name: The store accessed
+        :param fingerprint: The identity accessing the store
+        """
+        now = time.time()
+        self._pending.append(AuditEvent(now, fingerprint, store_name, action))
+        if len(self._pending) >= AuditManager.MAX_QUEUED:
+            self.flush()
+        elif (
+            len(self._pending) >= AuditManager.MAX_PENDING
+            or now - self._pending[0].timestamp >= AuditManager.FLUSH_INTERVAL
+        ):
+            try:
+                self.flush(wait=False)
+            except AuditEventsNotWritten as e:
+                logging.debug(e)
+
+    def flush(self, wait: bool = True):
+        """
+        Write the pending events in a single transaction. They are removed from the queue once committed.
+        Inside an open transaction nothing is written, the next flush outside of it writes them.
+        Raise AuditEventsNotWritten if the write fails, the events stay pending
+
+        :param wait: Wait for the database lock like the other writes. If False, fail at once when the database is locked
+        """
+        if not self._pending or self._connection.in_transaction:
+            return
+        try:
+            self._dao.save_many(self._pending, wait)
+        except sqlite3.Error as e:
+            raise AuditEventsNotWritten(len(self._pending), e) from e
+        self._pending = []
+
+    def close(self):
+        """
+        Write the pending events, waiting for the database lock.
+        Raise AuditEventsNotWritten if they can't be written or a transaction is still open, the events stay pending
+        """
+        self.flush()
+        if self._pending:
+            raise AuditEventsNotWritten(
+                len(self._pending), "a transaction is still open"
+            )
+
+    def find_events(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        store_name: str | None = None,
+        fingerprint: str | None = None,
+        action: str | None = None,
+        limit: int | None = None,
+    ) -> list[AuditEvent]:
+        """
+        Find the recorded events matching all the set filters, oldest first. Pending events are flushed first
+
+        :param since: The minimum timestamp, included
+        :param until: The maximum timestamp, excluded
+        :param store_name: The store name
+        :param fingerprint: The identity fingerprint
+        :param action: The action
+        :param limit: The maximum number of events, the most recent ones
+        :return: The events
+        """
+        self.flush()
+        return self._dao.find(since, until, store_name, fingerprint, action, limit)
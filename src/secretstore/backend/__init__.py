@@ -0,0 +1,6 @@
+from secretstore.backend.base import Backend
+from secretstore.backend.kv import KVBackend
+from secretstore.backend.memory import MemoryBackend
+from secretstore.backend.sqlite import SQLiteBackend
+
+__all__ = ["Backend", "KVBackend", "MemoryBackend", "SQLiteBackend"]
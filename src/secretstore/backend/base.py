@@ -0,0 +1,53 @@
+from abc import ABC
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Generator
+
+if TYPE_CHECKING:
+    from secretstore.guardian import AbstractGuardianDAO
+    from secretstore.identity import AbstractIdentityDAO
+    from secretstore.store import AbstractStoreDAO
+
+
+class Backend(ABC):
+    """
+    Storage backend of the stores, guardians and identities.
+    Each backend provides its own implementation of the three DAOs.
+    """
+
+    store_dao: "AbstractStoreDAO"
+    guardian_dao: "AbstractGuardianDAO"
+    identity_dao: "AbstractIdentityDAO"
+    _in_transaction = False
+
+    @contextmanager
+    def transaction(self) -> Generator[None, None, None]:
+        """
+        Open a unit of work: the writes made in the block are applied at its end, or undone on error.
+        If a unit of work is already open, the block joins it and the outermost block applies the writes.
+        """
+        if self._in_transaction:
+            yield
+            return
+
+        self._begin()
+        self._in_transaction = True
+        try:
+            yield
+        except BaseException:
+            self._in_transaction = False
+            self._rollback()
+            raise
+        self._in_transaction = False
+        self._commit()
+
+    def _begin(self):
+        """Start a unit of work"""
+
+    def _commit(self):
+        """Apply the writes of the unit of work"""
+
+    def _rollback(self):
+        """Undo the writes of the unit of work"""
+
+    def close(self):
+        """Release the resources held by the backend"""
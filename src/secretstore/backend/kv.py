@@ -0,0 +1,320 @@
+import dbm
+import struct
+from typing import TYPE_CHECKING
+
+from secretstore.backend.base import Backend
+from secretstore.exceptions import AlreadyExists
+from secretstore.guardian import AbstractGuardianDAO
+from secretstore.guardian.entity import Guardian
+from secretstore.identity import AbstractIdentityDAO
+from secretstore.identity.entity import RawIdentity
+from secretstore.store import AbstractStoreDAO, EncryptedStore
+
+if TYPE_CHECKING:
+    from secretstore.identity.entity import PrivateIdentity
+    from secretstore.store import Store
+
+_LENGTH = struct.Struct(">I")
+
+# Key prefixes. A record key is its prefix followed by the packed record id
+_STORE = b"s"
+_STORES = b"S"
+_GUARDIAN = b"g"
+_STORE_GUARDIANS = b"G"
+_IDENTITY_GUARDIANS = b"h"
+_IDENTITY = b"i"
+_IDENTITIES = b"I"
+
+
+def _pack(*fields: bytes) -> bytes:
+    """Pack length prefixed fields"""
+    return b"".join(_LENGTH.pack(len(field)) + field for field in fields)
+
+
+def _unpack(data: bytes) -> list[bytes]:
+    """Unpack fields packed by _pack"""
+    fields = []
+    offset = 0
+    while offset < len(data):
+        (size,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        fields.append(data[offset : offset + size])
+        offset += size
+    return fields
+
+
+class _KeyValue:
+    """
+    Thin layer over a dbm database, with sets of names kept as a single record.
+    Lookups are a single read. Sets are rewritten on each change, writes pay for the reads.
+    During a unit of work the writes are buffered, None marking a deleted record, and read back from the buffer.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._pending: dict[bytes, bytes | None] | None = None
+
+    def _read(self, packed: bytes) -> bytes | None:
+        if self._pending is not None and packed in self._pending:
+            return self._pending[packed]
+        return self._db.get(packed)
+
+    def get(self, prefix: bytes, *key: str) -> list[bytes] | None:
+        value = self._read(prefix + _pack(*[k.encode() for k in key]))
+        if value is None:
+            return None
+        return _unpack(value)
+
+    def put(self, prefix: bytes, key: tuple[str, ...], *fields: bytes):
+        packed = prefix + _pack(*[k.encode() for k in key])
+        if self._pending is not None:
+            self._pending[packed] = _pack(*fields)
+        else:
+            self._db[packed] = _pack(*fields)
+
+    def delete(self, prefix: bytes, *key: str):
+        packed = prefix + _pack(*[k.encode() for k in key])
+        if self._pending is not None:
+            self._pending[packed] = None
+        elif packed in self._db:
+            del self._db[packed]
+
+    def contains(self, prefix: bytes, *key: str) -> bool:
+        return self._read(prefix + _pack(*[k.encode() for k in key])) is not None
+
+    def members(self, prefix: bytes, *key: str) -> list[str]:
+        return [field.decode() for field in self.get(prefix, *key) or []]
+
+    def add(self, prefix: bytes, key: tuple[str, ...], *names: str):
+        members = dict.fromkeys(self.members(prefix, *key))
+        members.update(dict.fromkeys(names))
+        self.put(prefix, key, *[name.encode() for name in members])
+
+    def discard(self, prefix: bytes, key: tuple[str, ...], *names: str):
+        members = [name for name in self.members(prefix, *key) if name not in names]
+        if members:
+            self.put(prefix, key, *[name.encode() for name in members])
+        else:
+            self.delete(prefix, *key)
+
+    def sync(self):
+        """Flush the writes to the disk, when the dbm implementation supports it. Deferred to the commit in a unit of work"""
+        if self._pending is None and hasattr(self._db, "sync"):
+            self._db.sync()
+
+    def begin(self):
+        self._pending = {}
+
+    def commit(self):
+        """Write the buffered records and flush them once"""
+        pending, self._pending = self._pending or {}, None
+        for packed, value in pending.items():
+            if value is not None:
+                self._db[packed] = value
+            elif packed in self._db:
+                del self._db[packed]
+        self.sync()
+
+    def rollback(self):
+        self._pending = None
+
+
+class KVStoreDAO(AbstractStoreDAO):
+    """Stores in the key-value database"""
+
+    def __init__(self, kv: _KeyValue):
+        self._kv = kv
+
+    def save(self, encrypted_store: EncryptedStore):
+        self._save(encrypted_store)
+        self._kv.sync()
+
+    def _save(self, encrypted_store: EncryptedStore):
+        if self._kv.contains(_STORE, encrypted_store.name):
+            raise AlreadyExists(encrypted_store.name)
+        self._put(encrypted_store)
+        self._kv.add(_STORES, (), encrypted_store.name)
+
+    def _put(self, encrypted_store: EncryptedStore):
+        self._kv.put(
+            _STORE,
+            (encrypted_store.name,),
+            encrypted_store.ciphertext,
+            encrypted_store.nonce,
+        )
+
+    def save_many(self, encrypted_stores: list[EncryptedStore]):
+        for encrypted_store in encrypted_stores:
+            self._save(encrypted_store)
+        self._kv.sync()
+
+    def find(self, name: str) -> EncryptedStore | None:
+        fields = self._kv.get(_STORE, name)
+        if fields is None:
+            return None
+        return EncryptedStore(name, *fields)
+
+    def find_nonces(self, names: list[str] | None = None) -> dict[str, bytes]:
+        if names is None:
+            names = self._kv.members(_STORES)
+        nonces = {}
+        for name in names:
+            fields = self._kv.get(_STORE, name)
+            if fields is not None:
+                nonces[name] = fields[1]
+        return nonces
+
+    def update(self, enc_store: EncryptedStore):
+        self.update_many([enc_store])
+
+    def update_many(self, enc_stores: list[EncryptedStore]):
+        for enc_store in enc_stores:
+            if self._kv.contains(_STORE, enc_store.name):
+                self._put(enc_store)
+        self._kv.sync()
+
+    def delete(self, store: "Store"):
+        self._kv.delete(_STORE, store.name)
+        self._kv.discard(_STORES, (), store.name)
+        self._kv.sync()
+
+
+class KVGuardianDAO(AbstractGuardianDAO):
+    """Guardians in the key-value database, indexed by store and by identity"""
+
+    def __init__(self, kv: _KeyValue):
+        self._kv = kv
+
+    def find(self, store_name: str, identity_fingerprint: str) -> Guardian | None:
+        fields = self._kv.get(_GUARDIAN, store_name, identity_fingerprint)
+        if fields is None:
+            return None
+        return Guardian(store_name, identity_fingerprint, *fields)
+
+    def save(self, guardian: Guardian):
+        self.save_many([guardian])
+
+    def save_many(self, guardians: list[Guardian]):
+        for guardian in guardians:
+            key = (guardian.store_name, guardian.identity_fingerprint)
+            if self._kv.contains(_GUARDIAN, *key):
+                raise AlreadyExists("/".join(key))
+            self._kv.put(_GUARDIAN, key, guardian.aead_enc, guardian.enc_key)
+            self._kv.add(
+                _STORE_GUARDIANS, (guardian.store_name,), guardian.identity_fingerprint
+            )
+            self._kv.add(
+                _IDENTITY_GUARDIANS,
+                (guardian.identity_fingerprint,),
+                guardian.store_name,
+            )
+        self._kv.sync()
+
+    def find_identity_guardians(self, identity_fingerprint: str) -> list[Guardian]:
+        guardians = []
+        for name in sorted(self._kv.members(_IDENTITY_GUARDIANS, identity_fingerprint)):
+            guardian = self.find(name, identity_fingerprint)
+            if guardian is not None:
+                guardians.append(guardian)
+        return guardians
+
+    def update_many(self, guardians: list[Guardian]):
+        for guardian in guardians:
+            key = (guardian.store_name, guardian.identity_fingerprint)
+            if self._kv.contains(_GUARDIAN, *key):
+                self._kv.put(_GUARDIAN, key, guardian.aead_enc, guardian.enc_key)
+        self._kv.sync()
+
+    def find_stores_names(self, fingerprints: list[str]) -> list[str]:
+        names = set()
+        for fingerprint in fingerprints:
+            names.update(self._kv.members(_IDENTITY_GUARDIANS, fingerprint))
+        return sorted(names)
+
+    def delete_store_guardians(self, store_name: str):
+        for fingerprint in self._kv.members(_STORE_GUARDIANS, store_name):
+            self._kv.delete(_GUARDIAN, store_name, fingerprint)
+            self._kv.discard(_IDENTITY_GUARDIANS, (fingerprint,), store_name)
+        self._kv.delete(_STORE_GUARDIANS, store_name)
+        self._kv.sync()
+
+
+class KVIdentityDAO(AbstractIdentityDAO):
+    """Identities in the key-value database"""
+
+    def __init__(self, kv: _KeyValue):
+        self._kv = kv
+
+    def get_identities(self) -> list[RawIdentity]:
+        return self.get_identities_by_fingerprints(self._kv.members(_IDENTITIES))
+
+    def get_identities_by_fingerprints(
+        self, fingerprints: list[str]
+    ) -> list[RawIdentity]:
+        identities = []
+        for fingerprint in dict.fromkeys(fingerprints):
+            keys = self.get_keys_by_fingerprint(fingerprint)
+            if keys is not None:
+                identities.append(RawIdentity(fingerprint, *keys))
+        return identities
+
+    def get_fingerprints(self, fingerprints: list[str] | None = None) -> list[str]:
+        if fingerprints is None:
+            return self._kv.members(_IDENTITIES)
+        return [
+            fingerprint
+            for fingerprint in dict.fromkeys(fingerprints)
+            if self._kv.contains(_IDENTITY, fingerprint)
+        ]
+
+    def get_keys_by_fingerprint(self, fingerprint: str) -> tuple[bytes, bytes] | None:
+        fields = self._kv.get(_IDENTITY, fingerprint)
+        if fields is None:
+            return None
+        public_key, private_key = fields
+        return public_key, private_key
+
+    def save_identity(self, identity: "PrivateIdentity"):
+        if self._kv.contains(_IDENTITY, identity.fingerprint):
+            raise AlreadyExists(identity.fingerprint)
+        self._kv.put(
+            _IDENTITY,
+            (identity.fingerprint,),
+            identity.get_bin_public_key(),
+            identity.get_bin_enc_priv_key(),
+        )
+        self._kv.add(_IDENTITIES, (), identity.fingerprint)
+        self._kv.sync()
+
+
+class KVBackend(Backend):
+    """
+    Backend storing everything in an embedded key-value database (dbm).
+    Every lookup by store name or fingerprint is a single hashed read, without any query to parse.
+    The key-value database has no transactions: the writes of a unit of work are buffered in memory
+    and written at its end, outside a unit of work each write is applied immediately.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open or create the database
+
+        :param path: The database path
+        """
+        self._db = dbm.open(path, "c")
+        self._kv = _KeyValue(self._db)
+        self.store_dao = KVStoreDAO(self._kv)
+        self.guardian_dao = KVGuardianDAO(self._kv)
+        self.identity_dao = KVIdentityDAO(self._kv)
+
+    def _begin(self):
+        self._kv.begin()
+
+    def _commit(self):
+        self._kv.commit()
+
+    def _rollback(self):
+        self._kv.rollback()
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,232 @@
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Hashable
+
+from secretstore.backend.base import Backend
+from secretstore.exceptions import AlreadyExists
+from secretstore.guardian import AbstractGuardianDAO
+from secretstore.guardian.entity import Guardian
+from secretstore.identity import AbstractIdentityDAO
+from secretstore.identity.entity import RawIdentity
+from secretstore.store import AbstractStoreDAO, EncryptedStore
+
+if TYPE_CHECKING:
+    from secretstore.identity.entity import PrivateIdentity
+    from secretstore.store import Store
+
+_MISSING = object()
+
+
+def _restore(mapping: dict, key: Hashable, value):
+    if value is _MISSING:
+        mapping.pop(key, None)
+    else:
+        mapping[key] = value
+
+
+class _Journal:
+    """
+    Undo log of the writes made during a unit of work, replayed backwards on rollback.
+    Outside a unit of work the writes are applied without being logged.
+    """
+
+    def __init__(self):
+        self._undo: list[Callable[[], None]] | None = None
+
+    def begin(self):
+        self._undo = []
+
+    def commit(self):
+        self._undo = None
+
+    def rollback(self):
+        undo, self._undo = self._undo or [], None
+        for f in reversed(undo):
+            f()
+
+    def set(self, mapping: dict, key: Hashable, value):
+        if self._undo is not None:
+            self._undo.append(
+                partial(_restore, mapping, key, mapping.get(key, _MISSING))
+            )
+        mapping[key] = value
+
+    def pop(self, mapping: dict, key: Hashable):
+        if key not in mapping:
+            return
+        if self._undo is not None:
+            self._undo.append(partial(_restore, mapping, key, mapping[key]))
+        del mapping[key]
+
+    def add(self, members: set, member: Hashable):
+        if member in members:
+            return
+        if self._undo is not None:
+            self._undo.append(partial(members.discard, member))
+        members.add(member)
+
+    def discard(self, members: set, member: Hashable):
+        if member not in members:
+            return
+        if self._undo is not None:
+            self._undo.append(partial(members.add, member))
+        members.discard(member)
+
+
+class MemoryStoreDAO(AbstractStoreDAO):
+    """Stores kept in a dict"""
+
+    def __init__(self, journal: _Journal):
+        self._journal = journal
+        self._stores: dict[str, EncryptedStore] = {}
+
+    def save(self, encrypted_store: EncryptedStore):
+        if encrypted_store.name in self._stores:
+            raise AlreadyExists(encrypted_store.name)
+        self._journal.set(self._stores, encrypted_store.name, encrypted_store)
+
+    def save_many(self, encrypted_stores: list[EncryptedStore]):
+        for encrypted_store in encrypted_stores:
+            self.save(encrypted_store)
+
+    def find(self, name: str) -> EncryptedStore | None:
+        return self._stores.get(name)
+
+    def find_nonces(self, names: list[str] | None = None) -> dict[str, bytes]:
+        if names is None:
+            names = list(self._stores)
+        return {
+            name: self._stores[name].nonce for name in names if name in self._stores
+        }
+
+    def update(self, enc_store: EncryptedStore):
+        if enc_store.name in self._stores:
+            self._journal.set(self._stores, enc_store.name, enc_store)
+
+    def update_many(self, enc_stores: list[EncryptedStore]):
+        for enc_store in enc_stores:
+            self.update(enc_store)
+
+    def delete(self, store: "Store"):
+        self._journal.pop(self._stores, store.name)
+
+
+class MemoryGuardianDAO(AbstractGuardianDAO):
+    """Guardians kept in a dict, with a per identity index"""
+
+    def __init__(self, journal: _Journal):
+        self._journal = journal
+        self._guardians: dict[tuple[str, str], Guardian] = {}
+        self._by_identity: dict[str, set[str]] = {}
+
+    def find(self, store_name: str, identity_fingerprint: str) -> Guardian | None:
+        return self._guardians.get((store_name, identity_fingerprint))
+
+    def save(self, guardian: Guardian):
+        key = (guardian.store_name, guardian.identity_fingerprint)
+        if key in self._guardians:
+            raise AlreadyExists(
+                f"{guardian.store_name}/{guardian.identity_fingerprint}"
+            )
+        self._journal.set(self._guardians, key, guardian)
+        self._journal.add(
+            self._by_identity.setdefault(guardian.identity_fingerprint, set()),
+            guardian.store_name,
+        )
+
+    def save_many(self, guardians: list[Guardian]):
+        for guardian in guardians:
+            self.save(guardian)
+
+    def find_identity_guardians(self, identity_fingerprint: str) -> list[Guardian]:
+        return [
+            self._guardians[(name, identity_fingerprint)]
+            for name in sorted(self._by_identity.get(identity_fingerprint, ()))
+        ]
+
+    def update_many(self, guardians: list[Guardian]):
+        for guardian in guardians:
+            key = (guardian.store_name, guardian.identity_fingerprint)
+            if key in self._guardians:
+                self._journal.set(self._guardians, key, guardian)
+
+    def find_stores_names(self, fingerprints: list[str]) -> list[str]:
+        names = set()
+        for fingerprint in fingerprints:
+            names.update(self._by_identity.get(fingerprint, ()))
+        return sorted(names)
+
+    def delete_store_guardians(self, store_name: str):
+        for name, fingerprint in [k for k in self._guardians if k[0] == store_name]:
+            self._journal.pop(self._guardians, (name, fingerprint))
+            self._journal.discard(self._by_identity[fingerprint], name)
+
+
+class MemoryIdentityDAO(AbstractIdentityDAO):
+    """Identities kept in a dict"""
+
+    def __init__(self, journal: _Journal):
+        self._journal = journal
+        self._identities: dict[str, RawIdentity] = {}
+
+    def get_identities(self) -> list[RawIdentity]:
+        return list(self._identities.values())
+
+    def get_identities_by_fingerprints(
+        self, fingerprints: list[str]
+    ) -> list[RawIdentity]:
+        return [
+            self._identities[fingerprint]
+            for fingerprint in dict.fromkeys(fingerprints)
+            if fingerprint in self._identities
+        ]
+
+    def get_fingerprints(self, fingerprints: list[str] | None = None) -> list[str]:
+        if fingerprints is None:
+            return list(self._identities)
+        return [
+            fingerprint
+            for fingerprint in dict.fromkeys(fingerprints)
+            if fingerprint in self._identities
+        ]
+
+    def get_keys_by_fingerprint(self, fingerprint: str) -> tuple[bytes, bytes] | None:
+        raw = self._identities.get(fingerprint)
+        if raw is None:
+            return None
+        return raw.public_key, raw.private_key
+
+    def save_identity(self, identity: "PrivateIdentity"):
+        if identity.fingerprint in self._identities:
+            raise AlreadyExists(identity.fingerprint)
+        self._journal.set(
+            self._identities,
+            identity.fingerprint,
+            RawIdentity(
+                identity.fingerprint,
+                identity.get_bin_public_key(),
+                identity.get_bin_enc_priv_key(),
+            ),
+        )
+
+
+class MemoryBackend(Backend):
+    """
+    Backend keeping everything in memory, nothing is written on disk.
+    Useful for tests and ephemeral environments.
+    The writes of a unit of work are logged, so a rollback undoes them.
+    """
+
+    def __init__(self):
+        self._journal = _Journal()
+        self.store_dao = MemoryStoreDAO(self._journal)
+        self.guardian_dao = MemoryGuardianDAO(self._journal)
+        self.identity_dao = MemoryIdentityDAO(self._journal)
+
+    def _begin(self):
+        self._journal.begin()
+
+    def _commit(self):
+        self._journal.commit()
+
+    def _rollback(self):
+        self._journal.rollback()
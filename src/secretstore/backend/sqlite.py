@@ -0,0 +1,29 @@
+from typing import TYPE_CHECKING, ContextManager
+
+from secretstore.backend.base import Backend
+from secretstore.guardian import GuardianDAO
+from secretstore.identity import IdentityDAO
+from secretstore.store import StoreDAO
+from secretstore.utils import transaction
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+
+class SQLiteBackend(Backend):
+    """Default backend, storing everything in the sqlite database"""
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the backend
+
+        :param connection: The sqlite connection to use
+        """
+        self.connection = connection
+        self.store_dao = StoreDAO(connection)
+        self.guardian_dao = GuardianDAO(connection)
+        self.identity_dao = IdentityDAO(connection)
+
+    def transaction(self) -> ContextManager["Connection"]:
+        """The unit of work is the sqlite transaction, shared with the other tables"""
+        return transaction(self.connection)
@@ -0,0 +1,271 @@
+import hashlib
+import struct
+import zlib
+from typing import TYPE_CHECKING, BinaryIO, Iterable
+
+from secretstore.changelog import ChangeLogDAO
+from secretstore.exceptions import InvalidBackup
+from secretstore.utils import transaction
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+MAGIC = b"SSBK\x01"
+# Rows are packed until a chunk reaches this size, then the chunk is compressed and written
+CHUNK_SIZE = 1 << 20
+FETCH_SIZE = 512
+
+FLAG_INCREMENTAL = 1
+
+KIND_ROWS = 0
+KIND_DELETE = 1
+KIND_END = 0xFF
+
+# (table name, key column, columns). The key column is the first one
+_TABLES = (
+    ("identities", "fingerprint", ("fingerprint", "public_key", "private_key")),
+    ("store", "name", ("name", "ciphertext", "nonce")),
+    ("guardians", "store_name", ("store_name", "identity_fingerprint", "aead", "key")),
+    ("keyrings", "identity_fingerprint", ("identity_fingerprint", "aead", "key")),
+    ("groups", "name", ("name", "identity_fingerprint", "aead", "key")),
+    ("group_guardians", "store_name", ("store_name", "group_name", "key")),
+    (
+        "store_history",
+        "store_name",
+        ("store_name", "version", "checkpoint", "ciphertext", "nonce", "created_at"),
+    ),
+    ("field_expiry", "store_name", ("store_name", "token", "expires_at")),
+    (
+        "index_keys",
+        "identity_fingerprint",
+        ("identity_fingerprint", "key_id", "aead", "key"),
+    ),
+    ("field_index", "store_name", ("store_name", "key_id", "token")),
+)
+
+_HEADER = struct.Struct(">5sBQQ")
+_FRAME = struct.Struct(">BBIII")
+
+_NULL = 0
+_TEXT = 1
+_BLOB = 2
+_INT = 3
+_FIELD = struct.Struct(">BI")
+
+
+def _encode_field(value) -> bytes:
+    """Encode a single column value with its type and length"""
+    if value is None:
+        return _FIELD.pack(_NULL, 0)
+    if isinstance(value, str):
+        raw = value.encode()
+        return _FIELD.pack(_TEXT, len(raw)) + raw
+    if isinstance(value, int):
+        raw = str(value).encode()
+        return _FIELD.pack(_INT, len(raw)) + raw
+    return _FIELD.pack(_BLOB, len(value)) + bytes(value)
+
+
+def _decode_rows(payload: bytes, count: int, columns: int) -> Iterable[tuple]:
+    """Decode count rows of columns fields each from a chunk payload"""
+    view = memoryview(payload)
+    offset = 0
+    for _ in range(count):
+        row = []
+        for _ in range(columns):
+            kind, size = _FIELD.unpack_from(view, offset)
+            offset += _FIELD.size
+            raw = view[offset : offset + size]
+            offset += size
+            if kind == _NULL:
+                row.append(None)
+            elif kind == _TEXT:
+                row.append(str(raw, "utf-8"))
+            elif kind == _INT:
+                row.append(int(str(raw, "ascii")))
+            else:
+                row.append(bytes(raw))
+        yield tuple(row)
+
+
+class _ArchiveWriter:
+    """Write frames to the output and keep the running digest of everything written"""
+
+    def __init__(self, output: BinaryIO):
+        self._output = output
+        self._digest = hashlib.sha256()
+
+    def write(self, data: bytes):
+        self._digest.update(data)
+        self._output.write(data)
+
+    def write_rows(self, table: int, kind: int, rows: Iterable[tuple]):
+        """Pack rows into compressed chunks of about CHUNK_SIZE bytes"""
+        buffer = bytearray()
+        count = 0
+        for row in rows:
+            for value in row:
+                buffer += _encode_field(value)
+            count += 1
+            if len(buffer) >= CHUNK_SIZE:
+                self._write_chunk(table, kind, count, buffer)
+                buffer.clear()
+                count = 0
+        if count:
+            self._write_chunk(table, kind, count, buffer)
+
+    def _write_chunk(self, table: int, kind: int, count: int, buffer: bytearray):
+        payload = zlib.compress(buffer)
+        self.write(
+            _FRAME.pack(table, kind, count, len(payload), zlib.crc32(buffer)) + payload
+        )
+
+    def close(self):
+        """Write the end frame followed by the archive digest"""
+        self.write(_FRAME.pack(KIND_END, KIND_END, 0, 0, 0))
+        self._output.write(self._digest.digest())
+
+
+def _fetch(connection: "Connection", query: str, params=()) -> Iterable[tuple]:
+    """Iterate over a query result without loading it fully in memory"""
+    cur = connection.execute(query, params)
+    while rows := cur.fetchmany(FETCH_SIZE):
+        yield from rows
+
+
+def backup(
+    connection: "Connection",
+    output: BinaryIO,
+    since: int = 0,
+    incremental: bool = False,
+) -> int:
+    """
+    Stream the store, guardians and identities tables into an archive.
+    Data is copied as stored in the database, nothing is decrypted.
+
+    :param connection: The sqlite connection to backup
+    :param output: The binary stream to write the archive into
+    :param since: If not 0, only the rows changed after this change number are saved (incremental backup)
+    :param incremental: Force an incremental archive even if since is 0. Restoring it will not remove the existing data
+    :return: The last change number included in the archive, to use for the next incremental backup
+    """
+    # Read everything in one transaction to get a consistent snapshot.
+    # Inside an open transaction the snapshot is the caller one, and it is left open
+    opened = not connection.in_transaction
+    if opened:
+        connection.execute("begin")
+    try:
+        until = ChangeLogDAO(connection).last_seq()
+        flags = FLAG_INCREMENTAL if since or incremental else 0
+
+        writer = _ArchiveWriter(output)
+        writer.write(_HEADER.pack(MAGIC, flags, since, until))
+
+        for index, (table, key, columns) in enumerate(_TABLES):
+            selected = ",".join(f"t.{column}" for column in columns)
+            if flags & FLAG_INCREMENTAL:
+                changed = (
+                    "select distinct key from changelog where table_name=? and seq > ? and seq <= ?",
+                    (table, since, until),
+                )
+                writer.write_rows(index, KIND_DELETE, _fetch(connection, *changed))
+            if since:
+                writer.write_rows(
+                    index,
+                    KIND_ROWS,
+                    _fetch(
+                        connection,
+                        f"select {selected} from {table} t where t.{key} in ({changed[0]})",
+                        changed[1],
+                    ),
+                )
+            else:
+                writer.write_rows(
+                    index,
+                    KIND_ROWS,
+                    _fetch(connection, f"select {selected} from {table} t"),
+                )
+        writer.close()
+    finally:
+        if opened:
+            connection.rollback()
+    return until
+
+
+def _read_exactly(source: BinaryIO, size: int) -> bytes:
+    data = source.read(size)
+    if len(data) != size:
+        raise InvalidBackup("unexpected end of file")
+    return data
+
+
+def restore(
+    connection: "Connection", source: BinaryIO, incremental_only: bool = False
+) -> int:
+    """
+    Load an archive in the database in a single transaction, or in the open one.
+    A full archive replaces all the data, an incremental one replaces only the changed rows.
+    Indexes are dropped during the load and built afterwards.
+    Every key deleted or written is added to the change log, so the changes can be exported again to another database.
+
+    :param connection: The sqlite connection to restore into
+    :param source: The binary stream to read the archive from
+    :param incremental_only: Refuse full archives, so existing data cannot be wiped
+    :return: The last change number included in the archive
+    """
+    digest = hashlib.sha256()
+
+    def read(size: int) -> bytes:
+        data = _read_exactly(source, size)
+        digest.update(data)
+        return data
+
+    magic, flags, _, until = _HEADER.unpack(read(_HEADER.size))
+    if magic != MAGIC:
+        raise InvalidBackup("unknown format")
+    if incremental_only and not flags & FLAG_INCREMENTAL:
+        raise InvalidBackup("not an incremental archive")
+
+    names = [table for table, _, _ in _TABLES]
+    changelog = ChangeLogDAO(connection)
+    with transaction(connection):
+        indexes = connection.execute(
+            f"select name, sql from sqlite_master where type='index' and sql is not null and tbl_name in ({','.join(['?'] * len(names))})",
+            names,
+        ).fetchall()
+        for name, _ in indexes:
+            connection.execute(f"drop index {name}")
+
+        if not flags & FLAG_INCREMENTAL:
+            for table, key, _ in _TABLES:
+                changelog.append_table(table, key)
+                connection.execute(f"delete from {table}")
+
+        while True:
+            table, kind, count, size, crc = _FRAME.unpack(read(_FRAME.size))
+            if kind == KIND_END:
+                break
+            if table >= len(_TABLES):
+                raise InvalidBackup(f"unknown table {table}")
+            buffer = zlib.decompress(read(size))
+            if zlib.crc32(buffer) != crc:
+                raise InvalidBackup("corrupted chunk")
+
+            name, key, columns = _TABLES[table]
+            if kind == KIND_DELETE:
+                rows = list(_decode_rows(buffer, count, 1))
+                connection.executemany(f"delete from {name} where {key}=?", rows)
+            else:
+                rows = list(_decode_rows(buffer, count, len(columns)))
+                connection.executemany(
+                    f"insert or replace into {name}({','.join(columns)}) values ({','.join(['?'] * len(columns))})",
+                    rows,
+                )
+            changelog.append_many(name, list(dict.fromkeys(row[0] for row in rows)))
+
+        if _read_exactly(source, digest.digest_size) != digest.digest():
+            raise InvalidBackup("checksum mismatch")
+
+        for _, sql in indexes:
+            connection.execute(sql)
+    return until
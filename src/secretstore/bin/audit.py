@@ -0,0 +1,99 @@
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from secretstore.audit import AuditManager
+from secretstore.bin.utils import complete
+from secretstore.completion import IDENTITIES, STORES
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from secretstore.ssm import SecretStoreManager
+
+
+def _timestamp(value: str) -> float:
+    """Parse an iso date or datetime, in local time"""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def audit(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Show the audit log, oldest first. Nothing is decrypted.
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept seven args:
+        - since: The first time to show
+        - until: The time to stop at, excluded
+        - store: Only the events of this store
+        - fingerprint: Only the events of this identity
+        - action: Only the events of this action
+        - limit: Show only the last events
+        - json: Display as json lines
+    """
+    events = ssm.audit_manager.find_events(
+        args.since, args.until, args.store, args.fingerprint, args.action, args.limit
+    )
+    for event in events:
+        created_at = datetime.fromtimestamp(event.timestamp).isoformat(sep=" ")
+        if args.json:
+            print(
+                json.dumps(
+                    {
+                        "time": created_at,
+                        "fingerprint": event.fingerprint,
+                        "store": event.store_name,
+                        "action": event.action,
+                    }
+                )
+            )
+        else:
+            print(
+                f"{created_at}\t{event.action}\t{event.store_name}\t{event.fingerprint}"
+            )
+
+
+def add_audit_commands(parser: "ArgumentParser"):
+    """
+    Add the audit command arguments
+
+    :param parser: The audit parser
+    """
+    parser.add_argument(
+        "--since", type=_timestamp, help="Show the events from this iso date or time"
+    )
+    parser.add_argument(
+        "--until",
+        type=_timestamp,
+        help="Show the events before this iso date or time",
+    )
+    complete(
+        parser.add_argument("--store", type=str, help="Only the events of this store"),
+        STORES,
+    )
+    complete(
+        parser.add_argument(
+            "--fingerprint", type=str, help="Only the events of this identity"
+        ),
+        IDENTITIES,
+    )
+    parser.add_argument(
+        "--action",
+        choices=[
+            AuditManager.CREATE,
+            AuditManager.READ,
+            AuditManager.UPDATE,
+            AuditManager.SHARE,
+            AuditManager.DELETE,
+        ],
+        help="Only the events of this action",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=100,
+        help="Show the last events only, 100 per default",
+    )
+    parser.add_argument("--json", action="store_true", help="Display as json lines")
+    parser.set_defaults(f=audit)
@@ -0,0 +1,75 @@
+import sys
+from typing import TYPE_CHECKING
+
+from secretstore.exceptions import InvalidBackup
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from secretstore.ssm import SecretStoreManager
+
+
+def backup(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Write an archive of the database. Secrets stay encrypted.
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept two args:
+        - file: The archive path, '-' for stdout
+        - since: Only save the changes after this change number
+    """
+    if args.file == "-":
+        until = ssm.backup(sys.stdout.buffer, args.since)
+    else:
+        with open(args.file, "wb") as f:
+            until = ssm.backup(f, args.since)
+    print(f"Backup done up to change {until}", file=sys.stderr)
+
+
+def restore(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Restore an archive in the database.
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept one arg:
+        - file: The archive path, '-' for stdin
+    """
+    try:
+        if args.file == "-":
+            until = ssm.restore(sys.stdin.buffer)
+        else:
+            with open(args.file, "rb") as f:
+                until = ssm.restore(f)
+    except InvalidBackup as e:
+        print(e)
+        exit(1)
+    print(f"Restored up to change {until}")
+
+
+def add_backup_commands(parser: "ArgumentParser"):
+    """
+    Add the backup command arguments
+
+    :param parser: The backup parser
+    """
+    parser.add_argument("file", help="The archive path, '-' for stdout")
+    parser.add_argument(
+        "--since",
+        type=int,
+        default=0,
+        help="Incremental backup: only save the changes after this change number",
+    )
+    parser.set_defaults(f=backup)
+
+
+def add_restore_commands(parser: "ArgumentParser"):
+    """
+    Add the restore command arguments
+
+    :param parser: The restore parser
+    """
+    parser.add_argument("file", help="The archive path, '-' for stdin")
+    parser.set_defaults(f=restore)
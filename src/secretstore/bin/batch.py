@@ -0,0 +1,177 @@
+import json
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Callable, TextIO
+
+from secretstore.exceptions import InvalidRequest
+from secretstore.store.entity import Store
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser
+    from secretstore.ssm import SecretStoreManager
+
+
+# The json names of the request members types
+_TYPES = {str: "string", dict: "object"}
+
+
+def _require(request: dict, name: str, kind: type = str) -> Any:
+    """Return a request member, raise InvalidRequest if it is missing or of the wrong type"""
+    value = request.get(name)
+    if not isinstance(value, kind):
+        raise InvalidRequest(f"'{name}' must be a json {_TYPES[kind]}")
+    return value
+
+
+def _get_store(ssm: "SecretStoreManager", request: dict) -> Store:
+    name = _require(request, "store")
+    store = ssm.get_store(name)
+    if store is None:
+        raise InvalidRequest(f"the store '{name}' was not found")
+    return store
+
+
+def _get(ssm: "SecretStoreManager", request: dict) -> dict:
+    store = _get_store(ssm, request)
+    return {
+        "data": store.data,
+        "ttl": {field: store.ttl(field) for field in store.expires_at},
+    }
+
+
+def _get_field(ssm: "SecretStoreManager", request: dict) -> dict:
+    store = _get_store(ssm, request)
+    field = _require(request, "field")
+    if field not in store.data:
+        raise InvalidRequest(f"the store '{store.name}' has no field '{field}'")
+    return {"value": store.data[field], "ttl": store.ttl(field)}
+
+
+def _set(ssm: "SecretStoreManager", request: dict) -> dict:
+    name = _require(request, "store")
+    data = _require(request, "data", dict)
+    if not all(isinstance(value, str) for value in data.values()):
+        raise InvalidRequest("'data' must be a json object of strings")
+    ttls = request.get("ttl", {})
+    # bool is an int, a ttl of true would be one second
+    if not isinstance(ttls, dict) or not all(
+        ttl is None or (isinstance(ttl, int) and not isinstance(ttl, bool) and ttl > 0)
+        for ttl in ttls.values()
+    ):
+        raise InvalidRequest("'ttl' must be a json object of positive seconds or null")
+
+    store = ssm.get_store(name)
+    created = store is None
+    if created:
+        store = Store(name, {})
+    store.data.update(data)
+    now = int(time.time())
+    for field, ttl in ttls.items():
+        if ttl is None:
+            store.expires_at.pop(field, None)
+        else:
+            store.expires_at[field] = now + ttl
+
+    if created:
+        ssm.new_store(store)
+    else:
+        ssm.update_store(store)
+    return {"created": created}
+
+
+def _list(ssm: "SecretStoreManager", _: dict) -> dict:
+    return {"stores": ssm.list_stores_name()}
+
+
+def _share(ssm: "SecretStoreManager", request: dict) -> dict:
+    name = _require(request, "store")
+    if ("fingerprint" in request) == ("group" in request):
+        raise InvalidRequest("set either 'fingerprint' or 'group'")
+
+    store = ssm.get_encrypted_store(name)
+    if store is None:
+        raise InvalidRequest(f"the store '{name}' was not found")
+    if "group" in request:
+        ssm.share_store_with_group(store, _require(request, "group"))
+        return {}
+
+    fingerprint = _require(request, "fingerprint")
+    identity = ssm.identity_manager.get_identity(fingerprint)
+    if identity is None:
+        raise InvalidRequest(f"the identity '{fingerprint}' was not found")
+    ssm.share_store(store, identity)
+    return {}
+
+
+_OPERATIONS: dict[str, Callable[["SecretStoreManager", dict], dict]] = {
+    "get": _get,
+    "get-field": _get_field,
+    "set": _set,
+    "list": _list,
+    "share": _share,
+}
+
+
+def handle(ssm: "SecretStoreManager", line: str) -> dict:
+    """
+    Run one request and build its response. A failed request never stops the session.
+
+    :param ssm: The SecretStoreManager
+    :param line: The json request
+    :return: The response, with the request id if any, ok and either the result members or error
+    """
+    response: dict[str, Any] = {}
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise InvalidRequest("a request must be a json object")
+        if "id" in request:
+            response["id"] = request["id"]
+        operation = _OPERATIONS.get(request.get("op"))
+        if operation is None:
+            raise InvalidRequest(f"'op' must be one of {', '.join(_OPERATIONS)}")
+        result = operation(ssm, request)
+    except json.JSONDecodeError as e:
+        response.update(ok=False, error=f"Invalid json: {e}")
+    except Exception as e:
+        response.update(ok=False, error=str(e))
+    else:
+        response.update(ok=True, **result)
+    return response
+
+
+def serve(ssm: "SecretStoreManager", source: TextIO, output: TextIO):
+    """
+    Answer the json lines requests of source, one json line response each, until the end of source
+
+    :param ssm: The SecretStoreManager. It should keep the identities unlocked
+    :param source: The requests
+    :param output: The responses, flushed after each one
+    """
+    for line in source:
+        if not line.strip():
+            continue
+        output.write(json.dumps(handle(ssm, line)) + "\n")
+        output.flush()
+
+
+def batch(_, ssm: "SecretStoreManager"):
+    """
+    Read json lines requests on stdin and write a json line response for each one on stdout.
+    The identities and the store keys are unlocked once for the whole session.
+
+    :param ssm: The SecretStoreManager
+    """
+    try:
+        serve(ssm, sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+
+
+def add_batch_commands(parser: "ArgumentParser"):
+    """
+    Add the batch command arguments
+
+    :param parser: The batch parser
+    """
+    parser.set_defaults(f=batch, keep_unlocked=True)
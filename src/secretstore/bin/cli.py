@@ -2,8 +2,18 @@ import argparse
 import logging
 import pathlib
 
+from secretstore.bin.audit import add_audit_commands
+from secretstore.bin.backup import add_backup_commands, add_restore_commands
+from secretstore.bin.batch import add_batch_commands
+from secretstore.bin.completion import add_completion_commands
+from secretstore.bin.group import add_group_commands
 from secretstore.bin.identity import add_identity_commands
+from secretstore.bin.maintenance import add_maintenance_commands, add_stats_commands
+from secretstore.bin.render import add_render_commands
+from secretstore.bin.snapshot import add_snapshot_commands
 from secretstore.bin.store import add_store_commands
+from secretstore.bin.sync import add_sync_commands
+from secretstore.bin.watch import add_watch_commands
 from secretstore.agent import SSHAgent
 from sqlite3 import Connection
 from secretstore.ssm import SecretStoreManager
@@ -12,7 +22,12 @@ from secretstore.ssm import SecretStoreManager
 def main():
     parser = argparse.ArgumentParser(description="Secret Store cli")
     parser.add_argument("--debug", action="store_true", help="Show debug logs")
-    parser.set_defaults(f=None)
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Compress the stores larger than 1 KiB written by the command",
+    )
+    parser.set_defaults(f=None, database=True, keep_unlocked=False)
     subparsers = parser.add_subparsers()
 
     # Identity
@@ -23,6 +38,70 @@ def main():
     store_parser = subparsers.add_parser("store")
     add_store_commands(store_parser)
 
+    # Group
+    group_parser = subparsers.add_parser("group")
+    add_group_commands(group_parser)
+
+    # Backup
+    backup_parser = subparsers.add_parser(
+        "backup", help="Write an archive of the database"
+    )
+    add_backup_commands(backup_parser)
+
+    restore_parser = subparsers.add_parser("restore", help="Restore an archive")
+    add_restore_commands(restore_parser)
+
+    # Sync
+    sync_parser = subparsers.add_parser(
+        "sync", help="Exchange changes with another database"
+    )
+    add_sync_commands(sync_parser)
+
+    # Snapshot
+    snapshot_parser = subparsers.add_parser(
+        "snapshot", help="Read only snapshot readable without the database"
+    )
+    add_snapshot_commands(snapshot_parser)
+
+    # Render
+    render_parser = subparsers.add_parser(
+        "render", help="Render a template with its {{ store.field }} references"
+    )
+    add_render_commands(render_parser)
+
+    # Watch
+    watch_parser = subparsers.add_parser(
+        "watch", help="Print the names of the stores when they change"
+    )
+    add_watch_commands(watch_parser)
+
+    # Maintenance
+    stats_parser = subparsers.add_parser("stats", help="Show database statistics")
+    add_stats_commands(stats_parser)
+
+    maintenance_parser = subparsers.add_parser(
+        "maintenance", help="Purge orphans, rebuild indexes and compact the database"
+    )
+    add_maintenance_commands(maintenance_parser)
+
+    # Completion
+    completion_parser = subparsers.add_parser(
+        "completion", help="Shell completion scripts and their cache"
+    )
+    add_completion_commands(completion_parser, parser)
+
+    # Audit
+    audit_parser = subparsers.add_parser(
+        "audit", help="Show which identity accessed which store and when"
+    )
+    add_audit_commands(audit_parser)
+
+    # Batch
+    batch_parser = subparsers.add_parser(
+        "batch", help="Answer json lines requests from stdin, for scripts"
+    )
+    add_batch_commands(batch_parser)
+
     args = parser.parse_args()
 
     if args.debug:
@@ -31,18 +110,32 @@ def main():
     else:
         logging.basicConfig(level=logging.INFO)
 
+    # Some commands don't need the database
+    if args.f is not None and not args.database:
+        args.f(args, None)
+        return
 
     dir = pathlib.Path.home() / ".local" / "secret-store"
     dir.mkdir(exist_ok=True)
 
     database = format(dir / "data.db")
     
-    ssm = SecretStoreManager(Connection(database), SSHAgent())
+    connection = Connection(database)
+    ssm = SecretStoreManager(
+        connection,
+        SSHAgent(),
+        keep_unlocked=args.keep_unlocked,
+        compress=args.compress,
+    )
 
-    if args.f is not None:
-        args.f(args, ssm)
-    else:
-        parser.print_help()
+    try:
+        if args.f is not None:
+            args.f(args, ssm)
+        else:
+            parser.print_help()
+    finally:
+        ssm.close()
+        connection.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,275 @@
+from argparse import _SubParsersAction
+from typing import TYPE_CHECKING, Iterator
+
+from secretstore.completion import refresh_cache
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from secretstore.ssm import SecretStoreManager
+
+# Shared by bash and zsh. Reads a cached list and refreshes it when the database changed since.
+# The refresh runs in background, the next completion gets the new values
+_SH_LIST = """_secret_store_list() {
+    local cache="$HOME/.local/secret-store/completion"
+    if [[ ! -f "$cache/$1" ]]; then
+        secret-store completion refresh >/dev/null 2>&1
+    elif [[ "$cache/../data.db" -nt "$cache/$1" ]]; then
+        (secret-store completion refresh >/dev/null 2>&1 &)
+    fi
+    cat "$cache/$1" 2>/dev/null
+}
+"""
+
+# Walk the words before the cursor to find the command and the position of the argument to complete
+_SH_WALK = """    local command_path="" position=0 skip=0 word kind i
+    for ((i = {first}; i < {current}; i++)); do
+        word="${{{words}[i]}}"
+        if ((skip)); then
+            skip=0
+        elif [[ "$word" == -* ]]; then
+            [[ " $(_secret_store_spec "$command_path" values) " == *" $word "* ]] && skip=1
+        elif [[ " $(_secret_store_spec "$command_path" commands) " == *" $word "* ]]; then
+            command_path="${{command_path:+$command_path }}$word"
+        else
+            position=$((position + 1))
+        fi
+    done
+"""
+
+_BASH = """# secret-store completion for bash, generated by: secret-store completion bash
+{list}
+{spec}
+_secret_store() {{
+    local cur="${{COMP_WORDS[COMP_CWORD]}}" words=""
+{walk}
+    if ((skip)); then
+        kind=$(_secret_store_spec "$command_path" "${{COMP_WORDS[COMP_CWORD - 1]}}")
+    elif [[ "$cur" == -* ]]; then
+        words=$(_secret_store_spec "$command_path" options)
+    else
+        words=$(_secret_store_spec "$command_path" commands)
+        [[ -z "$words" ]] && kind=$(_secret_store_spec "$command_path" "arg $((position + 1))")
+    fi
+    [[ -n "$kind" ]] && words=$(_secret_store_list "$kind")
+    COMPREPLY=($(compgen -W "$words" -- "$cur"))
+}}
+
+complete -o default -F _secret_store secret-store
+"""
+
+_ZSH = """# secret-store completion for zsh, generated by: secret-store completion zsh
+{list}
+{spec}
+_secret_store() {{
+    local -a candidates
+{walk}
+    if ((skip)); then
+        kind=$(_secret_store_spec "$command_path" "${{words[CURRENT - 1]}}")
+    elif [[ "$PREFIX" == -* ]]; then
+        candidates=(${{=$(_secret_store_spec "$command_path" options)}})
+    else
+        candidates=(${{=$(_secret_store_spec "$command_path" commands)}})
+        ((${{#candidates}})) || kind=$(_secret_store_spec "$command_path" "arg $((position + 1))")
+    fi
+    if [[ -n "$kind" ]]; then
+        candidates=(${{(f)"$(_secret_store_list "$kind")"}})
+    elif ((!${{#candidates}})); then
+        _files
+        return
+    fi
+    compadd -a candidates
+}}
+
+compdef _secret_store secret-store
+"""
+
+_FISH = """# secret-store completion for fish, generated by: secret-store completion fish
+function __secret_store_list
+    set -l cache ~/.local/secret-store/completion
+    if not test -f $cache/$argv[1]
+        secret-store completion refresh >/dev/null 2>&1
+    else if command test $cache/../data.db -nt $cache/$argv[1]
+        secret-store completion refresh >/dev/null 2>&1 &
+        disown
+    end
+    cat $cache/$argv[1] 2>/dev/null
+end
+
+function __secret_store_spec
+    switch "$argv[1]:$argv[2]"
+{cases}
+    end
+end
+
+function __secret_store_complete
+    set -l tokens (commandline -opc)
+    set -l current (commandline -ct)
+    set -l command_path ""
+    set -l position 0
+    set -l skip 0
+    for word in $tokens[2..-1]
+        if test $skip = 1
+            set skip 0
+        else if string match -q -- "-*" $word
+            if contains -- $word (string split " " -- (__secret_store_spec "$command_path" values))
+                set skip 1
+            end
+        else if contains -- $word (string split " " -- (__secret_store_spec "$command_path" commands))
+            set command_path (string trim -- "$command_path $word")
+        else
+            set position (math $position + 1)
+        end
+    end
+
+    set -l kind
+    if test $skip = 1
+        set kind (__secret_store_spec "$command_path" $tokens[-1])
+    else if string match -q -- "-*" $current
+        string split " " -- (__secret_store_spec "$command_path" options)
+        return
+    else
+        set -l commands (__secret_store_spec "$command_path" commands)
+        if test -n "$commands"
+            string split " " -- $commands
+            return
+        end
+        set kind (__secret_store_spec "$command_path" "arg "(math $position + 1))
+    end
+    if test -n "$kind"
+        __secret_store_list $kind
+    else
+        __fish_complete_path $current
+    end
+end
+
+complete -c secret-store -f -a "(__secret_store_complete)"
+"""
+
+
+def _walk(parser: "ArgumentParser", path: str = "") -> Iterator[tuple[str, str, str]]:
+    """
+    Describe the commands of the parser and its subparsers, recursively
+
+    :param parser: The parser to describe
+    :param path: The words of the command leading to the parser
+    :return: (path, key, value). The key is commands, options or values (the options taking a value),
+        "arg <n>" for the n-th positional argument or an option, completed by the value (a cached list).
+        "arg *" stands for all the positions of a variadic argument
+    """
+    commands = []
+    subparsers = []
+    options = []
+    values = []
+    positionals = []
+    for action in parser._actions:
+        if isinstance(action, _SubParsersAction):
+            commands.extend(action.choices)
+            subparsers.extend(action.choices.items())
+        elif action.option_strings:
+            options.extend(action.option_strings)
+            if action.nargs != 0:
+                values.extend(action.option_strings)
+                for option in action.option_strings:
+                    if getattr(action, "complete", None):
+                        yield path, option, action.complete
+        else:
+            positionals.append(action)
+
+    for key, words in (
+        ("commands", commands),
+        ("options", options),
+        ("values", values),
+    ):
+        if words:
+            yield path, key, " ".join(words)
+    for position, action in enumerate(positionals, 1):
+        if getattr(action, "complete", None):
+            # A variadic argument matches all the positions, it is the last one
+            variadic = action.nargs in ("*", "+")
+            yield path, "arg *" if variadic else f"arg {position}", action.complete
+
+    for name, subparser in subparsers:
+        yield from _walk(subparser, f"{path} {name}".strip())
+
+
+def _sh_spec(parser: "ArgumentParser") -> str:
+    """The spec lookup function, for bash and zsh"""
+    cases = []
+    for path, key, value in _walk(parser):
+        if key.endswith("*"):
+            pattern = f'"{path}:{key[:-1]}"*'
+        else:
+            pattern = f'"{path}:{key}"'
+        cases.append(f'        {pattern}) echo "{value}" ;;')
+    body = "\n".join(cases)
+    return f'_secret_store_spec() {{\n    case "$1:$2" in\n{body}\n    esac\n}}\n'
+
+
+def _script(shell: str, parser: "ArgumentParser") -> str:
+    """
+    Generate the completion script of a shell
+
+    :param shell: bash, zsh or fish
+    :param parser: The root parser of the cli
+    :return: The script
+    """
+    if shell == "fish":
+        cases = []
+        for path, key, value in _walk(parser):
+            pattern = f"{path}:{key[:-1]}*" if key.endswith("*") else f"{path}:{key}"
+            cases.append(f"        case '{pattern}'\n            echo '{value}'")
+        return _FISH.format(cases="\n".join(cases))
+
+    if shell == "bash":
+        walk = _SH_WALK.format(first=1, current="COMP_CWORD", words="COMP_WORDS")
+        template = _BASH
+    else:
+        walk = _SH_WALK.format(first=2, current="CURRENT", words="words")
+        template = _ZSH
+    return template.format(list=_SH_LIST, spec=_sh_spec(parser), walk=walk)
+
+
+def script(args: "Namespace", _):
+    """
+    Print the completion script of a shell
+
+    :param args: The cli args
+
+    accept two args:
+        - shell: bash, zsh or fish
+        - root: The root parser of the cli
+    """
+    print(_script(args.shell, args.root), end="")
+
+
+def refresh(_, ssm: "SecretStoreManager"):
+    """
+    Refresh the completion cache. No identity is unlocked.
+
+    :param ssm: The SecretStoreManager
+    """
+    counts = refresh_cache(ssm)
+    for name, count in counts.items():
+        print(f"{count} {name} cached")
+
+
+def add_completion_commands(parser: "ArgumentParser", root: "ArgumentParser"):
+    """
+    Add all completion related commands to the root parser
+
+    :param parser: The parser which all the subparsers will be added
+    :param root: The root parser of the cli, described by the scripts
+    """
+    subparsers = parser.add_subparsers()
+
+    for shell in ("bash", "zsh", "fish"):
+        shell_parser = subparsers.add_parser(
+            shell, help=f"Print the {shell} completion script"
+        )
+        shell_parser.set_defaults(f=script, shell=shell, root=root, database=False)
+
+    refresh_parser = subparsers.add_parser(
+        "refresh",
+        help="Refresh the cached stores names and identities used by the completion",
+    )
+    refresh_parser.set_defaults(f=refresh)
@@ -0,0 +1,125 @@
+from typing import TYPE_CHECKING
+
+from secretstore.bin.utils import complete
+from secretstore.completion import IDENTITIES
+from secretstore.exceptions import (
+    GroupAlreadyExists,
+    NoIdentities,
+    NoIdentityForGroupFound,
+)
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from secretstore.ssm import SecretStoreManager
+
+
+def create(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Create a group with the owned identities as members
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+    accept one arg:
+        - name: The name of the group
+    """
+    try:
+        ssm.create_group(args.name)
+    except (GroupAlreadyExists, NoIdentities) as e:
+        print(e)
+        exit(1)
+
+
+def add(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Add an identity to a group
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+    accept two args:
+        - name: The name of the group
+        - fingerprint: The fingerprint of the identity to add
+    """
+    identity = ssm.identity_manager.get_identity(args.fingerprint)
+    if identity is None:
+        print(f"The identity '{args.fingerprint}' was not found")
+        exit(1)
+
+    try:
+        if not ssm.add_group_member(args.name, identity):
+            print(
+                f"The identity '{args.fingerprint}' is already a member of {args.name}"
+            )
+            exit(1)
+    except NoIdentityForGroupFound as e:
+        print(e)
+        exit(1)
+
+
+def remove(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Remove an identity from a group
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+    accept two args:
+        - name: The name of the group
+        - fingerprint: The fingerprint of the identity to remove
+    """
+    try:
+        if not ssm.remove_group_member(args.name, args.fingerprint):
+            print(f"The identity '{args.fingerprint}' is not a member of {args.name}")
+            exit(1)
+    except NoIdentityForGroupFound as e:
+        print(e)
+        exit(1)
+
+
+def list_groups(_, ssm: "SecretStoreManager"):
+    """
+    List the groups of the owned identities with their members
+
+    :param _: unused args
+    :param ssm: The SecretStoreManager
+    """
+    for name, members in ssm.list_groups().items():
+        print(f"=== {name} ===")
+        for fingerprint in members:
+            print(fingerprint)
+
+
+def add_group_commands(parser: "ArgumentParser"):
+    """
+    Add all group related commands to the root parser
+
+    :param parser: The parser which all the subparsers will be added
+    """
+    subparsers = parser.add_subparsers()
+
+    create_parser = subparsers.add_parser("create", help="Create a new group")
+    create_parser.add_argument("name", type=str, help="The name of the group")
+    create_parser.set_defaults(f=create)
+
+    add_parser = subparsers.add_parser("add", help="Add an identity to a group")
+    add_parser.add_argument("name", type=str, help="The name of the group")
+    complete(
+        add_parser.add_argument(
+            "fingerprint", type=str, help="The identity fingerprint"
+        ),
+        IDENTITIES,
+    )
+    add_parser.set_defaults(f=add)
+
+    remove_parser = subparsers.add_parser(
+        "remove", help="Remove an identity from a group"
+    )
+    remove_parser.add_argument("name", type=str, help="The name of the group")
+    complete(
+        remove_parser.add_argument(
+            "fingerprint", type=str, help="The identity fingerprint"
+        ),
+        IDENTITIES,
+    )
+    remove_parser.set_defaults(f=remove)
+
+    list_parser = subparsers.add_parser("list", help="List groups and their members")
+    list_parser.set_defaults(f=list_groups)
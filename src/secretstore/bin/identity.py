@@ -1,5 +1,7 @@
 from typing import TYPE_CHECKING
 
+from secretstore.exceptions import NoIdentities
+
 if TYPE_CHECKING:
     from argparse import ArgumentParser, Namespace
     from secretstore.ssm import SecretStoreManager
@@ -13,15 +15,15 @@ def list_identities(args: "Namespace", ssm: "SecretStoreManager"):
     :param args: The cli args
     """
     if args.all:
-        ids = list(ssm.identity_manager.get_identities())
+        fingerprints = ssm.identity_manager.get_fingerprints()
     else:
-        ids = list(ssm.identity_manager.get_identities_based_ssh_agent())
+        fingerprints = ssm.identity_manager.get_fingerprints_based_ssh_agent()
 
-    if len(ids) == 0:
+    if len(fingerprints) == 0:
         print("No identity was found. Sync identities with secret-store identity sync")
 
-    for i in ids:
-        print(i.fingerprint)
+    for fingerprint in fingerprints:
+        print(fingerprint)
 
 
 def create_identities(_, ssm: "SecretStoreManager"):
@@ -38,6 +40,17 @@ def create_identities(_, ssm: "SecretStoreManager"):
             print(f"Created: {fingerprint}")
 
 
+def enable_keyrings(_, ssm: "SecretStoreManager"):
+    """
+    Enable the keyring of the owned identities and migrate their guardians
+    """
+    try:
+        print(f"Migrated {ssm.enable_keyrings()} guardians")
+    except NoIdentities as e:
+        print(e)
+        exit(1)
+
+
 def add_identity_commands(parser: "ArgumentParser"):
     """
     Add all identity related commands to the root parser
@@ -58,3 +71,9 @@ def add_identity_commands(parser: "ArgumentParser"):
         help="List all identities instead of owned ones only",
     )
     list_parser.set_defaults(f=list_identities)
+
+    keyring_parser = subparsers.add_parser(
+        "keyring",
+        help="Enable the keyring of owned identities to unlock stores faster",
+    )
+    keyring_parser.set_defaults(f=enable_keyrings)
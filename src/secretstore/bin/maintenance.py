@@ -0,0 +1,73 @@
+import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from secretstore.ssm import SecretStoreManager
+
+
+def stats(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Print statistics on the database
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept one arg:
+        - json: Print the statistics as json
+    """
+    result = ssm.stats()
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    for section, values in result.items():
+        print(f"{section}:")
+        for name, value in values.items():
+            print(f"  {name}: {value}")
+
+
+def maintenance(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Purge orphans, rebuild the indexes and compact the database
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept one arg:
+        - incremental: Use an incremental vacuum
+    """
+    before = ssm.stats()["database"]["size"]
+    purged = ssm.maintenance(args.incremental)
+    after = ssm.stats()["database"]["size"]
+
+    for table, count in purged.items():
+        if count:
+            print(f"Purged {count} orphan rows from {table}")
+    print(f"Database size: {before} -> {after} bytes")
+
+
+def add_stats_commands(parser: "ArgumentParser"):
+    """
+    Add the stats command arguments
+
+    :param parser: The stats parser
+    """
+    parser.add_argument(
+        "--json", action="store_true", help="Print the statistics as json"
+    )
+    parser.set_defaults(f=stats)
+
+
+def add_maintenance_commands(parser: "ArgumentParser"):
+    """
+    Add the maintenance command arguments
+
+    :param parser: The maintenance parser
+    """
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Release the free pages only, instead of rewriting the whole database",
+    )
+    parser.set_defaults(f=maintenance)
@@ -0,0 +1,56 @@
+import shutil
+import sys
+import tempfile
+from typing import TYPE_CHECKING
+
+from secretstore.exceptions import NoIdentityForStoreFound, UnknownReferences
+from secretstore.template import find_references, render
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from secretstore.ssm import SecretStoreManager
+
+# stdin is spooled to disk above this size, so it can be read twice
+_SPOOL_SIZE = 1 << 20
+
+
+def render_template(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Render a template with its {{ store.field }} references replaced by the secrets.
+    All references are resolved before anything is written.
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept one arg:
+        - template: The template path, '-' for stdin
+    """
+    with tempfile.SpooledTemporaryFile(_SPOOL_SIZE, mode="w+") as spool:
+        if args.template == "-":
+            shutil.copyfileobj(sys.stdin, spool)
+            template = spool
+        else:
+            template = open(args.template)
+
+        with template:
+            template.seek(0)
+            try:
+                values = ssm.resolve(find_references(template))
+            except (UnknownReferences, NoIdentityForStoreFound) as e:
+                print(e, file=sys.stderr)
+                exit(1)
+
+            template.seek(0)
+            render(template, values, sys.stdout)
+
+
+def add_render_commands(parser: "ArgumentParser"):
+    """
+    Add the render command arguments
+
+    :param parser: The render parser
+    """
+    parser.add_argument(
+        "template", nargs="?", default="-", help="The template path, stdin per default"
+    )
+    parser.set_defaults(f=render_template)
@@ -0,0 +1,95 @@
+import json
+from typing import TYPE_CHECKING
+
+from secretstore.agent import SSHAgent
+from secretstore.bin.utils import complete
+from secretstore.completion import IDENTITIES
+from secretstore.exceptions import InvalidSnapshot, NoIdentityForStoreFound
+from secretstore.snapshot import Snapshot
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from secretstore.ssm import SecretStoreManager
+
+
+def build(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Write a read only snapshot of the stores
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept two args:
+        - file: The snapshot path
+        - identity: The identities to include. The owned ones if not set
+    """
+    count = ssm.build_snapshot(args.file, args.identity)
+    print(f"Snapshot written with {count} stores")
+
+
+def show(args: "Namespace", _):
+    """
+    Show a store data from a snapshot, without opening the database
+
+    :param args: The cli args
+    :param _: unused SecretStoreManager, the database is not opened
+
+    accept four args:
+        - file: The snapshot path
+        - name: The name of the store
+        - json: Display as json
+        - field: Print the field as raw
+    """
+    try:
+        with Snapshot(args.file) as snapshot:
+            store = snapshot.get_store(args.name, SSHAgent())
+    except (InvalidSnapshot, NoIdentityForStoreFound) as e:
+        print(e)
+        exit(1)
+
+    if store is None:
+        print(f"The store '{args.name}' was not found")
+        exit()
+
+    if args.json:
+        print(json.dumps(store.data))
+    elif args.field:
+        print(store.data[args.field])
+    else:
+        print(f"=== {store.name} ===")
+        for key, value in store.data.items():
+            ttl = store.ttl(key)
+            expiry = "" if ttl is None else f" (expires in {ttl}s)"
+            print(f"{key}: {value}{expiry}")
+
+
+def add_snapshot_commands(parser: "ArgumentParser"):
+    """
+    Add all snapshot related commands to the root parser
+
+    :param parser: The parser which all the subparsers will be added
+    """
+    subparsers = parser.add_subparsers()
+
+    build_parser = subparsers.add_parser(
+        "build", help="Write a read only snapshot of the stores"
+    )
+    build_parser.add_argument("file", help="The snapshot path")
+    complete(
+        build_parser.add_argument(
+            "--identity",
+            action="append",
+            help="Include the stores of this identity fingerprint. Can be repeated. Owned identities per default",
+        ),
+        IDENTITIES,
+    )
+    build_parser.set_defaults(f=build)
+
+    show_parser = subparsers.add_parser(
+        "show", help="Show the store data from a snapshot"
+    )
+    show_parser.add_argument("file", help="The snapshot path")
+    show_parser.add_argument("name", type=str, help="The name of the store")
+    show_parser.add_argument("--json", action="store_true", help="Display as json")
+    show_parser.add_argument("--field", type=str, help="Print the raw field")
+    show_parser.set_defaults(f=show, database=False)
@@ -1,9 +1,20 @@
+import csv
 import getpass
 import json
-from typing import TYPE_CHECKING
-
-from secretstore.bin.utils import yes
-from secretstore.exceptions import NoIdentityForStoreFound
+import pathlib
+import sys
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, TextIO
+
+from secretstore.bin.utils import complete, positive_int, yes
+from secretstore.completion import IDENTITIES, STORES
+from secretstore.exceptions import (
+    InvalidImport,
+    NoIdentities,
+    NoIdentityForGroupFound,
+    NoIdentityForStoreFound,
+)
 from secretstore.store.entity import Store
 
 if TYPE_CHECKING:
@@ -19,10 +30,11 @@ def new(args: "Namespace", ssm: "SecretStoreManager"):
     :param args: The cli args
     :param ssm: The SecretStoreManager
 
-    accept two args:
+    accept four args:
         - name: The name of the store
         - field: The field to create/update
         - secret: Hide the input
+        - ttl: The field lifetime in seconds. Without it, the field doesn't expire
     """
 
     store = ssm.get_store(args.name)
@@ -41,6 +53,10 @@ def new(args: "Namespace", ssm: "SecretStoreManager"):
         value = input(message)
 
     store.data[args.field] = value
+    if args.ttl is None:
+        store.expires_at.pop(args.field, None)
+    else:
+        store.expires_at[args.field] = int(time.time()) + args.ttl
 
     if exists:
         ssm.update_store(store)
@@ -70,10 +86,26 @@ def show(args: "Namespace", ssm: "SecretStoreManager"):
         - name: The name of the store
         - json: Display as json
         - field: Print the field as raw
+        - version: Show a previous version of the store
     """
 
     try:
-        store = ssm.get_store(args.name)
+        if args.field and not args.json and args.version is None:
+            secret_store = ssm.open_store(args.name)
+            if secret_store is None:
+                print(f"The store '{args.name}' was not found")
+                exit()
+
+            # Write the raw value without decoding it, so it is wiped after use
+            with secret_store:
+                sys.stdout.buffer.write(secret_store[args.field])
+                sys.stdout.buffer.write(b"\n")
+            return
+
+        if args.version is None:
+            store = ssm.get_store(args.name)
+        else:
+            store = ssm.get_store_version(args.name, args.version)
         if store is None:
             print(f"The store '{args.name}' was not found")
             exit()
@@ -85,12 +117,61 @@ def show(args: "Namespace", ssm: "SecretStoreManager"):
         else:
             print(f"=== {store.name} ===")
             for key, value in store.data.items():
-                print(f"{key}: {value}")
+                ttl = store.ttl(key)
+                expiry = "" if ttl is None else f" (expires in {ttl}s)"
+                print(f"{key}: {value}{expiry}")
     except NoIdentityForStoreFound as e:
         print(e)
         exit(1)
 
 
+def history(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    List the versions of a store. Nothing is decrypted.
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept one arg:
+        - name: The name of the store
+    """
+    versions = ssm.store_history(args.name)
+    if len(versions) == 0:
+        print(f"No history for the store '{args.name}'")
+        return
+
+    for version in versions:
+        created_at = datetime.fromtimestamp(version.created_at).isoformat(sep=" ")
+        kind = "full" if version.checkpoint else "delta"
+        print(f"{version.version}\t{created_at}\t{kind}\t{len(version.ciphertext)}")
+
+
+def prune(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Delete the old versions of all stores
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept one arg:
+        - keep: The number of versions to keep per store
+    """
+    print(f"Deleted {ssm.prune_history(args.keep)} versions")
+
+
+def expire(_, ssm: "SecretStoreManager"):
+    """
+    Remove the expired fields of all owned stores. Only the stores having expired fields are decrypted
+
+    :param ssm: The SecretStoreManager
+    """
+    expired = ssm.expire_fields()
+    if len(expired) == 0:
+        print("No expired field")
+    for name, fields in expired.items():
+        print(f"{name}: {', '.join(fields)}")
+
+
 def delete(args: "Namespace", ssm: "SecretStoreManager"):
     """
     Delete a store and all related guardians
@@ -117,27 +198,181 @@ def delete(args: "Namespace", ssm: "SecretStoreManager"):
 
 def share(args: "Namespace", ssm: "SecretStoreManager"):
     """
-    Share a owned store with another identity
+    Share a owned store with another identity or with a group
 
     :param args: The cli args
     :param ssm: The SecretStoreManager
-    accept two args
+    accept three args
         - name: The name of the store
         - fingerprint: The identity fingerprint to share the store with
+        - group: The group to share the store with, instead of an identity
     """
-
-    identity = ssm.identity_manager.get_identity(args.fingerprint)
-    if identity is None:
-        print(f"The identity '{args.fingerprint}' was not found")
+    if (args.fingerprint is None) == (args.group is None):
+        print("Set either an identity fingerprint or a group")
         exit(1)
 
     store = ssm.get_encrypted_store(args.name)
     if store is None:
         print(f"The store '{args.name}' was not found")
         exit(1)
+
+    if args.group is not None:
+        try:
+            ssm.share_store_with_group(store, args.group)
+        except (NoIdentityForGroupFound, NoIdentityForStoreFound) as e:
+            print(e)
+            exit(1)
+        return
+
+    identity = ssm.identity_manager.get_identity(args.fingerprint)
+    if identity is None:
+        print(f"The identity '{args.fingerprint}' was not found")
+        exit(1)
     ssm.share_store(store, identity)
 
 
+def _read_env(file: TextIO) -> Iterable[tuple[str, str]]:
+    """
+    Read KEY=VALUE lines, ignoring comments, blank lines and export prefixes.
+    Raise InvalidImport for a line without = or without key
+    """
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export ") :]
+        field, separator, value = line.partition("=")
+        field = field.strip()
+        if not separator or not field:
+            raise InvalidImport(f"line {number} is not KEY=VALUE")
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        yield field, value
+
+
+def _read_import(
+    file: TextIO, file_format: str, store_name: str | None
+) -> dict[str, dict[str, str]]:
+    """
+    Read an import file. Raise InvalidImport if it doesn't have the expected structure
+
+    :return: The fields of each store
+    """
+    stores: dict[str, dict[str, str]] = {}
+    if file_format == "env":
+        stores[store_name] = dict(_read_env(file))
+    elif file_format == "json":
+        try:
+            content = json.load(file)
+        except json.JSONDecodeError as e:
+            raise InvalidImport(str(e)) from e
+        if not isinstance(content, dict) or not all(
+            isinstance(data, dict) for data in content.values()
+        ):
+            raise InvalidImport("expected an object of stores objects")
+        for name, data in content.items():
+            for field, value in data.items():
+                # Numbers and booleans are kept as written in json
+                if not isinstance(value, (str, int, float)):
+                    raise InvalidImport(
+                        f"{name}.{field} must be a string, a number or a boolean"
+                    )
+                stores.setdefault(name, {})[field] = (
+                    value if isinstance(value, str) else json.dumps(value)
+                )
+    else:
+        reader = csv.reader(file)
+        for row in reader:
+            if not row or row == ["store", "field", "value"]:
+                continue
+            if len(row) != 3:
+                raise InvalidImport(
+                    f"line {reader.line_num} has {len(row)} columns instead of store,field,value"
+                )
+            name, field, value = row
+            stores.setdefault(name, {})[field] = value
+    return stores
+
+
+def import_stores(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Create or update many stores from a file, in one transaction.
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept three args:
+        - file: The file to import, '-' for stdin
+        - format: env, json or csv. Guessed from the file extension if not set
+        - store: The store name, for env files only
+    """
+    file_format = args.format
+    if file_format is None and args.file != "-":
+        # A file named '.env' has no suffix but its name
+        path = pathlib.Path(args.file)
+        file_format = (path.suffix or path.name).lstrip(".")
+    if file_format not in ["env", "json", "csv"]:
+        print("Unknown format, use --format")
+        exit(1)
+    if file_format == "env" and args.store is None:
+        print("The store name is required for env files, use --store")
+        exit(1)
+
+    try:
+        if args.file == "-":
+            stores = _read_import(sys.stdin, file_format, args.store)
+        else:
+            with open(args.file, newline="") as f:
+                stores = _read_import(f, file_format, args.store)
+    except InvalidImport as e:
+        print(e)
+        exit(1)
+
+    try:
+        created, updated = ssm.import_stores(
+            [Store(name, data) for name, data in stores.items()]
+        )
+    except (NoIdentities, NoIdentityForStoreFound) as e:
+        print(e)
+        exit(1)
+
+    for name in created:
+        print(f"Created: {name}")
+    for name in updated:
+        print(f"Updated: {name}")
+
+
+def find(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Find the owned stores having a field, without decrypting them.
+    The field index must be enabled with 'secret-store store reindex'
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept one arg:
+        - field: The field name to look for
+    """
+    for store_name in ssm.find_stores_names(args.field):
+        print(store_name)
+
+
+def reindex(_, ssm: "SecretStoreManager"):
+    """
+    Enable the field index and index all owned stores
+
+    :param _: unused args
+    :param ssm: The SecretStoreManager
+    """
+    try:
+        print(f"Indexed {ssm.reindex()} stores")
+    except (NoIdentities, NoIdentityForStoreFound) as e:
+        print(e)
+        exit(1)
+
+
 def add_store_commands(parser: "ArgumentParser"):
     """
     Add all store related commands to the root parser
@@ -147,30 +382,115 @@ def add_store_commands(parser: "ArgumentParser"):
     subparsers = parser.add_subparsers()
 
     new_parser = subparsers.add_parser("new", help="Create a new store")
-    new_parser.add_argument("name", help="The name of the store")
+    complete(
+        new_parser.add_argument("name", help="The name of the store"),
+        STORES,
+    )
     new_parser.add_argument("field", help="Set a specific field")
     new_parser.add_argument(
         "-s", "--secret", action="store_true", help="Do not display the value"
     )
+    new_parser.add_argument(
+        "--ttl",
+        type=positive_int,
+        help="Expire the field after this number of seconds, see store expire",
+    )
 
     new_parser.set_defaults(f=new)
 
     show_parser = subparsers.add_parser("show", help="Show the store data")
-    show_parser.add_argument("name", type=str, help="The name of the store")
+    complete(
+        show_parser.add_argument("name", type=str, help="The name of the store"),
+        STORES,
+    )
     show_parser.add_argument("--json", action="store_true", help="Display as json")
     show_parser.add_argument("--field", type=str, help="Print the raw field")
+    show_parser.add_argument(
+        "--version", type=int, help="Show a previous version, see store history"
+    )
     show_parser.set_defaults(f=show)
 
+    history_parser = subparsers.add_parser(
+        "history", help="List the versions of a store"
+    )
+    complete(
+        history_parser.add_argument("name", type=str, help="The name of the store"),
+        STORES,
+    )
+    history_parser.set_defaults(f=history)
+
+    prune_parser = subparsers.add_parser(
+        "prune", help="Delete the old versions of all stores"
+    )
+    prune_parser.add_argument(
+        "--keep",
+        type=int,
+        default=10,
+        help="The number of versions to keep per store, 10 per default",
+    )
+    prune_parser.set_defaults(f=prune)
+
+    expire_parser = subparsers.add_parser(
+        "expire", help="Remove the expired fields of all stores"
+    )
+    expire_parser.set_defaults(f=expire)
+
     list_parser = subparsers.add_parser("list", help="List owned stores")
     list_parser.set_defaults(f=list_stores)
 
     delete_parser = subparsers.add_parser("rm", help="Remove a store")
-    delete_parser.add_argument("name", type=str, help="The name of the store")
+    complete(
+        delete_parser.add_argument("name", type=str, help="The name of the store"),
+        STORES,
+    )
     delete_parser.set_defaults(f=delete)
 
     share_parser = subparsers.add_parser(
         "share", help="Share the store with an identity"
     )
-    share_parser.add_argument("name", type=str, help="The name of the store")
-    share_parser.add_argument("fingerprint", type=str, help="The identity fingerprint")
+    complete(
+        share_parser.add_argument("name", type=str, help="The name of the store"),
+        STORES,
+    )
+    complete(
+        share_parser.add_argument(
+            "fingerprint", type=str, nargs="?", help="The identity fingerprint"
+        ),
+        IDENTITIES,
+    )
+    share_parser.add_argument(
+        "--group", type=str, help="Share with a group instead of an identity"
+    )
     share_parser.set_defaults(f=share)
+
+    import_parser = subparsers.add_parser(
+        "import", help="Create or update stores from a .env, json or csv file"
+    )
+    import_parser.add_argument(
+        "file", nargs="?", default="-", help="The file to import, stdin per default"
+    )
+    import_parser.add_argument(
+        "--format",
+        choices=["env", "json", "csv"],
+        help="The file format. Guessed from the file extension if not set",
+    )
+    complete(
+        import_parser.add_argument(
+            "--store", type=str, help="The name of the store, for env files only"
+        ),
+        STORES,
+    )
+    import_parser.set_defaults(f=import_stores)
+
+    find_parser = subparsers.add_parser(
+        "find", help="Find the stores having a field, using the field index"
+    )
+    find_parser.add_argument(
+        "--field", type=str, required=True, help="The field name to look for"
+    )
+    find_parser.set_defaults(f=find)
+
+    reindex_parser = subparsers.add_parser(
+        "reindex", help="Enable the field index and index all owned stores"
+    )
+    reindex_parser.set_defaults(f=reindex)
@@ -0,0 +1,76 @@
+import sys
+from typing import TYPE_CHECKING
+
+from secretstore.exceptions import InvalidBackup
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from secretstore.ssm import SecretStoreManager
+
+
+def export_changes(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Export the changes made after a change number.
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept two args:
+        - file: The changes file path, '-' for stdout
+        - since: Export the changes made after this change number
+    """
+    if args.file == "-":
+        until = ssm.export_changes(sys.stdout.buffer, args.since)
+    else:
+        with open(args.file, "wb") as f:
+            until = ssm.export_changes(f, args.since)
+    print(f"Exported up to change {until}", file=sys.stderr)
+
+
+def apply_changes(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Apply the changes exported from another database.
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept one arg:
+        - file: The changes file path, '-' for stdin
+    """
+    try:
+        if args.file == "-":
+            until = ssm.apply_changes(sys.stdin.buffer)
+        else:
+            with open(args.file, "rb") as f:
+                until = ssm.apply_changes(f)
+    except InvalidBackup as e:
+        print(e)
+        exit(1)
+    print(f"Applied up to change {until}")
+
+
+def add_sync_commands(parser: "ArgumentParser"):
+    """
+    Add all sync related commands to the root parser
+
+    :param parser: The parser which all the subparsers will be added
+    """
+    subparsers = parser.add_subparsers()
+
+    export_parser = subparsers.add_parser(
+        "export", help="Export the changes made after a change number"
+    )
+    export_parser.add_argument("file", help="The changes file path, '-' for stdout")
+    export_parser.add_argument(
+        "--since",
+        type=int,
+        default=0,
+        help="Export the changes made after this change number",
+    )
+    export_parser.set_defaults(f=export_changes)
+
+    apply_parser = subparsers.add_parser(
+        "apply", help="Apply the changes exported from another database"
+    )
+    apply_parser.add_argument("file", help="The changes file path, '-' for stdin")
+    apply_parser.set_defaults(f=apply_changes)
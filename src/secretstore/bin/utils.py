@@ -1,3 +1,10 @@
+from argparse import ArgumentTypeError
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argparse import Action
+
+
 def yes(message: str) -> bool:
     """
     Display the message for a yes no input
@@ -5,3 +12,30 @@ def yes(message: str) -> bool:
     :return: True if the response is yes, otherwise False
     """
     return input(f"{message} (y/n) ").lower() in ["yes", "y"]
+
+
+def positive_int(value: str) -> int:
+    """
+    Argument type of the strictly positive integers
+
+    :return: The integer value
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise ArgumentTypeError(f"'{value}' is not a positive integer")
+    return number
+
+
+def complete(action: "Action", values: str) -> "Action":
+    """
+    Complete an argument with a cached list in the generated shell completion scripts
+
+    :param action: The argument, as returned by add_argument
+    :param values: The cached list, secretstore.completion.STORES or IDENTITIES
+    :return: The argument
+    """
+    action.complete = values
+    return action
@@ -0,0 +1,66 @@
+import json
+from typing import TYPE_CHECKING
+
+from secretstore.bin.utils import complete
+from secretstore.completion import STORES
+from secretstore.exceptions import NoIdentityForStoreFound
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
+    from secretstore.ssm import SecretStoreManager
+
+
+def watch(args: "Namespace", ssm: "SecretStoreManager"):
+    """
+    Print the names of the stores changed by other processes, one per line.
+    Stores are decrypted only if asked.
+
+    :param args: The cli args
+    :param ssm: The SecretStoreManager
+
+    accept three args:
+        - names: The stores to watch. All stores if empty
+        - interval: The time between two checks, in seconds
+        - decrypt: Print a json line with the store data instead of its name
+    """
+    watcher = ssm.watch_stores(args.names or None)
+    try:
+        for names in watcher.watch(args.interval):
+            for name in names:
+                if not args.decrypt:
+                    print(name, flush=True)
+                    continue
+                try:
+                    store = ssm.get_store(name)
+                except NoIdentityForStoreFound:
+                    continue
+                data = None if store is None else store.data
+                print(json.dumps({"name": name, "data": data}), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+def add_watch_commands(parser: "ArgumentParser"):
+    """
+    Add the watch command arguments
+
+    :param parser: The watch parser
+    """
+    complete(
+        parser.add_argument(
+            "names", nargs="*", help="The stores to watch, all per default"
+        ),
+        STORES,
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="The time between two checks, in seconds",
+    )
+    parser.add_argument(
+        "--decrypt",
+        action="store_true",
+        help="Print the changed stores data as json lines. Data is null for deleted stores",
+    )
+    parser.set_defaults(f=watch, keep_unlocked=True)
@@ -0,0 +1,42 @@
+class SecretBuffer:
+    """
+    Mutable buffer for secret data. Unlike bytes and str, its content can be wiped once not needed anymore.
+    Views handed out are released when the buffer is wiped, so they cannot be used afterwards.
+    """
+
+    def __init__(self, data: int | bytes | bytearray):
+        """
+        Initialize the buffer
+
+        :param data: The size of the zeroed buffer to allocate, or the data to copy in the buffer
+        """
+        self._buffer = bytearray(data)
+        self._views: list[memoryview] = []
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def view(self, start: int = 0, end: int | None = None) -> memoryview:
+        """
+        Return a view of the buffer without copying it
+
+        :param start: The start of the view
+        :param end: The end of the view (excluded). The end of the buffer if None
+        :return: A writable view, valid until the buffer is wiped
+        """
+        view = memoryview(self._buffer)[start:end]
+        self._views.append(view)
+        return view
+
+    def wipe(self):
+        """Release all the views and overwrite the buffer with zeros"""
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self._buffer[:] = bytes(len(self._buffer))
+
+    def __enter__(self) -> "SecretBuffer":
+        return self
+
+    def __exit__(self, *_):
+        self.wipe()
@@ -0,0 +1,3 @@
+from secretstore.changelog.dao import ChangeLogDAO
+
+__all__ = ["ChangeLogDAO"]
@@ -0,0 +1,72 @@
+from typing import TYPE_CHECKING
+
+from secretstore.utils import Singleton
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+_TABLE_NAME = "changelog"
+_TABLE = f"""create table if not exists
+ {_TABLE_NAME}(
+    seq integer primary key autoincrement,
+    table_name text,
+    key text
+)"""
+
+
+class ChangeLogDAO(metaclass=Singleton):
+    """
+    Data Access Object for the change log.
+    The change log is append only, each change gets a monotonically increasing sequence number.
+    """
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the DAO and create the table if it doesn't exist
+
+        :param connection: The sqlite connection to use
+        """
+        self._connection = connection
+        self._connection.execute(_TABLE)
+
+    def append(self, table_name: str, key: str):
+        """
+        Record a change. Nothing is committed here, the change is part of the caller transaction.
+
+        :param table_name: The table where the change happened
+        :param key: The key of the changed rows
+        """
+        self._connection.execute(
+            f"insert into {_TABLE_NAME}(table_name, key) values (?,?)",
+            (table_name, key),
+        )
+
+    def append_many(self, table_name: str, keys: list[str]):
+        """
+        Record many changes on the same table. Nothing is committed here, the changes are part of the caller transaction.
+
+        :param table_name: The table where the changes happened
+        :param keys: The keys of the changed rows
+        """
+        self._connection.executemany(
+            f"insert into {_TABLE_NAME}(table_name, key) values (?,?)",
+            [(table_name, key) for key in keys],
+        )
+
+    def append_table(self, table_name: str, key_column: str):
+        """
+        Record a change for every key of a table. Nothing is committed here, the changes are part of the caller transaction.
+
+        :param table_name: The table where the changes happened
+        :param key_column: The column of the table holding the keys
+        """
+        self._connection.execute(
+            f"insert into {_TABLE_NAME}(table_name, key) select distinct ?, {key_column} from {table_name}",
+            (table_name,),
+        )
+
+    def last_seq(self) -> int:
+        """Return the last sequence number, 0 if no change was recorded"""
+        return self._connection.execute(
+            f"select coalesce(max(seq), 0) from {_TABLE_NAME}"
+        ).fetchone()[0]
@@ -0,0 +1,58 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from secretstore.exceptions import SSHKeyNotFound
+
+if TYPE_CHECKING:
+    from secretstore.ssm import SecretStoreManager
+
+# The cached lists, one file each, one value per line
+STORES = "stores"
+IDENTITIES = "identities"
+
+
+def cache_directory() -> Path:
+    """Return the per user completion cache directory, next to the database"""
+    return Path.home() / ".local" / "secret-store" / "completion"
+
+
+def _write(path: Path, values: list[str]):
+    """Replace the file atomically, so a completion never reads half a list"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.writelines(f"{value}\n" for value in values)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def refresh_cache(
+    ssm: "SecretStoreManager", directory: Path | None = None
+) -> dict[str, int]:
+    """
+    Write the names of the stores shared with the ssh agent keys and the fingerprints of all identities.
+    Only the fingerprints of the agent keys and the guardians are read, no identity is unlocked.
+    The names may include stores the identities can't decrypt anymore, it is good enough for completion.
+
+    :param ssm: The SecretStoreManager
+    :param directory: The cache directory. The per user one per default
+    :return: The number of values cached, by list
+    """
+    directory = directory if directory is not None else cache_directory()
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    try:
+        stores = ssm.list_stores_name_based_ssh_agent()
+    except SSHKeyNotFound:
+        stores = []
+    values = {
+        STORES: sorted(stores),
+        IDENTITIES: sorted(ssm.identity_manager.get_fingerprints()),
+    }
+    for name, lines in values.items():
+        _write(directory / name, lines)
+    return {name: len(lines) for name, lines in values.items()}
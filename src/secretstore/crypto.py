@@ -1,16 +1,25 @@
 import os
+from typing import TYPE_CHECKING
 
+import pyhpke
+from Crypto.Cipher import ChaCha20_Poly1305
+from Crypto.Random import get_random_bytes
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from paramiko.agent import AgentKey
 
+if TYPE_CHECKING:
+    from secretstore.identity.entity import PrivateIdentity, PublicIdentity
+
+WRAP_NONCE_SIZE = 12
+
 
 class EncryptionPack:
     SEED_SIZE = 16
     ENCRYPTION_KEY_SIZE = 32
     IV_SIZE = 16
 
-    def __init__(self, key: "AgentKey", seed: bytes):
+    def __init__(self, key: "AgentKey", seed: bytes, signature: bytes | None = None):
         r"""
         Generate all the necessary to encrypt / decrypt with symmetric from a AgentKey
 
@@ -19,6 +28,7 @@ class EncryptionPack:
 
         :param seed: The seed used for the key derivation
         :param key: The key to sign the challenge.
+        :param signature: The signature of the seed by the key, when already requested to the agent
         """
         self.seed = seed
 
@@ -28,7 +38,9 @@ class EncryptionPack:
             salt=self.seed,
             iterations=390000,
         )
-        kdf_key = kdf.derive(key.sign_ssh_data(seed))
+        if signature is None:
+            signature = key.sign_ssh_data(seed)
+        kdf_key = kdf.derive(signature)
         self.encryption_key = kdf_key[: EncryptionPack.ENCRYPTION_KEY_SIZE]
         self.iv = kdf_key[EncryptionPack.ENCRYPTION_KEY_SIZE :]
 
@@ -43,11 +55,98 @@ class EncryptionPack:
         return EncryptionPack(key, os.urandom(EncryptionPack.SEED_SIZE))
 
     @staticmethod
-    def from_seed(key: "AgentKey", seed: bytes) -> "EncryptionPack":
+    def from_seed(
+        key: "AgentKey", seed: bytes, signature: bytes | None = None
+    ) -> "EncryptionPack":
         """
         Create an encryptionPack with a seed.
 
         :param key: The key to sign the challenge:
         :param seed: The seed used for the key derivation
+        :param signature: The signature of the seed by the key, when already requested to the agent
         """
-        return EncryptionPack(key, seed)
+        return EncryptionPack(key, seed, signature)
+
+
+def _get_hpke_cipher_suite() -> pyhpke.CipherSuite:
+    """Return the cipher suite to use for Hybrid Public Key Encryption"""
+    return pyhpke.CipherSuite.new(
+        pyhpke.KEMId.DHKEM_P256_HKDF_SHA256,
+        pyhpke.KDFId.HKDF_SHA256,
+        pyhpke.AEADId.AES256_GCM,
+    )
+
+
+def hpke_seal(identity: "PublicIdentity", data: bytes) -> tuple[bytes, bytes]:
+    """
+    Encrypt data with the public key of an identity.
+    Because pycryptodome doesn't support HPKE, using this very secure lib
+    https://github.com/dajiaji/pyhpke
+
+    :param identity: The identity to encrypt the data for
+    :param data: The data to encrypt
+    :return: The KEM encapsulation and the ciphertext
+    """
+    pub_hpke_key = pyhpke.KEMKey.from_pem(identity.public_key.export_key(format="PEM"))
+    aead_enc, sender_context = _get_hpke_cipher_suite().create_sender_context(
+        pub_hpke_key
+    )
+    return aead_enc, sender_context.seal(data)
+
+
+def hpke_open(
+    private_identity: "PrivateIdentity", aead_enc: bytes, ciphertext: bytes
+) -> bytes:
+    """
+    Decrypt data encrypted by hpke_seal
+
+    :param private_identity: The identity the data was encrypted for
+    :param aead_enc: The KEM encapsulation
+    :param ciphertext: The encrypted data
+    :return: The decrypted data
+    """
+    priv_hpke_key = pyhpke.KEMKey.from_pem(
+        private_identity.private_key.export_key(format="PEM")
+    )
+    recipient_context = _get_hpke_cipher_suite().create_recipient_context(
+        aead_enc, priv_hpke_key
+    )
+    return recipient_context.open(ciphertext)
+
+
+def wrap_key(kek: bytes, store_name: str, owner: str, key: bytes) -> bytes:
+    """
+    Encrypt a store key with a key encryption key. The store and the owner are authenticated with the key.
+
+    :param kek: The key encryption key
+    :param store_name: The store linked to the key
+    :param owner: The owner of the key encryption key (identity fingerprint or group)
+    :param key: The store key
+    :return: The nonce, the encrypted key and the tag
+    """
+    nonce = get_random_bytes(WRAP_NONCE_SIZE)
+    cipher = ChaCha20_Poly1305.new(key=kek, nonce=nonce)
+    cipher.update(_associated_data(store_name, owner))
+    ciphertext, tag = cipher.encrypt_and_digest(key)
+    return nonce + ciphertext + tag
+
+
+def unwrap_key(kek: bytes, store_name: str, owner: str, wrapped: bytes) -> bytes:
+    """
+    Decrypt a store key encrypted by wrap_key
+
+    :param kek: The key encryption key
+    :param store_name: The store linked to the key
+    :param owner: The owner of the key encryption key (identity fingerprint or group)
+    :param wrapped: The nonce, the encrypted key and the tag
+    :return: The store key
+    """
+    nonce = wrapped[:WRAP_NONCE_SIZE]
+    ciphertext, tag = wrapped[WRAP_NONCE_SIZE:-16], wrapped[-16:]
+    cipher = ChaCha20_Poly1305.new(key=kek, nonce=nonce)
+    cipher.update(_associated_data(store_name, owner))
+    return cipher.decrypt_and_verify(ciphertext, tag)
+
+
+def _associated_data(store_name: str, owner: str) -> bytes:
+    return f"{store_name}\0{owner}".encode()
@@ -11,3 +11,58 @@ class NoIdentities(Exception):
 class NoIdentityForStoreFound(Exception):
     def __init__(self, store_name: str):
         super().__init__(f"No identity found for {store_name}")
+
+
+class InvalidBackup(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"Invalid backup: {reason}")
+
+
+class NoIdentityForGroupFound(Exception):
+    def __init__(self, group_name: str):
+        super().__init__(f"No identity found for the group {group_name}")
+
+
+class GroupAlreadyExists(Exception):
+    def __init__(self, group_name: str):
+        super().__init__(f"The group {group_name} already exists")
+
+
+class InvalidSnapshot(Exception):
+    def __init__(self, path: str):
+        super().__init__(f"{path} is not a secret-store snapshot")
+
+
+class UnknownReferences(Exception):
+    def __init__(self, references: list[str]):
+        super().__init__(f"Unknown references: {', '.join(references)}")
+
+
+class AlreadyExists(Exception):
+    def __init__(self, key: str):
+        super().__init__(f"{key} already exists")
+
+
+class UnsupportedBackend(Exception):
+    def __init__(self, operation: str):
+        super().__init__(f"{operation} is only supported by the sqlite backend")
+
+
+class InvalidRequest(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"Invalid request: {reason}")
+
+
+class InvalidImport(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"Invalid import file: {reason}")
+
+
+class CorruptedStore(Exception):
+    def __init__(self, name: str):
+        super().__init__(f"The data of the store '{name}' is corrupted")
+
+
+class AuditEventsNotWritten(Exception):
+    def __init__(self, count: int, reason: object):
+        super().__init__(f"{count} audit events could not be written: {reason}")
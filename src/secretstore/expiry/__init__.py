@@ -0,0 +1,4 @@
+from secretstore.expiry.dao import ExpiryDAO
+from secretstore.expiry.manager import ExpiryManager
+
+__all__ = ["ExpiryDAO", "ExpiryManager"]
@@ -0,0 +1,91 @@
+from typing import TYPE_CHECKING
+
+from secretstore.changelog import ChangeLogDAO
+from secretstore.utils import Singleton, transaction
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+_TABLE_NAME = "field_expiry"
+_TABLE = f"""create table if not exists
+ {_TABLE_NAME}(
+    store_name text,
+    token blob,
+    expires_at integer,
+    primary key (store_name, token)
+) without rowid"""
+_EXPIRES_AT_INDEX = (
+    f"create index if not exists {_TABLE_NAME}_expires_at on {_TABLE_NAME}(expires_at)"
+)
+
+
+class ExpiryDAO(metaclass=Singleton):
+    """Data Access Object for the fields expiry times."""
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the DAO and create the table if it doesn't exist
+
+        :param connection: The sqlite connection to use
+        """
+        self._connection = connection
+        self._connection.execute(_TABLE)
+        self._connection.execute(_EXPIRES_AT_INDEX)
+        self._changelog = ChangeLogDAO(connection)
+
+    def find(self, store_name: str) -> dict[bytes, int]:
+        """
+        Find the expiry times of a store fields
+
+        :param store_name: The store name
+        :return: The expiry times by field token
+        """
+        return dict(
+            self._connection.execute(
+                f"select token, expires_at from {_TABLE_NAME} where store_name=?",
+                [store_name],
+            )
+        )
+
+    def replace(self, store_name: str, expiries: dict[bytes, int]):
+        """
+        Replace the expiry times of a store fields
+
+        :param store_name: The store name
+        :param expiries: The new expiry times by field token
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(f"delete from {_TABLE_NAME} where store_name=?", [store_name])
+            conn.executemany(
+                f"insert into {_TABLE_NAME} values (?,?,?)",
+                [
+                    (store_name, token, expires_at)
+                    for token, expires_at in expiries.items()
+                ],
+            )
+            self._changelog.append(_TABLE_NAME, store_name)
+
+    def find_expired_stores_names(self, now: int) -> list[str]:
+        """
+        Find the stores having expired fields, using the expiry time index
+
+        :param now: The current time, in seconds since the epoch
+        :return: A list of stores names
+        """
+        return [
+            row[0]
+            for row in self._connection.execute(
+                f"select distinct store_name from {_TABLE_NAME} where expires_at <= ?",
+                [now],
+            )
+        ]
+
+    def delete_store_expiries(self, store_name: str):
+        """
+        Delete the expiry times of a store
+
+        :param store_name: The store name
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(f"delete from {_TABLE_NAME} where store_name=?", [store_name])
+            self._changelog.append(_TABLE_NAME, store_name)
@@ -0,0 +1,97 @@
+import hmac
+from hashlib import sha256
+from typing import TYPE_CHECKING, Iterable
+
+from secretstore.expiry.dao import ExpiryDAO
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+    from secretstore.store.entity import Store
+
+
+class ExpiryManager:
+    """
+    Expiry Manager. Keeps the expiry time of the stores fields, outside of the encrypted data,
+    so the stores having expired fields are found without decrypting any store.
+    Field names are saved as HMAC tokens made with the store key: only the identities able to decrypt a store
+    can tell which of its fields expire.
+    """
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the Manager.
+
+        :param connection: The sqlite connection to use
+        """
+        self._dao = ExpiryDAO(connection)
+
+    def get_expiries(
+        self, store_name: str, fields: Iterable[str], key: bytes
+    ) -> dict[str, int]:
+        """
+        Return the expiry time of the fields which have one
+
+        :param store_name: The store name
+        :param fields: The fields of the decrypted store
+        :param key: The store encryption key
+        :return: The expiry times by field, in seconds since the epoch
+        """
+        return find_field_expiries(self._dao.find(store_name), fields, key)
+
+    def save_expiries(self, store: "Store", key: bytes):
+        """
+        Replace the expiry times of a store by the ones of its current fields. Nothing is written if they didn't change
+
+        :param store: The decrypted store, with its expiry times
+        :param key: The store encryption key
+        """
+        tokens = {
+            _token(key, field): expires_at
+            for field, expires_at in store.expires_at.items()
+            if field in store.data
+        }
+        if tokens != self._dao.find(store.name):
+            self._dao.replace(store.name, tokens)
+
+    def find_expired_stores_names(self, now: int) -> list[str]:
+        """
+        Find the stores having expired fields. Nothing is decrypted
+
+        :param now: The current time, in seconds since the epoch
+        :return: A list of stores names
+        """
+        return self._dao.find_expired_stores_names(now)
+
+    def delete_store_expiries(self, store_name: str):
+        """
+        Delete the expiry times of a store
+
+        :param store_name: The store name
+        """
+        self._dao.delete_store_expiries(store_name)
+
+
+def find_field_expiries(
+    tokens: dict[bytes, int], fields: Iterable[str], key: bytes
+) -> dict[str, int]:
+    """
+    Match the expiry times saved by field token with the fields of a decrypted store
+
+    :param tokens: The expiry times by field token
+    :param fields: The fields of the decrypted store
+    :param key: The store encryption key
+    :return: The expiry times by field, in seconds since the epoch
+    """
+    if not tokens:
+        return {}
+    expiries = {}
+    for field in fields:
+        token = _token(key, field)
+        if token in tokens:
+            expiries[field] = tokens[token]
+    return expiries
+
+
+def _token(key: bytes, field: str) -> bytes:
+    """Compute the token of a field name. The prefix separates it from the other uses of the store key"""
+    return hmac.new(key, b"expiry\0" + field.encode(), sha256).digest()
@@ -0,0 +1,4 @@
+from secretstore.group.dao import GroupDAO
+from secretstore.group.manager import GroupManager
+
+__all__ = ["GroupDAO", "GroupManager"]
@@ -0,0 +1,220 @@
+from typing import TYPE_CHECKING
+
+from secretstore.changelog import ChangeLogDAO
+from secretstore.group.entity import GroupGuardian, GroupMember
+from secretstore.utils import Singleton, transaction
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+_TABLE_NAME = "groups"
+_TABLE = f"""create table if not exists
+ {_TABLE_NAME}(
+    name text,
+    identity_fingerprint text,
+    aead blob,
+    key blob,
+    primary key (name, identity_fingerprint)
+)"""
+_MEMBER_INDEX = f"create index if not exists {_TABLE_NAME}_member on {_TABLE_NAME}(identity_fingerprint)"
+
+_GUARDIANS_TABLE_NAME = "group_guardians"
+_GUARDIANS_TABLE = f"""create table if not exists
+ {_GUARDIANS_TABLE_NAME}(
+    store_name text,
+    group_name text,
+    key blob,
+    primary key (store_name, group_name)
+)"""
+_GROUP_INDEX = f"create index if not exists {_GUARDIANS_TABLE_NAME}_group on {_GUARDIANS_TABLE_NAME}(group_name)"
+
+
+class GroupDAO(metaclass=Singleton):
+    """Data Access Object for the groups members and the group guardians."""
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the DAO and create the tables if they don't exist
+
+        :param connection: The sqlite connection to use
+        """
+        self._connection = connection
+        self._connection.execute(_TABLE)
+        self._connection.execute(_MEMBER_INDEX)
+        self._connection.execute(_GUARDIANS_TABLE)
+        self._connection.execute(_GROUP_INDEX)
+        self._changelog = ChangeLogDAO(connection)
+
+    def exists(self, name: str) -> bool:
+        """Return True if the group has at least one member"""
+        return (
+            self._connection.execute(
+                f"select 1 from {_TABLE_NAME} where name=? limit 1", [name]
+            ).fetchone()
+            is not None
+        )
+
+    def find_member(self, name: str, fingerprints: list[str]) -> GroupMember | None:
+        """
+        Find the first member of a group among identities
+
+        :param name: The group name
+        :param fingerprints: The identities fingerprints
+        :return: The member or None if no identity is a member of the group
+        """
+        result = self._connection.execute(
+            f"select * from {_TABLE_NAME} where name=? and identity_fingerprint in ({','.join(['?']*len(fingerprints))}) limit 1",
+            [name, *fingerprints],
+        ).fetchone()
+        if result is None:
+            return None
+        return GroupMember(*result)
+
+    def find_groups(self, fingerprints: list[str]) -> dict[str, list[str]]:
+        """
+        Find the groups where identities are members
+
+        :param fingerprints: The identities fingerprints
+        :return: The members fingerprints of each group
+        """
+        groups: dict[str, list[str]] = {}
+        for name, fingerprint in self._connection.execute(
+            f"select name, identity_fingerprint from {_TABLE_NAME} where name in (select name from {_TABLE_NAME} where identity_fingerprint in ({','.join(['?']*len(fingerprints))})) order by name",
+            fingerprints,
+        ):
+            groups.setdefault(name, []).append(fingerprint)
+        return groups
+
+    def save_members(self, members: list[GroupMember]):
+        """
+        Save new members
+
+        :param members: The members to save
+        """
+        with transaction(self._connection) as conn:
+            conn.executemany(
+                f"insert into {_TABLE_NAME} values (?,?,?,?)",
+                [
+                    (m.group_name, m.identity_fingerprint, m.aead_enc, m.enc_key)
+                    for m in members
+                ],
+            )
+            self._changelog.append_many(
+                _TABLE_NAME, list(dict.fromkeys(m.group_name for m in members))
+            )
+
+    def rotate(
+        self,
+        name: str,
+        members: list[GroupMember],
+        guardians: list[GroupGuardian],
+    ):
+        """
+        Replace all the members and the guardians of a group, in one transaction
+
+        :param name: The group name
+        :param members: The new members
+        :param guardians: The new guardians
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(f"delete from {_TABLE_NAME} where name=?", [name])
+            conn.executemany(
+                f"insert into {_TABLE_NAME} values (?,?,?,?)",
+                [
+                    (m.group_name, m.identity_fingerprint, m.aead_enc, m.enc_key)
+                    for m in members
+                ],
+            )
+            conn.executemany(
+                f"update {_GUARDIANS_TABLE_NAME} set key=? where store_name=? and group_name=?",
+                [(g.enc_key, g.store_name, g.group_name) for g in guardians],
+            )
+            self._changelog.append(_TABLE_NAME, name)
+            self._changelog.append_many(
+                _GUARDIANS_TABLE_NAME, [g.store_name for g in guardians]
+            )
+
+    def delete_group(self, name: str):
+        """
+        Delete all the members and the guardians of a group
+
+        :param name: The group name
+        """
+        with transaction(self._connection) as conn:
+            store_names = [g.store_name for g in self.find_group_guardians(name)]
+            conn.execute(f"delete from {_TABLE_NAME} where name=?", [name])
+            conn.execute(
+                f"delete from {_GUARDIANS_TABLE_NAME} where group_name=?", [name]
+            )
+            self._changelog.append(_TABLE_NAME, name)
+            self._changelog.append_many(_GUARDIANS_TABLE_NAME, store_names)
+
+    def find_group_guardians(self, name: str) -> list[GroupGuardian]:
+        """
+        Find all the guardians of a group
+
+        :param name: The group name
+        :return: The guardians
+        """
+        return [
+            GroupGuardian(*row)
+            for row in self._connection.execute(
+                f"select * from {_GUARDIANS_TABLE_NAME} where group_name=?", [name]
+            )
+        ]
+
+    def find_store_guardians(
+        self, store_name: str, fingerprints: list[str]
+    ) -> list[tuple[GroupGuardian, GroupMember]]:
+        """
+        Find the guardians of a store for the groups where identities are members
+
+        :param store_name: The store name
+        :param fingerprints: The identities fingerprints
+        :return: Each guardian with the member able to unwrap it
+        """
+        cur = self._connection.execute(
+            f"select g.*, m.* from {_GUARDIANS_TABLE_NAME} g join {_TABLE_NAME} m on m.name = g.group_name where g.store_name=? and m.identity_fingerprint in ({','.join(['?']*len(fingerprints))})",
+            [store_name, *fingerprints],
+        )
+        return [(GroupGuardian(*row[:3]), GroupMember(*row[3:])) for row in cur]
+
+    def find_stores_names(self, fingerprints: list[str]) -> list[str]:
+        """
+        Find all stores shared with the groups where identities are members
+
+        :param fingerprints: The identities fingerprints
+        :return: A list of stores names
+        """
+        return [
+            row[0]
+            for row in self._connection.execute(
+                f"select distinct g.store_name from {_GUARDIANS_TABLE_NAME} g join {_TABLE_NAME} m on m.name = g.group_name where m.identity_fingerprint in ({','.join(['?']*len(fingerprints))})",
+                fingerprints,
+            )
+        ]
+
+    def save_guardian(self, guardian: GroupGuardian):
+        """
+        Save a new group guardian
+
+        :param guardian: The guardian to save
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(
+                f"insert into {_GUARDIANS_TABLE_NAME} values (?,?,?)",
+                (guardian.store_name, guardian.group_name, guardian.enc_key),
+            )
+            self._changelog.append(_GUARDIANS_TABLE_NAME, guardian.store_name)
+
+    def delete_store_guardians(self, store_name: str):
+        """
+        Delete all the group guardians of a store
+
+        :param store_name: The store name
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(
+                f"delete from {_GUARDIANS_TABLE_NAME} where store_name=?", [store_name]
+            )
+            self._changelog.append(_GUARDIANS_TABLE_NAME, store_name)
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class GroupMember:
+    """
+    GroupMember dataclass. Each member holds the group key encrypted with its public key.
+    Fields:
+        - group_name: the name of the group
+        - identity_fingerprint: the fingerprint of the member identity
+        - aead_enc: The authenticated encryption with additional data encapsulation
+        - enc_key: The encrypted group key
+    """
+
+    group_name: str
+    identity_fingerprint: str
+    aead_enc: bytes
+    enc_key: bytes
+
+
+@dataclass
+class GroupGuardian:
+    """
+    GroupGuardian dataclass. Contains a store encryption key wrapped with a group key.
+    Fields:
+        - store_name: the name of the store linked to this guardian
+        - group_name: the name of the group linked to this guardian
+        - enc_key: The wrapped encryption key
+    """
+
+    store_name: str
+    group_name: str
+    enc_key: bytes
@@ -0,0 +1,213 @@
+from typing import TYPE_CHECKING
+
+from Crypto.Random import get_random_bytes
+
+from secretstore.crypto import hpke_open, hpke_seal, unwrap_key, wrap_key
+from secretstore.exceptions import GroupAlreadyExists, NoIdentityForGroupFound
+from secretstore.group.dao import GroupDAO
+from secretstore.group.entity import GroupGuardian, GroupMember
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+    from secretstore.identity.entity import PrivateIdentity, PublicIdentity
+
+
+class GroupManager:
+    """
+    Group Manager. Handles all group related actions.
+    A group key is encrypted with the public key of each member.
+    A store shared with a group has its encryption key wrapped once with the group key,
+    so adding a member doesn't depend on the number of shared stores.
+    """
+
+    KEY_SIZE = 32
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the Manager.
+
+        :param connection: The sqlite connection to use
+        """
+        self._dao = GroupDAO(connection)
+        self._keys: dict[str, bytes] = {}
+
+    def _open_group_key(
+        self, member: GroupMember, private_identities: list["PrivateIdentity"]
+    ) -> bytes:
+        """Decrypt the group key of a member. Decrypted keys are kept for the manager lifetime"""
+        if member.group_name not in self._keys:
+            identity = next(
+                i
+                for i in private_identities
+                if i.fingerprint == member.identity_fingerprint
+            )
+            self._keys[member.group_name] = hpke_open(
+                identity, member.aead_enc, member.enc_key
+            )
+        return self._keys[member.group_name]
+
+    def get_group_key(
+        self, name: str, private_identities: list["PrivateIdentity"]
+    ) -> bytes:
+        """
+        Return the decrypted group key
+
+        :param name: The group name
+        :param private_identities: The identities to decrypt the key with
+        :return: The group key
+        """
+        member = self._dao.find_member(
+            name, [i.fingerprint for i in private_identities]
+        )
+        if member is None:
+            raise NoIdentityForGroupFound(name)
+        return self._open_group_key(member, private_identities)
+
+    def _seal_members(
+        self, name: str, identities: list["PublicIdentity"], key: bytes
+    ) -> list[GroupMember]:
+        """Encrypt the group key for each identity"""
+        members = []
+        for identity in identities:
+            aead_enc, enc_key = hpke_seal(identity, key)
+            members.append(GroupMember(name, identity.fingerprint, aead_enc, enc_key))
+        return members
+
+    def create_group(self, name: str, private_identities: list["PrivateIdentity"]):
+        """
+        Create a group with the private identities as members
+
+        :param name: The group name
+        :param private_identities: The first members of the group
+        """
+        if self._dao.exists(name):
+            raise GroupAlreadyExists(name)
+        key = get_random_bytes(GroupManager.KEY_SIZE)
+        self._dao.save_members(self._seal_members(name, private_identities, key))
+        self._keys[name] = key
+
+    def add_member(
+        self,
+        name: str,
+        identity: "PublicIdentity",
+        private_identities: list["PrivateIdentity"],
+    ) -> bool:
+        """
+        Add a member to a group. The user must be a member of the group
+
+        :param name: The group name
+        :param identity: The identity to add
+        :param private_identities: The identities of the user
+        :return: False if the identity was already a member of the group
+        """
+        key = self.get_group_key(name, private_identities)
+        if self._dao.find_member(name, [identity.fingerprint]) is not None:
+            return False
+        self._dao.save_members(self._seal_members(name, [identity], key))
+        return True
+
+    def rotate(
+        self,
+        name: str,
+        members: list["PublicIdentity"],
+        private_identities: list["PrivateIdentity"],
+    ):
+        """
+        Replace the members of a group with a new group key. Store keys are wrapped again with the new key.
+        If there is no member left, the group and its guardians are deleted.
+
+        :param name: The group name
+        :param members: The new members of the group
+        :param private_identities: The identities of the user, who must be a member of the group
+        """
+        old_key = self.get_group_key(name, private_identities)
+        self._keys.pop(name)
+        if len(members) == 0:
+            self._dao.delete_group(name)
+            return
+
+        key = get_random_bytes(GroupManager.KEY_SIZE)
+        guardians = [
+            GroupGuardian(
+                g.store_name,
+                name,
+                wrap_key(
+                    key,
+                    g.store_name,
+                    name,
+                    unwrap_key(old_key, g.store_name, name, g.enc_key),
+                ),
+            )
+            for g in self._dao.find_group_guardians(name)
+        ]
+        self._dao.rotate(name, self._seal_members(name, members, key), guardians)
+
+    def find_groups(
+        self, private_identities: list["PrivateIdentity"]
+    ) -> dict[str, list[str]]:
+        """
+        Find the groups where private identities are members
+
+        :param private_identities: The identities of the user
+        :return: The members fingerprints of each group
+        """
+        return self._dao.find_groups([i.fingerprint for i in private_identities])
+
+    def share_store(
+        self,
+        store_name: str,
+        key: bytes,
+        name: str,
+        private_identities: list["PrivateIdentity"],
+    ):
+        """
+        Share a store with a group. The user must be a member of the group
+
+        :param store_name: The store name
+        :param key: The store encryption key
+        :param name: The group name
+        :param private_identities: The identities of the user
+        """
+        group_key = self.get_group_key(name, private_identities)
+        self._dao.save_guardian(
+            GroupGuardian(store_name, name, wrap_key(group_key, store_name, name, key))
+        )
+
+    def get_store_encryption_key(
+        self, store_name: str, private_identities: list["PrivateIdentity"]
+    ) -> tuple[bytes, str] | None:
+        """
+        Retrieve a store encryption key through the groups of the private identities.
+
+        :param store_name: The store name
+        :param private_identities: The identities of the user
+        :return: The encryption key and the fingerprint of the member which opened it,
+            or None if the store is not shared with a group of the user
+        """
+        fingerprints = [i.fingerprint for i in private_identities]
+        for guardian, member in self._dao.find_store_guardians(
+            store_name, fingerprints
+        ):
+            group_key = self._open_group_key(member, private_identities)
+            key = unwrap_key(
+                group_key, store_name, guardian.group_name, guardian.enc_key
+            )
+            return key, member.identity_fingerprint
+        return None
+
+    def find_stores_names(self, identities: list["PublicIdentity"]) -> list[str]:
+        """
+        Find all stores shared with the groups of the identities. Nothing is decrypted.
+
+        :param identities: The identities of the user
+        :return: A list of stores names
+        """
+        return self._dao.find_stores_names([i.fingerprint for i in identities])
+
+    def delete_store_guardians(self, store_name: str):
+        """
+        Delete all the group guardians of a store
+
+        :param store_name: The name of the store
+        """
+        self._dao.delete_store_guardians(store_name)
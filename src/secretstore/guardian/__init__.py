@@ -1,4 +1,4 @@
-from secretstore.guardian.dao import GuardianDAO
+from secretstore.guardian.dao import AbstractGuardianDAO, GuardianDAO
 from secretstore.guardian.manager import GuardianManager
 
-__all__ = ["GuardianDAO", "GuardianManager"]
+__all__ = ["AbstractGuardianDAO", "GuardianDAO", "GuardianManager"]
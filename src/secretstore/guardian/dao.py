@@ -1,7 +1,11 @@
+import sqlite3
+from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
+from secretstore.changelog import ChangeLogDAO
+from secretstore.exceptions import AlreadyExists
 from secretstore.guardian.entity import Guardian
-from secretstore.utils import Singleton
+from secretstore.utils import Singleton, transaction
 
 if TYPE_CHECKING:
     from sqlite3 import Connection
@@ -17,7 +21,72 @@ _TABLE = f"""create table if not exists
 )"""
 
 
-class GuardianDAO(metaclass=Singleton):
+class AbstractGuardianDAO(ABC):
+    """Storage of the guardians, implemented by each backend."""
+
+    @abstractmethod
+    def find(self, store_name: str, identity_fingerprint: str) -> Guardian | None:
+        """
+        Find a guardian.
+
+        :param store_name: The linked store name
+        :param identity_fingerprint: The private identity fingerprint linked to the guardian
+        :return: The Guardian or None if nothing was found
+        """
+
+    @abstractmethod
+    def save(self, guardian: Guardian):
+        """
+        Save a new guardian. Saving a guardian that already exists raises AlreadyExists.
+
+        :param guardian: the guardian to save
+        """
+
+    @abstractmethod
+    def save_many(self, guardians: list[Guardian]):
+        """
+        Save new guardians in bulk. Backends with transactions don't commit, the caller owns the transaction.
+        Saving a guardian that already exists raises AlreadyExists.
+
+        :param guardians: the guardians to save
+        """
+
+    @abstractmethod
+    def find_identity_guardians(self, identity_fingerprint: str) -> list[Guardian]:
+        """
+        Find all the guardians of an identity
+
+        :param identity_fingerprint: The identity fingerprint
+        :return: The guardians
+        """
+
+    @abstractmethod
+    def update_many(self, guardians: list[Guardian]):
+        """
+        Update the encrypted keys of existing guardians
+
+        :param guardians: The guardians to update
+        """
+
+    @abstractmethod
+    def find_stores_names(self, fingerprints: list[str]) -> list[str]:
+        """
+        Find all stores related to the specified fingerprints.
+
+        :param fingerprints: The list of fingerprints
+        :return: The sorted stores names, without duplicates
+        """
+
+    @abstractmethod
+    def delete_store_guardians(self, store_name: str):
+        """
+        Delete all the guardians of a store
+
+        :param store_name: The store name
+        """
+
+
+class GuardianDAO(AbstractGuardianDAO, metaclass=Singleton):
     """Data Access Object for Guardian Object."""
 
     def __init__(self, connection: "Connection"):
@@ -28,6 +97,7 @@ class GuardianDAO(metaclass=Singleton):
         """
         self._connection = connection
         self._connection.execute(_TABLE)
+        self._changelog = ChangeLogDAO(connection)
 
     def find(self, store_name: str, identity_fingerprint: str) -> Guardian | None:
         """
@@ -52,15 +122,79 @@ class GuardianDAO(metaclass=Singleton):
 
         :param guardian: the guardian to save
         """
-        with self._connection as conn:
-            conn.execute(
+        with transaction(self._connection) as conn:
+            try:
+                conn.execute(
+                    f"insert into {_TABLE_NAME} values (?,?,?,?)",
+                    (
+                        guardian.store_name,
+                        guardian.identity_fingerprint,
+                        guardian.aead_enc,
+                        guardian.enc_key,
+                    ),
+                )
+            except sqlite3.IntegrityError as e:
+                raise AlreadyExists(
+                    f"{guardian.store_name}/{guardian.identity_fingerprint}"
+                ) from e
+            self._changelog.append(_TABLE_NAME, guardian.store_name)
+
+    def save_many(self, guardians: list[Guardian]):
+        """
+        Save new guardians in bulk. Nothing is committed, the caller owns the transaction.
+
+        :param guardians: the guardians to save
+        """
+        inserted = self._connection.total_changes
+        try:
+            self._connection.executemany(
                 f"insert into {_TABLE_NAME} values (?,?,?,?)",
-                (
-                    guardian.store_name,
-                    guardian.identity_fingerprint,
-                    guardian.aead_enc,
-                    guardian.enc_key,
-                ),
+                [
+                    (g.store_name, g.identity_fingerprint, g.aead_enc, g.enc_key)
+                    for g in guardians
+                ],
+            )
+        except sqlite3.IntegrityError as e:
+            # The rows are inserted in order, the failed one follows those inserted
+            failed = guardians[self._connection.total_changes - inserted]
+            raise AlreadyExists(
+                f"{failed.store_name}/{failed.identity_fingerprint}"
+            ) from e
+        self._changelog.append_many(
+            _TABLE_NAME, list(dict.fromkeys(g.store_name for g in guardians))
+        )
+
+    def find_identity_guardians(self, identity_fingerprint: str) -> list[Guardian]:
+        """
+        Find all the guardians of an identity
+
+        :param identity_fingerprint: The identity fingerprint
+        :return: The guardians
+        """
+        return [
+            Guardian(*row)
+            for row in self._connection.execute(
+                f"select * from {_TABLE_NAME} where identity_fingerprint=?",
+                [identity_fingerprint],
+            )
+        ]
+
+    def update_many(self, guardians: list[Guardian]):
+        """
+        Update the encrypted keys of existing guardians
+
+        :param guardians: The guardians to update
+        """
+        with transaction(self._connection) as conn:
+            conn.executemany(
+                f"update {_TABLE_NAME} set aead=?, key=? where store_name=? and identity_fingerprint=?",
+                [
+                    (g.aead_enc, g.enc_key, g.store_name, g.identity_fingerprint)
+                    for g in guardians
+                ],
+            )
+            self._changelog.append_many(
+                _TABLE_NAME, list(dict.fromkeys(g.store_name for g in guardians))
             )
 
     def find_stores_names(self, fingerprints: list[str]) -> list[str]:
@@ -79,5 +213,6 @@ class GuardianDAO(metaclass=Singleton):
         ]
 
     def delete_store_guardians(self, store_name: str):
-        with self._connection as conn:
+        with transaction(self._connection) as conn:
             conn.execute(f"delete from {_TABLE_NAME} where store_name=?", [store_name])
+            self._changelog.append(_TABLE_NAME, store_name)
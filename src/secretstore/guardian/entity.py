@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import ClassVar
 
 
 @dataclass
@@ -8,10 +9,13 @@ class Guardian:
     Fields:
         - store_name: the name of the store linked to this guardian
         - identity_fingerprint: the fingerprint of the private identity linked to this guardian
-        - aead_enc: The authenticated encryption with additional data encapsulation
+        - aead_enc: The authenticated encryption with additional data encapsulation.
+          Guardian.KEYRING when the key is wrapped with the identity keyring instead
         - enc_key: The encryption key
     """
 
+    KEYRING: ClassVar[bytes] = b""
+
     store_name: str
     identity_fingerprint: str
     aead_enc: bytes
@@ -1,10 +1,10 @@
 from typing import TYPE_CHECKING
 
-import pyhpke
-
-from secretstore.guardian.dao import GuardianDAO
+from secretstore.crypto import hpke_open, hpke_seal, unwrap_key, wrap_key
+from secretstore.guardian.dao import AbstractGuardianDAO, GuardianDAO
 from secretstore.guardian.entity import Guardian
 from secretstore.identity.entity import PrivateIdentity
+from secretstore.keyring import KeyringManager
 
 if TYPE_CHECKING:
     from sqlite3 import Connection
@@ -15,24 +15,20 @@ class GuardianManager:
     """
     Guardian Manager. Handles all Guardian related actions.
     A guardian contains the store encryption key for a specific identity. 
-    This key is encrypted with the public key of the identity.
+    This key is encrypted with the public key of the identity, or with its keyring if it has one.
     """
 
-    def __init__(self, connection: "Connection"):
+    def __init__(
+        self, connection: "Connection", dao: AbstractGuardianDAO | None = None
+    ):
         """
         Initialize the Manager.
 
         :param connection: The sqlite connection to use
+        :param dao: The guardian storage to use. The sqlite one per default
         """
-        self._dao = GuardianDAO(connection)
-
-    def _get_hpke_cipher_suite(self) -> pyhpke.CipherSuite:
-        """Return the cipher suite to use for Hybrid Public Key Encryption"""
-        return pyhpke.CipherSuite.new(
-            pyhpke.KEMId.DHKEM_P256_HKDF_SHA256,
-            pyhpke.KDFId.HKDF_SHA256,
-            pyhpke.AEADId.AES256_GCM,
-        )
+        self._dao = dao if dao is not None else GuardianDAO(connection)
+        self._keyring = KeyringManager(connection)
 
     def create_guardian(self, store_name: str, identity: "PublicIdentity", key: bytes):
         """
@@ -42,25 +38,42 @@ class GuardianManager:
         :param identity: The linked identity
         :param key: The key to securely store
         """
-        # Encrypt the key with the public identity
-        # Because pycryptodome doesn't support HPKE, using this very secure lib
-        # https://github.com/dajiaji/pyhpke
+        # Because the guardian is brand new, save it
+        self._dao.save(self.seal_guardian(store_name, identity, key))
 
-        # Create the guardian object ..
-        # KEM
-        pub_hpke_key = pyhpke.KEMKey.from_pem(
-            identity.public_key.export_key(format="PEM")
-        )
+    def seal_guardian(
+        self, store_name: str, identity: "PublicIdentity", key: bytes
+    ) -> Guardian:
+        """
+        Create a guardian without saving it.
+
+        :param store_name: The linked store name
+        :param identity: The linked identity
+        :param key: The key to securely store
+        :return: The guardian
+        """
+        # Wrap the key with the keyring when possible, it's cheaper to unwrap
+        if isinstance(identity, PrivateIdentity):
+            kek = self._keyring.get_key(identity)
+            if kek is not None:
+                return Guardian(
+                    store_name,
+                    identity.fingerprint,
+                    Guardian.KEYRING,
+                    wrap_key(kek, store_name, identity.fingerprint, key),
+                )
 
-        aead_enc, sender_context = self._get_hpke_cipher_suite().create_sender_context(
-            pub_hpke_key
-        )
-        ct_enc_key = sender_context.seal(key)
+        # Encrypt the key with the public identity
+        aead_enc, ct_enc_key = hpke_seal(identity, key)
+        return Guardian(store_name, identity.fingerprint, aead_enc, ct_enc_key)
 
-        guardian = Guardian(store_name, identity.fingerprint, aead_enc, ct_enc_key)
+    def save_guardians(self, guardians: list[Guardian]):
+        """
+        Save new guardians in bulk. Nothing is committed, the caller owns the transaction.
 
-        # Because the guardian is brand new, save it
-        self._dao.save(guardian)
+        :param guardians: The guardians to save
+        """
+        self._dao.save_many(guardians)
 
     def get_store_encryption_key(
         self, store_name: str, private_identity: PrivateIdentity
@@ -76,24 +89,47 @@ class GuardianManager:
         if guardian is None:
             return None
 
-        priv_hpke_key = pyhpke.KEMKey.from_pem(
-            private_identity.private_key.export_key(format="PEM")
-        )
-        recipient_context = self._get_hpke_cipher_suite().create_recipient_context(
-            guardian.aead_enc, priv_hpke_key
-        )
-        return recipient_context.open(guardian.enc_key)
+        if guardian.aead_enc == Guardian.KEYRING:
+            kek = self._keyring.get_key(private_identity)
+            if kek is None:
+                return None
+            return unwrap_key(
+                kek, store_name, private_identity.fingerprint, guardian.enc_key
+            )
 
-    def find_stores_names(self, private_identities: list[PrivateIdentity]) -> list[str]:
+        return hpke_open(private_identity, guardian.aead_enc, guardian.enc_key)
+
+    def enable_keyrings(self, private_identities: list[PrivateIdentity]) -> int:
+        """
+        Create a keyring for each private identity without one,
+        and migrate their guardians to keys wrapped with the keyring.
+
+        :param private_identities: The identities to enable the keyring for
+        :return: The number of migrated guardians
+        """
+        migrated = []
+        for identity in private_identities:
+            kek = self._keyring.create(identity)
+            for guardian in self._dao.find_identity_guardians(identity.fingerprint):
+                if guardian.aead_enc == Guardian.KEYRING:
+                    continue
+                key = hpke_open(identity, guardian.aead_enc, guardian.enc_key)
+                guardian.aead_enc = Guardian.KEYRING
+                guardian.enc_key = wrap_key(
+                    kek, guardian.store_name, identity.fingerprint, key
+                )
+                migrated.append(guardian)
+        self._dao.update_many(migrated)
+        return len(migrated)
+
+    def find_stores_names(self, identities: list["PublicIdentity"]) -> list[str]:
         """
-        Find all stores related to the specified private identities.
+        Find all stores related to the specified identities. Nothing is decrypted, public identities are enough.
 
-        :param private_identities: The list of private identities linked to stores
+        :param identities: The list of identities linked to stores
         :return: A list of stores names
         """
-        return self._dao.find_stores_names(
-            [id.fingerprint for id in private_identities]
-        )
+        return self._dao.find_stores_names([id.fingerprint for id in identities])
 
     def delete_store_guardians(self, store_name: str):
         """
@@ -0,0 +1,5 @@
+from secretstore.history.dao import HistoryDAO
+from secretstore.history.entity import StoreVersion
+from secretstore.history.manager import HistoryManager
+
+__all__ = ["HistoryDAO", "HistoryManager", "StoreVersion"]
@@ -0,0 +1,145 @@
+from typing import TYPE_CHECKING
+
+from secretstore.changelog import ChangeLogDAO
+from secretstore.history.entity import StoreVersion
+from secretstore.utils import Singleton, transaction
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+_TABLE_NAME = "store_history"
+_TABLE = f"""create table if not exists
+ {_TABLE_NAME}(
+    store_name text,
+    version integer,
+    checkpoint integer,
+    ciphertext blob,
+    nonce blob,
+    created_at integer,
+    primary key (store_name, version)
+) without rowid"""
+
+
+class HistoryDAO(metaclass=Singleton):
+    """Data Access Object for the store versions."""
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the DAO and create the table if it doesn't exist
+
+        :param connection: The sqlite connection to use
+        """
+        self._connection = connection
+        self._connection.execute(_TABLE)
+        self._changelog = ChangeLogDAO(connection)
+
+    def save(self, store_version: StoreVersion):
+        """
+        Save a new version
+
+        :param store_version: The version to save
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(
+                f"insert into {_TABLE_NAME} values (?,?,?,?,?,?)",
+                (
+                    store_version.store_name,
+                    store_version.version,
+                    store_version.checkpoint,
+                    store_version.ciphertext,
+                    store_version.nonce,
+                    store_version.created_at,
+                ),
+            )
+            self._changelog.append(_TABLE_NAME, store_version.store_name)
+
+    def find_last(self, store_name: str) -> tuple[int, int] | None:
+        """
+        Find the last version of a store and its last checkpoint
+
+        :param store_name: The store name
+        :return: The last version number and the last checkpoint version number, None if the store has no history
+        """
+        result = self._connection.execute(
+            f"select max(version), max(case when checkpoint then version end) from {_TABLE_NAME} where store_name=?",
+            [store_name],
+        ).fetchone()
+        if result[0] is None:
+            return None
+        return result
+
+    def find_versions(self, store_name: str) -> list[StoreVersion]:
+        """
+        Find all the versions of a store
+
+        :param store_name: The store name
+        :return: The versions, oldest first
+        """
+        return [
+            StoreVersion(name, version, bool(checkpoint), *rest)
+            for name, version, checkpoint, *rest in self._connection.execute(
+                f"select * from {_TABLE_NAME} where store_name=? order by version",
+                [store_name],
+            )
+        ]
+
+    def find_chain(self, store_name: str, version: int) -> list[StoreVersion]:
+        """
+        Find the versions needed to rebuild a version: its closest checkpoint and the deltas after it
+
+        :param store_name: The store name
+        :param version: The version to rebuild
+        :return: The versions, oldest first. Empty if the version doesn't exist
+        """
+        rows = self._connection.execute(
+            f"""select * from {_TABLE_NAME} where store_name=? and version <= ? and version >= (
+                select max(version) from {_TABLE_NAME} where store_name=? and checkpoint and version <= ?
+            ) order by version""",
+            [store_name, version, store_name, version],
+        ).fetchall()
+        if not rows or rows[-1][1] != version:
+            return []
+        return [
+            StoreVersion(name, number, bool(checkpoint), *rest)
+            for name, number, checkpoint, *rest in rows
+        ]
+
+    def prune(self, keep: int) -> int:
+        """
+        Delete the old versions of all stores in one statement, keeping at least the last keep versions.
+        Versions are only deleted before the checkpoint needed by the oldest kept version.
+
+        :param keep: The number of versions to keep per store
+        :return: The number of deleted versions
+        """
+        # The last checkpoint at or before the oldest kept version, per store
+        floors = [
+            (name, floor)
+            for name, floor, first in self._connection.execute(
+                f"""select h.store_name, max(h.version), l.first from {_TABLE_NAME} h
+                join (
+                    select store_name, min(version) as first, max(version) - ? + 1 as cutoff
+                    from {_TABLE_NAME} group by store_name
+                ) l on l.store_name = h.store_name
+                where h.checkpoint and h.version <= l.cutoff
+                group by h.store_name""",
+                [keep],
+            )
+            if floor > first
+        ]
+        with transaction(self._connection) as conn:
+            count = conn.executemany(
+                f"delete from {_TABLE_NAME} where store_name=? and version < ?", floors
+            ).rowcount
+            self._changelog.append_many(_TABLE_NAME, [name for name, _ in floors])
+        return count
+
+    def delete_store_history(self, store_name: str):
+        """
+        Delete all the versions of a store
+
+        :param store_name: The store name
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(f"delete from {_TABLE_NAME} where store_name=?", [store_name])
+            self._changelog.append(_TABLE_NAME, store_name)
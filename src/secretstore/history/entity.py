@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class StoreVersion:
+    """
+    StoreVersion dataclass. A version of a store, encrypted with the store key.
+    Fields:
+        - store_name: The store name
+        - version: The version number, starting at 1
+        - checkpoint: True if the version holds the whole store data, False if it only holds the changed fields
+        - ciphertext: The encrypted data. For a delta, removed fields have a null value
+        - nonce: The nonce used to encrypt the data
+        - created_at: The creation time, in seconds since the epoch
+    """
+
+    store_name: str
+    version: int
+    checkpoint: bool
+    ciphertext: bytes
+    nonce: bytes
+    created_at: int
@@ -0,0 +1,161 @@
+import time
+from typing import TYPE_CHECKING
+
+from secretstore.history.dao import HistoryDAO
+from secretstore.history.entity import StoreVersion
+from secretstore.store.cipher import decrypt_store, encrypt_store
+from secretstore.store.entity import EncryptedStore, Store
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+
+class HistoryManager:
+    """
+    History Manager. Keeps the versions of the stores, encrypted with the store key.
+    A version only holds the fields changed since the previous one, and every CHECKPOINT_INTERVAL versions
+    the whole data is saved, so rebuilding a version never reads more than CHECKPOINT_INTERVAL versions.
+    A field having an expiry time is saved as a [value, expiry time] pair, so a rebuilt version keeps it.
+    """
+
+    CHECKPOINT_INTERVAL = 10
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the Manager.
+
+        :param connection: The sqlite connection to use
+        """
+        self._dao = HistoryDAO(connection)
+
+    def record(
+        self,
+        store: Store,
+        key: bytes,
+        previous: dict[str, str] | None = None,
+        previous_expires_at: dict[str, int] | None = None,
+    ):
+        """
+        Save the new version of a store
+
+        :param store: The store, with its new data and expiry times
+        :param key: The store encryption key
+        :param previous: The data before the change, None for a new store.
+            Saved as the first version if the store has no history yet
+        :param previous_expires_at: The expiry times before the change
+        """
+        current = _entries(store.data, store.expires_at)
+        before = None
+        if previous is not None:
+            before = _entries(previous, previous_expires_at or {})
+
+        last = self._dao.find_last(store.name)
+        if last is None:
+            if before is None:
+                self._save(store.name, 1, True, current, key)
+                return
+            self._save(store.name, 1, True, before, key)
+            last = (1, 1)
+
+        version, checkpoint = last
+        if version + 1 - checkpoint >= HistoryManager.CHECKPOINT_INTERVAL:
+            self._save(store.name, version + 1, True, current, key)
+            return
+
+        delta: dict[str, str | list | None] = {
+            field: entry
+            for field, entry in current.items()
+            if before is None or before.get(field) != entry
+        }
+        if before is not None:
+            delta.update((field, None) for field in before if field not in current)
+        if delta:
+            self._save(store.name, version + 1, False, delta, key)
+
+    def _save(
+        self, store_name: str, version: int, checkpoint: bool, data: dict, key: bytes
+    ):
+        enc_data = encrypt_store(Store(store_name, data), key)
+        self._dao.save(
+            StoreVersion(
+                store_name,
+                version,
+                checkpoint,
+                enc_data.ciphertext,
+                enc_data.nonce,
+                int(time.time()),
+            )
+        )
+
+    def find_versions(self, store_name: str) -> list[StoreVersion]:
+        """
+        Find the versions of a store, nothing is decrypted
+
+        :param store_name: The store name
+        :return: The versions, oldest first
+        """
+        return self._dao.find_versions(store_name)
+
+    def get_version(self, store_name: str, version: int, key: bytes) -> Store | None:
+        """
+        Rebuild a version of a store from its closest checkpoint
+
+        :param store_name: The store name
+        :param version: The version number
+        :param key: The store encryption key
+        :return: The store as it was at this version, with the expiry times of its fields then.
+            None if the version doesn't exist
+        """
+        chain = self._dao.find_chain(store_name, version)
+        if not chain:
+            return None
+
+        data: dict[str, str | list] = {}
+        for store_version in chain:
+            changes = decrypt_store(
+                EncryptedStore(
+                    store_name, store_version.ciphertext, store_version.nonce
+                ),
+                key,
+            ).data
+            if store_version.checkpoint:
+                data = changes
+                continue
+            for field, value in changes.items():
+                if value is None:
+                    data.pop(field, None)
+                else:
+                    data[field] = value
+
+        store = Store(store_name, {})
+        for field, entry in data.items():
+            if isinstance(entry, list):
+                store.data[field], store.expires_at[field] = entry
+            else:
+                store.data[field] = entry
+        return store
+
+    def prune(self, keep: int) -> int:
+        """
+        Delete the old versions of all stores
+
+        :param keep: The minimum number of versions to keep per store
+        :return: The number of deleted versions
+        """
+        return self._dao.prune(keep)
+
+    def delete_store_history(self, store_name: str):
+        """
+        Delete all the versions of a store
+
+        :param store_name: The store name
+        """
+        self._dao.delete_store_history(store_name)
+
+
+def _entries(data: dict[str, str], expires_at: dict[str, int]) -> dict[str, str | list]:
+    """The saved form of the fields: the value, or a [value, expiry time] pair if the field expires"""
+    return {
+        field: [value, expires_at[field]] if field in expires_at else value
+        for field, value in data.items()
+    }
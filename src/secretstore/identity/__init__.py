@@ -1,5 +1,11 @@
-from secretstore.identity.dao import IdentityDAO
+from secretstore.identity.dao import AbstractIdentityDAO, IdentityDAO
 from secretstore.identity.entity import PrivateIdentity, PublicIdentity
 from secretstore.identity.manager import IdentityManager
 
-__all__ = ["IdentityDAO", "IdentityManager", "PublicIdentity", "PrivateIdentity"]
+__all__ = [
+    "AbstractIdentityDAO",
+    "IdentityDAO",
+    "IdentityManager",
+    "PublicIdentity",
+    "PrivateIdentity",
+]
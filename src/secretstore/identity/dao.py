@@ -1,7 +1,11 @@
-from typing import TYPE_CHECKING, Generator
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
 
+from secretstore.changelog import ChangeLogDAO
+from secretstore.exceptions import AlreadyExists
 from secretstore.identity.entity import RawIdentity
-from secretstore.utils import Singleton
+from secretstore.utils import Singleton, transaction
 
 if TYPE_CHECKING:
     from sqlite3 import Connection
@@ -17,7 +21,55 @@ _TABLE = f"""create table if not exists
 )"""
 
 
-class IdentityDAO(metaclass=Singleton):
+class AbstractIdentityDAO(ABC):
+    """Storage of the identities, implemented by each backend."""
+
+    @abstractmethod
+    def get_identities(self) -> list[RawIdentity]:
+        """
+        Retrieve all identities
+
+        :return: identities or an empty list if there is no identity
+        """
+
+    @abstractmethod
+    def get_identities_by_fingerprints(
+        self, fingerprints: list[str]
+    ) -> list[RawIdentity]:
+        """
+        Retrieve all identities linked to fingerprints
+
+        :param fingerprints: All the fingerprints to filter identities
+        :return: identities linked to the fingerprints, each one once, or an empty list if nothing was found
+        """
+
+    @abstractmethod
+    def get_fingerprints(self, fingerprints: list[str] | None = None) -> list[str]:
+        """
+        Retrieve the fingerprints of the identities, without their keys
+
+        :param fingerprints: Only keep the identities among these fingerprints. All identities if None
+        :return: The fingerprints of the identities found
+        """
+
+    @abstractmethod
+    def get_keys_by_fingerprint(self, fingerprint: str) -> tuple[bytes, bytes] | None:
+        """
+        Retrieve the public and private key of an identity based on its fingerprint.
+
+        :return: A tuple (public, private) keys or None if nothing was found
+        """
+
+    @abstractmethod
+    def save_identity(self, identity: "PrivateIdentity"):
+        """
+        Save a new private Identity. Saving an identity that already exists raises AlreadyExists.
+
+        :param identity: The private identity to save
+        """
+
+
+class IdentityDAO(AbstractIdentityDAO, metaclass=Singleton):
     """Data Access Object for Identity Object."""
 
     def __init__(self, connection: "Connection"):
@@ -30,30 +82,45 @@ class IdentityDAO(metaclass=Singleton):
         cur = self._connection.cursor()
         cur.execute(_TABLE)
         cur.close()
+        self._changelog = ChangeLogDAO(connection)
 
-    def get_identities(self) -> Generator[RawIdentity, None, None]:
+    def get_identities(self) -> list[RawIdentity]:
         """
         Retrieve all identities in the database
 
-        :return: identities or an empty generator if no identity in the database
+        :return: identities or an empty list if no identity in the database
         """
         res = self._connection.execute(f"select * from {_TABLE_NAME}")
-        for i in res.fetchall():
-            yield RawIdentity(*i)
+        return [RawIdentity(*i) for i in res.fetchall()]
 
     def get_identities_by_fingerprints(
         self, fingerprints: list[str]
-    ) -> Generator[RawIdentity, None, None]:
+    ) -> list[RawIdentity]:
         """
         Retrieve all identities linked to fingerprints
 
         :param fingerprints: All the fingerprints to filter identities
-        :return: identities linked to the fingerprints or an empty generator if nothing was found
+        :return: identities linked to the fingerprints or an empty list if nothing was found
         """
         q = f"select * from {_TABLE_NAME} where fingerprint in ({','.join(['?']*len(fingerprints))})"
         res = self._connection.execute(q, fingerprints)
-        for i in res.fetchall():
-            yield RawIdentity(*i)
+        return [RawIdentity(*i) for i in res.fetchall()]
+
+    def get_fingerprints(self, fingerprints: list[str] | None = None) -> list[str]:
+        """
+        Retrieve the fingerprints of the identities, without their keys
+
+        :param fingerprints: Only keep the identities among these fingerprints. All identities if None
+        :return: The fingerprints of the identities found
+        """
+        if fingerprints is None:
+            res = self._connection.execute(f"select fingerprint from {_TABLE_NAME}")
+        else:
+            res = self._connection.execute(
+                f"select fingerprint from {_TABLE_NAME} where fingerprint in ({','.join(['?']*len(fingerprints))})",
+                fingerprints,
+            )
+        return [row[0] for row in res.fetchall()]
 
     def get_keys_by_fingerprint(self, fingerprint: str) -> tuple[bytes, bytes] | None:
         """
@@ -74,12 +141,16 @@ class IdentityDAO(metaclass=Singleton):
 
         :param identity: The private identity to save
         """
-        with self._connection as conn:
-            conn.execute(
-                f"insert into {_TABLE_NAME}(fingerprint, public_key, private_key) values (?,?,?)",
-                (
-                    identity._fingerprint,
-                    identity.get_bin_public_key(),
-                    identity.get_bin_enc_priv_key(),
-                ),
-            )
+        with transaction(self._connection) as conn:
+            try:
+                conn.execute(
+                    f"insert into {_TABLE_NAME}(fingerprint, public_key, private_key) values (?,?,?)",
+                    (
+                        identity._fingerprint,
+                        identity.get_bin_public_key(),
+                        identity.get_bin_enc_priv_key(),
+                    ),
+                )
+            except sqlite3.IntegrityError as e:
+                raise AlreadyExists(identity._fingerprint) from e
+            self._changelog.append(_TABLE_NAME, identity._fingerprint)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
+from Crypto.PublicKey import ECC
 from paramiko.agent import AgentKey
 
 from secretstore.crypto import EncryptionPack
@@ -25,17 +26,25 @@ class RawIdentity:
 
 
 class PublicIdentity:
-    """Public identity class"""
+    """
+    Public identity class.
+    The public key can be given in DER format, it is then only parsed the first time it is used.
+    """
 
-    def __init__(self, fingerprint: str, public_key: "EccKey"):
+    def __init__(self, fingerprint: str, public_key: "EccKey | bytes"):
         """
         Initialize the Public identity
 
         :param fingerprint: The ssh key fingerprint linked to the identity
-        :param public_key: The identity public key
+        :param public_key: The identity public key, parsed or in DER format
         """
         self._fingerprint = fingerprint
-        self._public_key = public_key
+        if isinstance(public_key, bytes):
+            self._public_key = None
+            self._der_public_key = public_key
+        else:
+            self._public_key = public_key
+            self._der_public_key = None
 
     @property
     def fingerprint(self) -> str:
@@ -43,11 +52,15 @@ class PublicIdentity:
 
     @property
     def public_key(self) -> "EccKey":
+        if self._public_key is None:
+            self._public_key = ECC.import_key(self._der_public_key)
         return self._public_key
 
     def get_bin_public_key(self) -> bytes:
         """Return the public key in DER format"""
-        return self._public_key.export_key(format="DER")
+        if self._der_public_key is None:
+            self._der_public_key = self._public_key.export_key(format="DER")
+        return self._der_public_key
 
     def __repr__(self) -> str:
         return f"{self._fingerprint} - {self.get_bin_public_key().hex()}"
@@ -61,7 +74,7 @@ class PrivateIdentity(PublicIdentity):
     def __init__(
         self,
         fingerprint: str,
-        public_key: "EccKey",
+        public_key: "EccKey | bytes",
         private_key: "EccKey",
         agent_key: "AgentKey",
     ):
@@ -69,7 +82,7 @@ class PrivateIdentity(PublicIdentity):
         Initialize the private identity
 
         :param fingerprint: The ssh key fingerprint linked to the identity
-        :param public_key: The identity public key
+        :param public_key: The identity public key, parsed or in DER format
         :param private_key: The unencrypted private key
         :param agent_key: The paramiko agent key linked to this identity
         """
@@ -1,12 +1,15 @@
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TYPE_CHECKING, Generator, Iterable
 
 from Crypto.PublicKey import ECC
 
 from secretstore.crypto import EncryptionPack
 from secretstore.exceptions import SSHKeyNotFound
-from secretstore.identity.dao import IdentityDAO
+from secretstore.identity.dao import AbstractIdentityDAO, IdentityDAO
 from secretstore.identity.entity import PrivateIdentity, PublicIdentity, RawIdentity
+from secretstore.utils import transaction
 
 if TYPE_CHECKING:
     from secretstore.agent import SSHAgent
@@ -21,14 +24,21 @@ class IdentityManager:
     An Identity is a pair of asymmetric keys linked to a ssh key.
     """
 
-    def __init__(self, connection: "Connection", ssh_agent: "SSHAgent"):
+    def __init__(
+        self,
+        connection: "Connection",
+        ssh_agent: "SSHAgent",
+        dao: AbstractIdentityDAO | None = None,
+    ):
         """
         Initialize the Manager.
 
         :param connection: The sqlite connection to use
+        :param dao: The identity storage to use. The sqlite one per default
         """
 
-        self._dao = IdentityDAO(connection)
+        self._connection = connection
+        self._dao = dao if dao is not None else IdentityDAO(connection)
         self._ssh_agent = ssh_agent
 
     def get_identity(self, fingerprint: str) -> PublicIdentity | None:
@@ -38,9 +48,9 @@ class IdentityManager:
         :param fingerprint: the identity fingerprint
         :return: The public identity or None if there is no such identity
         """
-        raw = next(self._dao.get_identities_by_fingerprints([fingerprint]))
-        if raw:
-            return create_public_identity_from_raw(raw)
+        raws = self._dao.get_identities_by_fingerprints([fingerprint])
+        if raws:
+            return create_public_identity_from_raw(raws[0])
         return None
 
     def get_identities(self) -> Iterable[PublicIdentity]:
@@ -49,6 +59,16 @@ class IdentityManager:
             lambda ri: create_public_identity_from_raw(ri), self._dao.get_identities()
         )
 
+    def get_fingerprints(self) -> list[str]:
+        """Return the fingerprints of all the identities, without reading their keys"""
+        return self._dao.get_fingerprints()
+
+    def get_fingerprints_based_ssh_agent(self) -> list[str]:
+        """Return the fingerprints of the identities linked to the keys found in the ssh agent"""
+        return self._dao.get_fingerprints(
+            [key.fingerprint for key in self._get_supported_keys()]
+        )
+
     def _get_supported_keys(self) -> Iterable["AgentKey"]:
         """
         Return only the supported ssh keys found in the ssh agent.
@@ -73,10 +93,40 @@ class IdentityManager:
         Return all the private identity found.
         Because the identities are private and therefore private key unencrypted, only those linked to ssh key in the agent are returned.
         It is not possible to decrypt private keys that is not owned.
+
+        With several identities, the key derivations run in parallel and identities are yielded as soon as they are unlocked,
+        in no particular order. Stopping the iteration cancels the derivations not started yet.
         """
         keys = {key.fingerprint: key for key in self._get_supported_keys()}
-        for raw_id in self._dao.get_identities_by_fingerprints(list(keys.keys())):
-            yield create_private_key_from_raw(raw_id, keys[raw_id.fingerprint])
+        raw_ids = self._dao.get_identities_by_fingerprints(list(keys.keys()))
+        if len(raw_ids) < 2:
+            for raw_id in raw_ids:
+                yield create_private_key_from_raw(raw_id, keys[raw_id.fingerprint])
+            return
+
+        # The agent answers one request at a time and signing is fast, so all the seeds are signed first.
+        # The derivations are CPU bound but release the GIL, threads are enough to use all the cores
+        signatures = [
+            keys[raw_id.fingerprint].sign_ssh_data(
+                raw_id.private_key[: EncryptionPack.SEED_SIZE]
+            )
+            for raw_id in raw_ids
+        ]
+        executor = ThreadPoolExecutor(min(len(raw_ids), os.cpu_count() or 1))
+        try:
+            futures = [
+                executor.submit(
+                    create_private_key_from_raw,
+                    raw_id,
+                    keys[raw_id.fingerprint],
+                    signature,
+                )
+                for raw_id, signature in zip(raw_ids, signatures)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def create_identities(self) -> list[str]:
         """
@@ -90,21 +140,24 @@ class IdentityManager:
             raise SSHKeyNotFound()
 
         fingerprints = []
-        for key in keys:
-            exists = self._dao.get_keys_by_fingerprint(key.fingerprint) is not None
-            if exists:
-                logging.debug(
-                    f"The identity for the key {key.fingerprint} already exists"
+        with transaction(self._connection):
+            for key in keys:
+                exists = self._dao.get_keys_by_fingerprint(key.fingerprint) is not None
+                if exists:
+                    logging.debug(
+                        f"The identity for the key {key.fingerprint} already exists"
+                    )
+                    continue
+
+                private_key = ECC.generate(curve="p256")
+                public_key = private_key.public_key()
+                identity = PrivateIdentity(
+                    key.fingerprint, public_key, private_key, key
                 )
-                continue
-
-            private_key = ECC.generate(curve="p256")
-            public_key = private_key.public_key()
-            identity = PrivateIdentity(key.fingerprint, public_key, private_key, key)
 
-            self._dao.save_identity(identity)
-            logging.debug(f"Created identity for the key {key.fingerprint}")
-            fingerprints.append(identity.fingerprint)
+                self._dao.save_identity(identity)
+                logging.debug(f"Created identity for the key {key.fingerprint}")
+                fingerprints.append(identity.fingerprint)
         return fingerprints
 
 
@@ -115,29 +168,27 @@ def create_public_identity_from_raw(raw_identity: RawIdentity) -> "PublicIdentit
     :param raw_identity: The raw identity
     :return: The public identity
     """
-    return PublicIdentity(
-        raw_identity.fingerprint,
-        ECC.import_key(raw_identity.public_key),
-    )
+    return PublicIdentity(raw_identity.fingerprint, raw_identity.public_key)
 
 
 def create_private_key_from_raw(
-    raw_identity: RawIdentity, agent_key: "AgentKey"
+    raw_identity: RawIdentity, agent_key: "AgentKey", signature: bytes | None = None
 ) -> "PrivateIdentity":
     """
     Create a private identity from a raw one.
 
     :param raw_identity: The raw identity
     :para agent_key: The linked ssh key to decrypt the encrypted private key
+    :param signature: The signature of the seed by the ssh key, when already requested to the agent
     :return: The private identity
     """
     seed = raw_identity.private_key[: EncryptionPack.SEED_SIZE]
     private_key = raw_identity.private_key[EncryptionPack.SEED_SIZE :]
 
-    epack = EncryptionPack.from_seed(agent_key, seed)
+    epack = EncryptionPack.from_seed(agent_key, seed, signature)
     return PrivateIdentity(
         raw_identity.fingerprint,
-        ECC.import_key(raw_identity.public_key),
+        raw_identity.public_key,
         ECC.import_key(private_key, passphrase=epack.encryption_key),
         agent_key,
     )
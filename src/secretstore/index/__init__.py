@@ -0,0 +1,4 @@
+from secretstore.index.dao import IndexDAO
+from secretstore.index.manager import IndexManager
+
+__all__ = ["IndexDAO", "IndexManager"]
@@ -0,0 +1,126 @@
+from typing import TYPE_CHECKING, Generator
+
+from secretstore.changelog import ChangeLogDAO
+from secretstore.index.entity import IndexKey
+from secretstore.utils import Singleton, transaction
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+_KEYS_TABLE_NAME = "index_keys"
+_KEYS_TABLE = f"""create table if not exists
+ {_KEYS_TABLE_NAME}(
+    key_id text,
+    identity_fingerprint text,
+    aead blob,
+    key blob,
+    primary key (identity_fingerprint, key_id)
+)"""
+
+_TABLE_NAME = "field_index"
+_TABLE = f"""create table if not exists
+ {_TABLE_NAME}(
+    key_id text,
+    token blob,
+    store_name text,
+    primary key (key_id, token, store_name)
+) without rowid"""
+_STORE_INDEX = (
+    f"create index if not exists {_TABLE_NAME}_store on {_TABLE_NAME}(store_name)"
+)
+
+
+class IndexDAO(metaclass=Singleton):
+    """Data Access Object for the field index and its keys."""
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the DAO and create the tables if they don't exist
+
+        :param connection: The sqlite connection to use
+        """
+        self._connection = connection
+        self._connection.execute(_KEYS_TABLE)
+        self._connection.execute(_TABLE)
+        self._connection.execute(_STORE_INDEX)
+        self._changelog = ChangeLogDAO(connection)
+
+    def find_keys(self, fingerprints: list[str]) -> Generator[IndexKey, None, None]:
+        """
+        Find the index keys of identities
+
+        :param fingerprints: The identities fingerprints
+        :return: The index keys
+        """
+        cur = self._connection.execute(
+            f"select * from {_KEYS_TABLE_NAME} where identity_fingerprint in ({','.join(['?']*len(fingerprints))})",
+            fingerprints,
+        )
+        for row in cur.fetchall():
+            yield IndexKey(*row)
+
+    def save_keys(self, keys: list[IndexKey]):
+        """
+        Save new index keys
+
+        :param keys: The index keys to save
+        """
+        with transaction(self._connection) as conn:
+            conn.executemany(
+                f"insert into {_KEYS_TABLE_NAME} values (?,?,?,?)",
+                [
+                    (k.key_id, k.identity_fingerprint, k.aead_enc, k.enc_key)
+                    for k in keys
+                ],
+            )
+            self._changelog.append_many(
+                _KEYS_TABLE_NAME,
+                list(dict.fromkeys(k.identity_fingerprint for k in keys)),
+            )
+
+    def replace_store_tokens(
+        self, store_name: str, key_ids: list[str], tokens: list[tuple[str, bytes]]
+    ):
+        """
+        Replace the tokens of a store made with some index keys. The tokens of the other keys are kept
+
+        :param store_name: The store name
+        :param key_ids: The ids of the index keys whose tokens are replaced
+        :param tokens: The new tokens, as (key_id, token) pairs
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(
+                f"delete from {_TABLE_NAME} where store_name=? and key_id in ({','.join(['?']*len(key_ids))})",
+                [store_name, *key_ids],
+            )
+            conn.executemany(
+                f"insert or ignore into {_TABLE_NAME} values (?,?,?)",
+                [(key_id, token, store_name) for key_id, token in tokens],
+            )
+            self._changelog.append(_TABLE_NAME, store_name)
+
+    def find_stores_names(self, tokens: list[tuple[str, bytes]]) -> list[str]:
+        """
+        Find the stores having one of the tokens
+
+        :param tokens: The tokens to look for, as (key_id, token) pairs
+        :return: A list of stores names
+        """
+        names: dict[str, None] = {}
+        for key_id, token in tokens:
+            cur = self._connection.execute(
+                f"select store_name from {_TABLE_NAME} where key_id=? and token=?",
+                (key_id, token),
+            )
+            names.update((row[0], None) for row in cur)
+        return list(names)
+
+    def delete_store_tokens(self, store_name: str):
+        """
+        Delete all the tokens of a store
+
+        :param store_name: The store name
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(f"delete from {_TABLE_NAME} where store_name=?", [store_name])
+            self._changelog.append(_TABLE_NAME, store_name)
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class IndexKey:
+    """
+    IndexKey dataclass. The index key is shared by a group of identities, encrypted for each of them.
+    Fields:
+        - key_id: The index key identifier, the same for all the identities of the group
+        - identity_fingerprint: the fingerprint of the identity able to decrypt the key
+        - aead_enc: The authenticated encryption with additional data encapsulation
+        - enc_key: The encrypted index key
+    """
+
+    key_id: str
+    identity_fingerprint: str
+    aead_enc: bytes
+    enc_key: bytes
@@ -0,0 +1,123 @@
+import hmac
+import os
+from hashlib import sha256
+from typing import TYPE_CHECKING
+
+from secretstore.crypto import hpke_open, hpke_seal
+from secretstore.index.dao import IndexDAO
+from secretstore.index.entity import IndexKey
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+    from secretstore.identity.entity import PrivateIdentity
+    from secretstore.store.entity import Store
+
+
+class IndexManager:
+    """
+    Index Manager. Handles the blind index of the stores fields.
+    Field names are saved as HMAC tokens, so stores can be searched by field without being decrypted.
+    The HMAC key (index key) is shared by a group of identities and encrypted with the public key of each of them.
+    """
+
+    KEY_SIZE = 32
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the Manager.
+
+        :param connection: The sqlite connection to use
+        """
+        self._dao = IndexDAO(connection)
+
+    def get_index_keys(
+        self, private_identities: list["PrivateIdentity"]
+    ) -> dict[str, bytes]:
+        """
+        Decrypt the index keys of the private identities
+
+        :param private_identities: The identities to decrypt the keys with
+        :return: The index keys by key id. Empty if the index is not enabled
+        """
+        identities = {i.fingerprint: i for i in private_identities}
+        keys: dict[str, bytes] = {}
+        for index_key in self._dao.find_keys(list(identities.keys())):
+            if index_key.key_id not in keys:
+                keys[index_key.key_id] = hpke_open(
+                    identities[index_key.identity_fingerprint],
+                    index_key.aead_enc,
+                    index_key.enc_key,
+                )
+        return keys
+
+    def enable(self, private_identities: list["PrivateIdentity"]) -> dict[str, bytes]:
+        """
+        Make sure every private identity has an index key.
+        The existing key of one identity is shared with the others, otherwise a new key is created.
+
+        :param private_identities: The identities to enable the index for
+        :return: The index keys by key id
+        """
+        keys = self.get_index_keys(private_identities)
+        if len(keys) == 0:
+            keys[os.urandom(8).hex()] = os.urandom(IndexManager.KEY_SIZE)
+
+        key_id, key = next(iter(keys.items()))
+        owners = {
+            k.identity_fingerprint
+            for k in self._dao.find_keys([i.fingerprint for i in private_identities])
+        }
+        new_keys = []
+        for identity in private_identities:
+            if identity.fingerprint not in owners:
+                aead_enc, enc_key = hpke_seal(identity, key)
+                new_keys.append(
+                    IndexKey(key_id, identity.fingerprint, aead_enc, enc_key)
+                )
+        self._dao.save_keys(new_keys)
+        return keys
+
+    def index_store(self, store: "Store", keys: dict[str, bytes]):
+        """
+        Replace the tokens of a store made with the keys by the tokens of its current fields.
+        Tokens made with keys not owned are kept, they are replaced when an identity owning the key updates the store.
+
+        :param store: The decrypted store
+        :param keys: The index keys by key id
+        """
+        if not keys:
+            return
+        self._dao.replace_store_tokens(
+            store.name,
+            list(keys),
+            [
+                (key_id, _token(key, field))
+                for key_id, key in keys.items()
+                for field in store.data
+            ],
+        )
+
+    def find_stores_names(self, field: str, keys: dict[str, bytes]) -> list[str]:
+        """
+        Find the stores having a field
+
+        :param field: The field name
+        :param keys: The index keys by key id
+        :return: A list of stores names
+        """
+        return self._dao.find_stores_names(
+            [(key_id, _token(key, field)) for key_id, key in keys.items()]
+        )
+
+    def delete_store_index(self, store_name: str):
+        """
+        Delete the tokens of a store
+
+        :param store_name: The name of the store
+        """
+        self._dao.delete_store_tokens(store_name)
+
+
+def _token(key: bytes, field: str) -> bytes:
+    """Compute the blind index token of a field name"""
+    return hmac.new(key, field.encode(), sha256).digest()
@@ -0,0 +1,4 @@
+from secretstore.keyring.dao import KeyringDAO
+from secretstore.keyring.manager import KeyringManager
+
+__all__ = ["KeyringDAO", "KeyringManager"]
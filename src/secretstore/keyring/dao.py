@@ -0,0 +1,58 @@
+from typing import TYPE_CHECKING
+
+from secretstore.changelog import ChangeLogDAO
+from secretstore.keyring.entity import Keyring
+from secretstore.utils import Singleton, transaction
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+_TABLE_NAME = "keyrings"
+_TABLE = f"""create table if not exists
+ {_TABLE_NAME}(
+    identity_fingerprint text primary key,
+    aead blob,
+    key blob
+)"""
+
+
+class KeyringDAO(metaclass=Singleton):
+    """Data Access Object for Keyring Object."""
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the DAO and create the table if it doesn't exist
+
+        :param connection: The sqlite connection to use
+        """
+        self._connection = connection
+        self._connection.execute(_TABLE)
+        self._changelog = ChangeLogDAO(connection)
+
+    def find(self, identity_fingerprint: str) -> Keyring | None:
+        """
+        Find the keyring of an identity.
+
+        :param identity_fingerprint: The identity fingerprint
+        :return: The Keyring or None if the identity has no keyring
+        """
+        result = self._connection.execute(
+            f"select * from {_TABLE_NAME} where identity_fingerprint=?",
+            [identity_fingerprint],
+        ).fetchone()
+        if result is None:
+            return None
+        return Keyring(*result)
+
+    def save(self, keyring: Keyring):
+        """
+        Save a new keyring
+
+        :param keyring: The keyring to save
+        """
+        with transaction(self._connection) as conn:
+            conn.execute(
+                f"insert into {_TABLE_NAME} values (?,?,?)",
+                (keyring.identity_fingerprint, keyring.aead_enc, keyring.enc_key),
+            )
+            self._changelog.append(_TABLE_NAME, keyring.identity_fingerprint)
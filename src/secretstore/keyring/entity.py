@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Keyring:
+    """
+    Keyring dataclass. A keyring is the key encryption key of an identity.
+    Fields:
+        - identity_fingerprint: the fingerprint of the identity owning the keyring
+        - aead_enc: The authenticated encryption with additional data encapsulation
+        - enc_key: The key encryption key, encrypted with the public key of the identity
+    """
+
+    identity_fingerprint: str
+    aead_enc: bytes
+    enc_key: bytes
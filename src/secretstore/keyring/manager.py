@@ -0,0 +1,63 @@
+from typing import TYPE_CHECKING
+
+from Crypto.Random import get_random_bytes
+
+from secretstore.crypto import hpke_open, hpke_seal
+from secretstore.keyring.dao import KeyringDAO
+from secretstore.keyring.entity import Keyring
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+    from secretstore.identity.entity import PrivateIdentity
+
+
+class KeyringManager:
+    """
+    Keyring Manager. Handles the key encryption keys of the identities.
+    The keyring of an identity is encrypted once with its public key, store keys are then wrapped with the keyring
+    using a symmetric AEAD. Decrypted keyrings are kept for the manager lifetime,
+    so only one asymmetric operation per identity is needed.
+    """
+
+    KEY_SIZE = 32
+
+    def __init__(self, connection: "Connection"):
+        """
+        Initialize the Manager.
+
+        :param connection: The sqlite connection to use
+        """
+        self._dao = KeyringDAO(connection)
+        self._keys: dict[str, bytes | None] = {}
+
+    def get_key(self, private_identity: "PrivateIdentity") -> bytes | None:
+        """
+        Return the decrypted keyring of an identity
+
+        :param private_identity: The identity owning the keyring
+        :return: The key encryption key or None if the identity has no keyring
+        """
+        fingerprint = private_identity.fingerprint
+        if fingerprint not in self._keys:
+            keyring = self._dao.find(fingerprint)
+            self._keys[fingerprint] = (
+                None
+                if keyring is None
+                else hpke_open(private_identity, keyring.aead_enc, keyring.enc_key)
+            )
+        return self._keys[fingerprint]
+
+    def create(self, private_identity: "PrivateIdentity") -> bytes:
+        """
+        Return the keyring of an identity, create it if the identity has none
+
+        :param private_identity: The identity owning the keyring
+        :return: The key encryption key
+        """
+        key = self.get_key(private_identity)
+        if key is None:
+            key = get_random_bytes(KeyringManager.KEY_SIZE)
+            aead_enc, enc_key = hpke_seal(private_identity, key)
+            self._dao.save(Keyring(private_identity.fingerprint, aead_enc, enc_key))
+            self._keys[private_identity.fingerprint] = key
+        return key
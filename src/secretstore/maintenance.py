@@ -0,0 +1,147 @@
+from typing import TYPE_CHECKING
+
+from secretstore.changelog import ChangeLogDAO
+from secretstore.utils import transaction
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+# (table, key column, parent table, parent key column, synced)
+# Rows whose key has no parent row anymore are orphans. Synced tables record the purge in the change log.
+_ORPHANS = (
+    ("guardians", "store_name", "store", "name", True),
+    ("group_guardians", "store_name", "store", "name", True),
+    ("field_index", "store_name", "store", "name", False),
+    ("store_history", "store_name", "store", "name", True),
+    ("field_expiry", "store_name", "store", "name", True),
+    ("keyrings", "identity_fingerprint", "identities", "fingerprint", True),
+    ("index_keys", "identity_fingerprint", "identities", "fingerprint", False),
+)
+
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+def _orphans_query(select: str, table: str, key: str, parent: str, parent_key: str):
+    return (
+        f"{select} from {table} where {key} not in (select {parent_key} from {parent})"
+    )
+
+
+def _distribution(values: list[int]) -> dict[str, int | float]:
+    """Summarize a list of sizes or counts"""
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "min": values[0],
+        "p50": values[len(values) // 2],
+        "p90": values[len(values) * 9 // 10],
+        "max": values[-1],
+        "mean": round(sum(values) / len(values), 2),
+        "total": sum(values),
+    }
+
+
+def stats(connection: "Connection") -> dict[str, dict]:
+    """
+    Gather statistics on the database. Nothing is decrypted.
+
+    :param connection: The sqlite connection to inspect
+    :return: The statistics, by section
+    """
+    sizes = [
+        row[0] for row in connection.execute("select length(ciphertext) from store")
+    ]
+    per_store = [
+        row[0]
+        for row in connection.execute(
+            "select count(*) from guardians group by store_name"
+        )
+    ]
+    per_identity = [
+        row[0]
+        for row in connection.execute(
+            "select count(*) from guardians group by identity_fingerprint"
+        )
+    ]
+    orphans = {
+        table: connection.execute(
+            _orphans_query("select count(*)", table, key, parent, parent_key)
+        ).fetchone()[0]
+        for table, key, parent, parent_key, _ in _ORPHANS
+    }
+
+    page_size = connection.execute("pragma page_size").fetchone()[0]
+    page_count = connection.execute("pragma page_count").fetchone()[0]
+    freelist_count = connection.execute("pragma freelist_count").fetchone()[0]
+
+    return {
+        "stores": {
+            "count": len(sizes),
+            "identities": connection.execute(
+                "select count(*) from identities"
+            ).fetchone()[0],
+        },
+        "ciphertext_size": _distribution(sizes),
+        "guardians_per_store": _distribution(per_store),
+        "guardians_per_identity": _distribution(per_identity),
+        "orphans": orphans,
+        "database": {
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_count": freelist_count,
+            "size": page_size * page_count,
+            "free_size": page_size * freelist_count,
+            "auto_vacuum": connection.execute("pragma auto_vacuum").fetchone()[0],
+        },
+    }
+
+
+def purge_orphans(connection: "Connection") -> dict[str, int]:
+    """
+    Delete, in a single transaction, the rows left behind by deleted stores and identities
+
+    :param connection: The sqlite connection to clean
+    :return: The number of rows deleted by table
+    """
+    changelog = ChangeLogDAO(connection)
+    purged = {}
+    with transaction(connection):
+        for table, key, parent, parent_key, synced in _ORPHANS:
+            if synced:
+                keys = [
+                    row[0]
+                    for row in connection.execute(
+                        _orphans_query(
+                            f"select distinct {key}", table, key, parent, parent_key
+                        )
+                    )
+                ]
+                changelog.append_many(table, keys)
+            purged[table] = connection.execute(
+                _orphans_query("delete", table, key, parent, parent_key)
+            ).rowcount
+    return purged
+
+
+def optimize(connection: "Connection", incremental: bool = False):
+    """
+    Rebuild the indexes, refresh the query planner statistics and reclaim the free pages
+
+    :param connection: The sqlite connection to optimize
+    :param incremental: Only release the free pages instead of rewriting the whole database.
+        The first incremental run switches the database to incremental auto vacuum, which needs a full vacuum
+    """
+    connection.execute("reindex")
+    connection.execute("analyze")
+    connection.commit()
+
+    if incremental:
+        auto_vacuum = connection.execute("pragma auto_vacuum").fetchone()[0]
+        if auto_vacuum == _AUTO_VACUUM_INCREMENTAL:
+            connection.execute("pragma incremental_vacuum").fetchall()
+            connection.commit()
+            return
+        connection.execute(f"pragma auto_vacuum={_AUTO_VACUUM_INCREMENTAL}")
+    connection.execute("vacuum")
@@ -0,0 +1,353 @@
+import hashlib
+import mmap
+import os
+import struct
+import time
+from typing import TYPE_CHECKING
+
+from secretstore.crypto import hpke_open, unwrap_key
+from secretstore.exceptions import InvalidSnapshot, NoIdentityForStoreFound
+from secretstore.expiry.manager import find_field_expiries
+from secretstore.group.entity import GroupGuardian, GroupMember
+from secretstore.guardian.entity import Guardian
+from secretstore.identity.entity import RawIdentity
+from secretstore.identity.manager import create_private_key_from_raw
+from secretstore.keyring.entity import Keyring
+from secretstore.store.cipher import decrypt_store
+from secretstore.store.entity import EncryptedStore, Store
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+    from secretstore.agent import SSHAgent
+    from secretstore.identity.entity import PrivateIdentity
+
+MAGIC = b"SSSN\x03"
+
+# magic, number of stores, index offset
+_HEADER = struct.Struct(">5sIQ")
+# name hash, record offset
+_INDEX = struct.Struct(">QQ")
+_COUNT = struct.Struct(">I")
+_LENGTH = struct.Struct(">I")
+_EXPIRES_AT = struct.Struct(">q")
+
+
+def _hash(name: str) -> int:
+    """Hash a store name for the index"""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big")
+
+
+def _pack(*fields: bytes) -> bytes:
+    """Pack length prefixed fields"""
+    return b"".join(_LENGTH.pack(len(field)) + field for field in fields)
+
+
+def build(connection: "Connection", path: str, fingerprints: list[str]) -> int:
+    """
+    Write an immutable snapshot of the stores shared with identities, directly or through a group.
+    The snapshot contains the identities, their keyrings, their group memberships,
+    the encrypted stores with their guardians for these identities, their group guardians for these groups
+    and the expiry times of their fields, so expired fields are never read from the snapshot.
+    Records are sorted by name hash and followed by the index, so a store is found with a binary search.
+
+    :param connection: The sqlite connection to read
+    :param path: The snapshot path. The file is replaced atomically
+    :param fingerprints: The identities to include
+    :return: The number of stores in the snapshot
+    """
+    marks = ",".join(["?"] * len(fingerprints))
+    tmp_path = f"{path}.tmp"
+
+    # Read everything in one transaction to get a consistent snapshot
+    connection.execute("begin")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, 0, 0))
+
+            identities = connection.execute(
+                f"select * from identities where fingerprint in ({marks})",
+                fingerprints,
+            ).fetchall()
+            f.write(_COUNT.pack(len(identities)))
+            for fingerprint, public_key, private_key in identities:
+                f.write(_pack(fingerprint.encode(), public_key, private_key))
+
+            keyrings = connection.execute(
+                f"select * from keyrings where identity_fingerprint in ({marks})",
+                fingerprints,
+            ).fetchall()
+            f.write(_COUNT.pack(len(keyrings)))
+            for fingerprint, aead_enc, enc_key in keyrings:
+                f.write(_pack(fingerprint.encode(), aead_enc, enc_key))
+
+            members = connection.execute(
+                f"select * from groups where identity_fingerprint in ({marks})",
+                fingerprints,
+            ).fetchall()
+            f.write(_COUNT.pack(len(members)))
+            for group_name, fingerprint, aead_enc, enc_key in members:
+                f.write(
+                    _pack(group_name.encode(), fingerprint.encode(), aead_enc, enc_key)
+                )
+            group_names = list(dict.fromkeys(member[0] for member in members))
+            group_marks = ",".join(["?"] * len(group_names))
+
+            names = [
+                row[0]
+                for row in connection.execute(
+                    f"select store_name from guardians where identity_fingerprint in ({marks})"
+                    f" union select store_name from group_guardians where group_name in ({group_marks})",
+                    [*fingerprints, *group_names],
+                )
+            ]
+            names.sort(key=_hash)
+
+            index = []
+            for name in names:
+                store = connection.execute(
+                    "select ciphertext, nonce from store where name=?", [name]
+                ).fetchone()
+                if store is None:
+                    continue
+                guardians = connection.execute(
+                    f"select identity_fingerprint, aead, key from guardians where store_name=? and identity_fingerprint in ({marks})",
+                    [name, *fingerprints],
+                ).fetchall()
+                group_guardians = connection.execute(
+                    f"select group_name, key from group_guardians where store_name=? and group_name in ({group_marks})",
+                    [name, *group_names],
+                ).fetchall()
+                expiries = connection.execute(
+                    "select token, expires_at from field_expiry where store_name=?",
+                    [name],
+                ).fetchall()
+
+                index.append(_INDEX.pack(_hash(name), f.tell()))
+                f.write(_pack(name.encode(), *store))
+                f.write(_COUNT.pack(len(guardians)))
+                for fingerprint, aead_enc, enc_key in guardians:
+                    f.write(_pack(fingerprint.encode(), aead_enc, enc_key))
+                f.write(_COUNT.pack(len(group_guardians)))
+                for group_name, enc_key in group_guardians:
+                    f.write(_pack(group_name.encode(), enc_key))
+                f.write(_COUNT.pack(len(expiries)))
+                for token, expires_at in expiries:
+                    f.write(_pack(token, _EXPIRES_AT.pack(expires_at)))
+
+            index_offset = f.tell()
+            f.write(b"".join(index))
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, len(index), index_offset))
+    finally:
+        connection.rollback()
+
+    os.replace(tmp_path, path)
+    return len(index)
+
+
+class Snapshot:
+    """
+    Read only snapshot written by build. The file is memory mapped, so processes reading the same snapshot share the page cache.
+    No database is needed to read it.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open and map the snapshot
+
+        :param path: The snapshot path
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._count, self._index_offset = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise InvalidSnapshot(path)
+
+        identities, offset = self._read_records(_HEADER.size, 3)
+        self.identities = {
+            fingerprint.decode(): RawIdentity(fingerprint.decode(), public, private)
+            for fingerprint, public, private in identities
+        }
+        keyrings, offset = self._read_records(offset, 3)
+        self.keyrings = {
+            fingerprint.decode(): Keyring(fingerprint.decode(), aead_enc, enc_key)
+            for fingerprint, aead_enc, enc_key in keyrings
+        }
+        members, _ = self._read_records(offset, 4)
+        self.members = [
+            GroupMember(group_name.decode(), fingerprint.decode(), aead_enc, enc_key)
+            for group_name, fingerprint, aead_enc, enc_key in members
+        ]
+
+    def _read_fields(self, offset: int, count: int) -> tuple[list[bytes], int]:
+        """Read count length prefixed fields and return them with the next offset"""
+        fields = []
+        for _ in range(count):
+            (size,) = _LENGTH.unpack_from(self._mmap, offset)
+            offset += _LENGTH.size
+            fields.append(self._mmap[offset : offset + size])
+            offset += size
+        return fields, offset
+
+    def _read_records(self, offset: int, count: int) -> tuple[list[list[bytes]], int]:
+        """Read a counted list of records of count fields each and return them with the next offset"""
+        (size,) = _COUNT.unpack_from(self._mmap, offset)
+        offset += _COUNT.size
+        records = []
+        for _ in range(size):
+            fields, offset = self._read_fields(offset, count)
+            records.append(fields)
+        return records, offset
+
+    def find(
+        self, name: str
+    ) -> (
+        tuple[EncryptedStore, list[Guardian], list[GroupGuardian], dict[bytes, int]]
+        | None
+    ):
+        """
+        Find a store with a binary search on the index
+
+        :param name: The store name
+        :return: The encrypted store, its guardians, its group guardians and its fields expiry times by token,
+            None if the store is not in the snapshot
+        """
+        target = _hash(name)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._index_entry(middle)[0] < target:
+                low = middle + 1
+            else:
+                high = middle
+
+        # Different names may share the same hash
+        while low < self._count:
+            name_hash, offset = self._index_entry(low)
+            if name_hash != target:
+                return None
+            (record_name, ciphertext, nonce), offset = self._read_fields(offset, 3)
+            if record_name.decode() == name:
+                records, offset = self._read_records(offset, 3)
+                guardians = [
+                    Guardian(name, fingerprint.decode(), aead_enc, enc_key)
+                    for fingerprint, aead_enc, enc_key in records
+                ]
+                records, offset = self._read_records(offset, 2)
+                group_guardians = [
+                    GroupGuardian(name, group_name.decode(), enc_key)
+                    for group_name, enc_key in records
+                ]
+                records, _ = self._read_records(offset, 2)
+                expiries = {
+                    bytes(token): _EXPIRES_AT.unpack(expires_at)[0]
+                    for token, expires_at in records
+                }
+                return (
+                    EncryptedStore(name, ciphertext, nonce),
+                    guardians,
+                    group_guardians,
+                    expiries,
+                )
+            low += 1
+        return None
+
+    def _index_entry(self, position: int) -> tuple[int, int]:
+        return _INDEX.unpack_from(
+            self._mmap, self._index_offset + position * _INDEX.size
+        )
+
+    def get_store(self, name: str, ssh_agent: "SSHAgent") -> Store | None:
+        """
+        Retrieve and decrypt a store. Identities are unlocked with the keys of the ssh agent.
+        The expired fields are removed, the others have their expiry time.
+
+        :param name: The store name
+        :param ssh_agent: The ssh agent
+        :return: The store or None if the store is not in the snapshot
+        """
+        found = self.find(name)
+        if found is None:
+            return None
+        enc_store, guardians, group_guardians, expiries = found
+
+        key = self._find_store_key(enc_store, guardians, group_guardians, ssh_agent)
+        store = decrypt_store(enc_store, key)
+        if expiries:
+            store.expires_at = find_field_expiries(expiries, store.data, key)
+            now = int(time.time())
+            for field, expires_at in list(store.expires_at.items()):
+                if expires_at <= now:
+                    store.discard(field)
+        return store
+
+    def _find_store_key(
+        self,
+        enc_store: EncryptedStore,
+        guardians: list[Guardian],
+        group_guardians: list[GroupGuardian],
+        ssh_agent: "SSHAgent",
+    ) -> bytes:
+        """Look for the store key in the guardians, then in the group guardians"""
+        keys = {key.fingerprint: key for key in ssh_agent.get_keys()}
+        unlocked: dict[str, "PrivateIdentity"] = {}
+
+        def unlock(fingerprint: str) -> "PrivateIdentity | None":
+            raw = self.identities.get(fingerprint)
+            if raw is None or fingerprint not in keys:
+                return None
+            if fingerprint not in unlocked:
+                unlocked[fingerprint] = create_private_key_from_raw(
+                    raw, keys[fingerprint]
+                )
+            return unlocked[fingerprint]
+
+        for guardian in guardians:
+            identity = unlock(guardian.identity_fingerprint)
+            if identity is None:
+                continue
+            key = self._open_guardian(guardian, identity)
+            if key is not None:
+                return key
+
+        # Not shared directly with an identity, look through the groups
+        for guardian in group_guardians:
+            for member in self.members:
+                if member.group_name != guardian.group_name:
+                    continue
+                identity = unlock(member.identity_fingerprint)
+                if identity is None:
+                    continue
+                group_key = hpke_open(identity, member.aead_enc, member.enc_key)
+                return unwrap_key(
+                    group_key,
+                    guardian.store_name,
+                    guardian.group_name,
+                    guardian.enc_key,
+                )
+        raise NoIdentityForStoreFound(enc_store.name)
+
+    def _open_guardian(
+        self, guardian: Guardian, identity: "PrivateIdentity"
+    ) -> bytes | None:
+        """Decrypt the store key of a guardian"""
+        if guardian.aead_enc != Guardian.KEYRING:
+            return hpke_open(identity, guardian.aead_enc, guardian.enc_key)
+        keyring = self.keyrings.get(identity.fingerprint)
+        if keyring is None:
+            return None
+        kek = hpke_open(identity, keyring.aead_enc, keyring.enc_key)
+        return unwrap_key(
+            kek, guardian.store_name, identity.fingerprint, guardian.enc_key
+        )
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
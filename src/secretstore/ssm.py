@@ -1,15 +1,33 @@
-import json
-from typing import TYPE_CHECKING
+import logging
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, BinaryIO, Generator, Iterable
 
-from Crypto.Cipher import ChaCha20
 from Crypto.Random import get_random_bytes
 
+from secretstore import backup, maintenance, snapshot
 from secretstore.agent import SSHAgent
-from secretstore.exceptions import NoIdentities, NoIdentityForStoreFound
+from secretstore.audit import AuditManager
+from secretstore.backend import Backend, SQLiteBackend
+from secretstore.buffer import SecretBuffer
+from secretstore.expiry import ExpiryManager
+from secretstore.exceptions import (
+    NoIdentities,
+    NoIdentityForStoreFound,
+    SSHKeyNotFound,
+    UnknownReferences,
+    UnsupportedBackend,
+)
+from secretstore.group import GroupManager
 from secretstore.guardian import GuardianManager
+from secretstore.history import HistoryManager, StoreVersion
 from secretstore.identity import IdentityManager
-from secretstore.identity.entity import PublicIdentity
-from secretstore.store import EncryptedStore, Store, StoreDAO
+from secretstore.identity.entity import PrivateIdentity, PublicIdentity
+from secretstore.index import IndexManager
+from secretstore.store import EncryptedStore, SecretStore, Store
+from secretstore.store.cipher import decrypt_store, decrypt_store_buffer, encrypt_store
+from secretstore.utils import transaction
+from secretstore.watch import StoreWatcher
 
 if TYPE_CHECKING:
     from sqlite3 import Connection
@@ -20,20 +38,82 @@ class SecretStoreManager:
     SecretStore Manager. Big Manager object to handle and abstract all store / encryption / storage actions.
     """
 
-    def __init__(self, connection: "Connection", ssh_agent: "SSHAgent"):
+    def __init__(
+        self,
+        connection: "Connection",
+        ssh_agent: "SSHAgent",
+        backend: Backend | None = None,
+        keep_unlocked: bool = False,
+        compress: bool = False,
+    ):
         """
         Initialize the Manager.
 
         :param connection: The sqlite connection to use
         :param ssh_agent: The ssh agent for ssh key manipulation
+        :param backend: The storage of the stores, guardians and identities. The sqlite database per default.
+            Groups, keyrings, the field index and the changelog stay in the sqlite database
+        :param keep_unlocked: Unlock the private identities once and keep them for the manager lifetime,
+            for long running processes doing many operations. The store keys found are kept too
+        :param compress: Compress the stores larger than 1 KiB before encrypting them.
+            The size of a compressed store depends on its content, don't use it for stores mixing secrets with values set by others
         """
 
         self._connection = connection
         self._ssh_agent = ssh_agent
+        self._backend = backend if backend is not None else SQLiteBackend(connection)
+        self._keep_unlocked = keep_unlocked
+        self._compress = compress
+        self._private_identities: list[PrivateIdentity] | None = None
+        self._store_keys: dict[str, bytes] = {}
+        self._store_keys_watcher: StoreWatcher | None = None
+        # The identity which opened each store key, for the audit log
+        self._key_holders: dict[str, str] = {}
 
-        self.identity_manager = IdentityManager(self._connection, self._ssh_agent)
-        self._store_dao = StoreDAO(self._connection)
-        self.guardian_manager = GuardianManager(self._connection)
+        self.identity_manager = IdentityManager(
+            self._connection, self._ssh_agent, self._backend.identity_dao
+        )
+        self._store_dao = self._backend.store_dao
+        self.guardian_manager = GuardianManager(
+            self._connection, self._backend.guardian_dao
+        )
+        self.group_manager = GroupManager(self._connection)
+        self.index_manager = IndexManager(self._connection)
+        self.history_manager = HistoryManager(self._connection)
+        self.audit_manager = AuditManager(self._connection)
+        self.expiry_manager = ExpiryManager(self._connection)
+
+    @contextmanager
+    def transaction(self) -> Generator["Connection", None, None]:
+        """
+        Open a unit of work: every change made in the block is committed once at its end, or rolled back on error.
+        Each operation of the manager is already a unit of work, joining the enclosing one if any.
+        The backend writes are part of it. They are applied after the sqlite commit, so a failed commit undoes them too.
+        """
+        with self._backend.transaction(), transaction(self._connection) as connection:
+            yield connection
+
+    def close(self):
+        """
+        Write the pending audit events and forget the identities and store keys kept unlocked.
+        The connection and the backend belong to the caller, they stay open.
+        Raise AuditEventsNotWritten if the audit events can't be written, the keys are forgotten anyway.
+        """
+        try:
+            self.audit_manager.close()
+        finally:
+            self._private_identities = None
+            self._store_keys.clear()
+            self._key_holders.clear()
+
+    def _get_private_identities(self) -> list[PrivateIdentity]:
+        """Unlock the private identities, or return the ones kept unlocked"""
+        if self._private_identities is not None:
+            return self._private_identities
+        ids = list(self.identity_manager.get_privates_identities())
+        if self._keep_unlocked:
+            self._private_identities = ids
+        return ids
 
     def new_store(self, store: Store):
         """
@@ -43,17 +123,23 @@ class SecretStoreManager:
         """
         # Encrypt the store data
         key = get_random_bytes(32)
-        encrypted_store = encrypt_store(store, key)
+        encrypted_store = encrypt_store(store, key, self._compress)
 
         # Store the key for each identity
-        ids = list(self.identity_manager.get_privates_identities())
+        ids = self._get_private_identities()
         if len(ids) == 0:
             raise NoIdentities()
 
-        for identity in ids:
-            self.guardian_manager.create_guardian(store.name, identity, key)
+        with self.transaction():
+            for identity in ids:
+                self.guardian_manager.create_guardian(store.name, identity, key)
 
-        self._store_dao.save(encrypted_store)
+            self._store_dao.save(encrypted_store)
+            self.history_manager.record(store, key)
+            self._index_store(store, ids)
+            self.expiry_manager.save_expiries(store, key)
+        self._key_holders[store.name] = ids[0].fingerprint
+        self._audit(AuditManager.CREATE, store.name)
 
     def get_encrypted_store(self, name: str) -> EncryptedStore | None:
         """Retrieve an EncryptedStore. None if nothing was found"""
@@ -65,11 +151,62 @@ class SecretStoreManager:
         if enc_store is None:
             return None
         key = self._get_store_key(enc_store)
+        store = decrypt_store(enc_store, key)
+        self._load_expiries(store, key)
+        self._audit(AuditManager.READ, name)
+        return store
+
+    def get_stores(self, names: list[str]) -> dict[str, Store]:
+        """
+        Retrieve and decrypt many stores. Identities are unlocked once and each store is decrypted once.
+
+        :param names: The names of the stores
+        :return: The stores found by name. Stores not found are missing
+        """
+        ids = self._get_private_identities()
+        stores = {}
+        for name in dict.fromkeys(names):
+            enc_store = self.get_encrypted_store(name)
+            if enc_store is not None:
+                key = self._get_store_key(enc_store, ids)
+                stores[name] = decrypt_store(enc_store, key)
+                self._load_expiries(stores[name], key)
+                self._audit(AuditManager.READ, name)
+        return stores
 
-        cipher = ChaCha20.new(key=key, nonce=enc_store.nonce)
-        plaintext = cipher.decrypt(enc_store.ciphertext)
-        data = json.loads(plaintext)
-        return Store(name, data)
+    def resolve(self, references: set[tuple[str, str]]) -> dict[tuple[str, str], str]:
+        """
+        Resolve (store, field) references, decrypting each referenced store once.
+
+        :param references: The references to resolve
+        :return: The value of each reference
+        """
+        stores = self.get_stores(sorted({store for store, _ in references}))
+        unknown = [
+            f"{store}.{field}"
+            for store, field in sorted(references)
+            if store not in stores or field not in stores[store].data
+        ]
+        if unknown:
+            raise UnknownReferences(unknown)
+        return {
+            (store, field): stores[store].data[field] for store, field in references
+        }
+
+    def open_store(self, name: str) -> SecretStore | None:
+        """
+        Retrieve and decrypt a store in a wipeable buffer. Return None if nothing was found.
+        Values are memoryviews on the decrypted data, use the store as a context manager to wipe them after use.
+        """
+        enc_store = self.get_encrypted_store(name)
+        if enc_store is None:
+            return None
+        key = self._get_store_key(enc_store)
+        with SecretBuffer(key) as buffer:
+            store = SecretStore(name, decrypt_store_buffer(enc_store, buffer))
+        self._load_expiries(store, key)
+        self._audit(AuditManager.READ, name)
+        return store
 
     def update_store(self, store: Store):
         """
@@ -77,23 +214,216 @@ class SecretStoreManager:
 
         :param store: The store to update
         """
-        key = self._get_store_key(store)
-        self._store_dao.update(encrypt_store(store, key))
+        ids = self._get_private_identities()
+        key = self._get_store_key(store, ids)
+        enc_store = self._store_dao.find(store.name)
+        previous = None if enc_store is None else decrypt_store(enc_store, key).data
+        with self.transaction():
+            self._write_update(store, key, previous, ids)
+        self._audit(AuditManager.UPDATE, store.name)
+
+    def _write_update(
+        self,
+        store: Store,
+        key: bytes,
+        previous: dict[str, str] | None,
+        private_identities: list[PrivateIdentity],
+    ):
+        """Save the new data of a store, its version, its index tokens and its fields expiry times"""
+        previous_expires_at = None
+        if previous is not None:
+            previous_expires_at = self.expiry_manager.get_expiries(
+                store.name, previous, key
+            )
+        self._store_dao.update(encrypt_store(store, key, self._compress))
+        self.history_manager.record(store, key, previous, previous_expires_at)
+        self._index_store(store, private_identities)
+        self.expiry_manager.save_expiries(store, key)
+
+    def import_stores(self, stores: list[Store]) -> tuple[list[str], list[str]]:
+        """
+        Create or update many stores in one transaction.
+        Identities are resolved once and each store is encrypted once.
+        The fields of an existing store are merged with the imported ones.
+
+        :param stores: The stores to import, with unique names
+        :return: The names of the created stores and the names of the updated stores
+        """
+        ids = self._get_private_identities()
+        if len(ids) == 0:
+            raise NoIdentities()
+
+        created: list[EncryptedStore] = []
+        updated: list[EncryptedStore] = []
+        guardians = []
+        indexed = []
+        versions = []
+        for store in stores:
+            enc_store = self.get_encrypted_store(store.name)
+            if enc_store is None:
+                key = get_random_bytes(32)
+                created.append(encrypt_store(store, key, self._compress))
+                indexed.append(store)
+                versions.append((store, key, None, None))
+                guardians.extend(
+                    self.guardian_manager.seal_guardian(store.name, identity, key)
+                    for identity in ids
+                )
+            else:
+                key = self._get_store_key(enc_store, ids)
+                merged = decrypt_store(enc_store, key)
+                previous = dict(merged.data)
+                merged.data.update(store.data)
+                merged.expires_at = self.expiry_manager.get_expiries(
+                    merged.name, previous, key
+                )
+                previous_expires_at = dict(merged.expires_at)
+                merged.expires_at.update(store.expires_at)
+                updated.append(encrypt_store(merged, key, self._compress))
+                indexed.append(merged)
+                versions.append((merged, key, previous, previous_expires_at))
+
+        with self.transaction():
+            self._store_dao.save_many(created)
+            self._store_dao.update_many(updated)
+            self.guardian_manager.save_guardians(guardians)
+            for store, key, previous, previous_expires_at in versions:
+                self.history_manager.record(store, key, previous, previous_expires_at)
+                self.expiry_manager.save_expiries(store, key)
+
+            index_keys = self.index_manager.get_index_keys(ids)
+            for store in indexed:
+                self.index_manager.index_store(store, index_keys)
+
+        for enc_store in created:
+            self._key_holders[enc_store.name] = ids[0].fingerprint
+            self._audit(AuditManager.CREATE, enc_store.name)
+        for enc_store in updated:
+            self._audit(AuditManager.UPDATE, enc_store.name)
+        return [s.name for s in created], [s.name for s in updated]
+
+    def store_history(self, name: str) -> list[StoreVersion]:
+        """
+        List the versions of a store. Nothing is decrypted.
+
+        :param name: The store name
+        :return: The versions, oldest first
+        """
+        return self.history_manager.find_versions(name)
+
+    def get_store_version(self, name: str, version: int) -> Store | None:
+        """
+        Retrieve and decrypt a previous version of a store
+
+        :param name: The store name
+        :param version: The version number, as listed by store_history
+        :return: The store as it was at this version, without the fields expired since.
+            None if the store or the version doesn't exist
+        """
+        enc_store = self.get_encrypted_store(name)
+        if enc_store is None:
+            return None
+        store = self.history_manager.get_version(
+            name, version, self._get_store_key(enc_store)
+        )
+        if store is not None:
+            _discard_expired(store)
+        self._audit(AuditManager.READ, name)
+        return store
+
+    def prune_history(self, keep: int) -> int:
+        """
+        Delete the old versions of all stores. Nothing is decrypted.
+
+        :param keep: The minimum number of versions to keep per store
+        :return: The number of deleted versions
+        """
+        return self.history_manager.prune(keep)
+
+    def expire_fields(self, now: int | None = None) -> dict[str, list[str]]:
+        """
+        Remove the expired fields of all stores in one transaction.
+        Only the stores having expired fields are decrypted, they are found with the expiry times index.
+        Stores the private identities can't decrypt are skipped.
+
+        :param now: The current time, in seconds since the epoch. The actual time per default
+        :return: The removed fields by store name
+        """
+        now = int(time.time()) if now is None else now
+        names = self.expiry_manager.find_expired_stores_names(now)
+        if not names:
+            return {}
+
+        ids = self._get_private_identities()
+        expired = {}
+        with self.transaction():
+            for name in names:
+                enc_store = self.get_encrypted_store(name)
+                if enc_store is None:
+                    continue
+                try:
+                    key = self._get_store_key(enc_store, ids)
+                except NoIdentityForStoreFound:
+                    continue
+
+                store = decrypt_store(enc_store, key)
+                previous = dict(store.data)
+                store.expires_at = self.expiry_manager.get_expiries(
+                    name, store.data, key
+                )
+                expired[name] = [
+                    field
+                    for field, expires_at in store.expires_at.items()
+                    if expires_at <= now
+                ]
+                if not expired[name]:
+                    # Only expiry times of removed fields were left
+                    self.expiry_manager.save_expiries(store, key)
+                    continue
+                for field in expired[name]:
+                    store.discard(field)
+                self._write_update(store, key, previous, ids)
+
+        for name, fields in expired.items():
+            if fields:
+                self._audit(AuditManager.UPDATE, name)
+        return {name: fields for name, fields in expired.items() if fields}
 
     def list_stores_name(self) -> list[str]:
         """List all stores owned by the private identities and return all names"""
-        return self.guardian_manager.find_stores_names(
-            list(self.identity_manager.get_privates_identities())
+        return self._find_stores_names(self._get_private_identities())
+
+    def list_stores_name_based_ssh_agent(self) -> list[str]:
+        """
+        List the stores shared with the identities of the ssh agent keys, without unlocking them.
+        The identities may not be able to decrypt the stores, only their guardians are looked up.
+        """
+        return self._find_stores_names(
+            list(self.identity_manager.get_identities_based_ssh_agent())
         )
 
+    def _find_stores_names(self, identities: list[PublicIdentity]) -> list[str]:
+        """Find the stores shared with the identities, directly or through a group"""
+        names = self.guardian_manager.find_stores_names(identities)
+        names += self.group_manager.find_stores_names(identities)
+        return list(dict.fromkeys(names))
+
     def delete_store(self, store: Store):
         """
         Delete the store and all related guardians
 
         :param store: The store to delete
         """
-        self._store_dao.delete(store)
-        self.guardian_manager.delete_store_guardians(store.name)
+        with self.transaction():
+            self._store_dao.delete(store)
+            self.guardian_manager.delete_store_guardians(store.name)
+            self.group_manager.delete_store_guardians(store.name)
+            self.index_manager.delete_store_index(store.name)
+            self.history_manager.delete_store_history(store.name)
+            self.expiry_manager.delete_store_expiries(store.name)
+        self._store_keys.pop(store.name, None)
+        self._audit(AuditManager.DELETE, store.name)
+        self._key_holders.pop(store.name, None)
 
     def share_store(self, store: Store | EncryptedStore, identity: PublicIdentity):
         """
@@ -104,33 +434,325 @@ class SecretStoreManager:
         """
         key = self._get_store_key(store)
         self.guardian_manager.create_guardian(store.name, identity, key)
+        self._audit(AuditManager.SHARE, store.name)
+
+    def share_store_with_group(self, store: Store | EncryptedStore, group_name: str):
+        """
+        Add a guardian for a group to a store. The user must be a member of the group.
+
+        :param store: The store to share
+        :param group_name: The group to share the store with
+        """
+        ids = self._get_private_identities()
+        key = self._get_store_key(store, ids)
+        with self.transaction():
+            self.group_manager.share_store(store.name, key, group_name, ids)
+        self._audit(AuditManager.SHARE, store.name)
+
+    def create_group(self, name: str):
+        """
+        Create a group with the private identities as members
+
+        :param name: The group name
+        """
+        ids = self._get_private_identities()
+        if len(ids) == 0:
+            raise NoIdentities()
+        with self.transaction():
+            self.group_manager.create_group(name, ids)
+
+    def add_group_member(self, name: str, identity: PublicIdentity) -> bool:
+        """
+        Add an identity to a group. The user must be a member of the group.
+
+        :param name: The group name
+        :param identity: The identity to add
+        :return: False if the identity was already a member of the group
+        """
+        ids = self._get_private_identities()
+        with self.transaction():
+            return self.group_manager.add_member(name, identity, ids)
 
-    def _get_store_key(self, store: Store | EncryptedStore) -> bytes:
+    def remove_group_member(self, name: str, fingerprint: str) -> bool:
         """
-        Look for the encryption key of a store
+        Remove an identity from a group. The group key is replaced, so the removed identity cannot open
+        the store keys shared with the group afterwards. The store keys are not replaced:
+        a store key the removed identity already opened still decrypts the store, even after an update.
+        Members whose identity doesn't exist anymore are removed too.
+
+        :param name: The group name
+        :param fingerprint: The fingerprint of the identity to remove
+        :return: False if the identity was not a member of the group
+        """
+        ids = self._get_private_identities()
+        members = self.group_manager.find_groups(ids).get(name, [])
+        if fingerprint not in members:
+            return False
+        identities = []
+        for member in members:
+            if member == fingerprint:
+                continue
+            identity = self.identity_manager.get_identity(member)
+            if identity is None:
+                logging.warning(
+                    f"The identity '{member}' was not found, it is removed from {name}"
+                )
+                continue
+            identities.append(identity)
+        with self.transaction():
+            self.group_manager.rotate(name, identities, ids)
+        return True
+
+    def list_groups(self) -> dict[str, list[str]]:
+        """List the groups of the private identities with their members fingerprints"""
+        return self.group_manager.find_groups(self._get_private_identities())
+
+    def enable_keyrings(self) -> int:
+        """
+        Enable the keyring of the private identities. Store keys are then wrapped with a symmetric key,
+        so only one asymmetric decryption per identity is needed to read any number of stores.
+
+        :return: The number of migrated guardians
+        """
+        ids = self._get_private_identities()
+        if len(ids) == 0:
+            raise NoIdentities()
+        with self.transaction():
+            return self.guardian_manager.enable_keyrings(ids)
+
+    def find_stores_names(self, field: str) -> list[str]:
+        """
+        Find the owned stores having a field, using the field index. Nothing is decrypted but the index keys.
+
+        :param field: The field name
+        :return: A list of stores names. Empty if the index is not enabled
+        """
+        ids = self._get_private_identities()
+        return self.index_manager.find_stores_names(
+            field, self.index_manager.get_index_keys(ids)
+        )
+
+    def reindex(self) -> int:
+        """
+        Enable the field index for the private identities and index all the owned stores.
+
+        :return: The number of indexed stores
+        """
+        ids = self._get_private_identities()
+        if len(ids) == 0:
+            raise NoIdentities()
+
+        count = 0
+        with self.transaction():
+            index_keys = self.index_manager.enable(ids)
+            for name in self._find_stores_names(ids):
+                enc_store = self._store_dao.find(name)
+                if enc_store is None:
+                    continue
+                store = decrypt_store(enc_store, self._get_store_key(enc_store, ids))
+                self.index_manager.index_store(store, index_keys)
+                count += 1
+        return count
+
+    def _index_store(self, store: Store, private_identities: list[PrivateIdentity]):
+        """
+        Update the field index of a store, if the index is enabled for the private identities
+
+        :param store: The decrypted store
+        :param private_identities: The unlocked identities
+        """
+        self.index_manager.index_store(
+            store, self.index_manager.get_index_keys(private_identities)
+        )
+
+    def watch_stores(self, names: list[str] | None = None) -> StoreWatcher:
+        """
+        Create a watcher detecting the stores changed by other processes. Nothing is decrypted.
+
+        :param names: The names of the stores to watch. All stores if None
+        :return: The watcher
+        """
+        return StoreWatcher(self._connection, names, self._store_dao)
+
+    def backup(self, output: BinaryIO, since: int = 0) -> int:
+        """
+        Write an archive of the whole database. Nothing is decrypted.
+
+        :param output: The binary stream to write the archive into
+        :param since: If not 0, only save what changed after this change number
+        :return: The last change number saved
+        """
+        self._check_sqlite_backend("Backup")
+        return backup.backup(self._connection, output, since)
+
+    def restore(self, source: BinaryIO) -> int:
+        """
+        Restore an archive created by backup
+
+        :param source: The binary stream to read the archive from
+        :return: The last change number of the archive
+        """
+        self._check_sqlite_backend("Restore")
+        return backup.restore(self._connection, source)
+
+    def export_changes(self, output: BinaryIO, since: int = 0) -> int:
+        """
+        Write the changes made after a change number, to apply them on another database.
+        Only encrypted data is exported.
+
+        :param output: The binary stream to write the changes into
+        :param since: Export the changes made after this change number
+        :return: The last change number exported
+        """
+        self._check_sqlite_backend("Sync")
+        return backup.backup(self._connection, output, since, incremental=True)
+
+    def apply_changes(self, source: BinaryIO) -> int:
+        """
+        Apply changes exported from another database.
+
+        :param source: The binary stream to read the changes from
+        :return: The last change number of the source database
+        """
+        self._check_sqlite_backend("Sync")
+        return backup.restore(self._connection, source, incremental_only=True)
+
+    def build_snapshot(self, path: str, fingerprints: list[str] | None = None) -> int:
+        """
+        Write a read only snapshot of the stores, readable without the database.
+
+        :param path: The snapshot path
+        :param fingerprints: The identities to include. Per default, the identities linked to the ssh agent keys
+        :return: The number of stores in the snapshot
+        """
+        if fingerprints is None:
+            fingerprints = [
+                i.fingerprint
+                for i in self.identity_manager.get_identities_based_ssh_agent()
+            ]
+        self._check_sqlite_backend("Snapshot")
+        return snapshot.build(self._connection, path, fingerprints)
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Gather statistics on the database: stores, guardians fan-out, orphans and pages usage. Nothing is decrypted.
+
+        :return: The statistics, by section
+        """
+        self._check_sqlite_backend("Stats")
+        return maintenance.stats(self._connection)
+
+    def maintenance(self, incremental: bool = False) -> dict[str, int]:
+        """
+        Purge the orphan rows, rebuild the indexes, analyze and vacuum the database.
+
+        :param incremental: Use an incremental vacuum instead of a full one
+        :return: The number of orphan rows deleted by table
+        """
+        self._check_sqlite_backend("Maintenance")
+        purged = maintenance.purge_orphans(self._connection)
+        maintenance.optimize(self._connection, incremental)
+        return purged
+
+    def _check_sqlite_backend(self, operation: str):
+        """Raise UnsupportedBackend for operations reading the sqlite tables directly"""
+        if not isinstance(self._backend, SQLiteBackend):
+            raise UnsupportedBackend(operation)
+
+    def _get_store_key(
+        self,
+        store: Store | EncryptedStore,
+        private_identities: list[PrivateIdentity] | None = None,
+    ) -> bytes:
+        """
+        Look for the encryption key of a store. When the identities are kept unlocked, the key is kept too
+
+        :param store: The store to decrypt
+        :param private_identities: The already unlocked identities to use. If None, they are unlocked from the ssh agent
+        :return: The encryption key
+        """
+        if not self._keep_unlocked:
+            if private_identities is None:
+                private_identities = self.identity_manager.get_privates_identities()
+            return self._find_store_key(store, private_identities)
+
+        # A store changed by another connection may have been deleted and created again with a new key
+        if self._store_keys_watcher is None:
+            self._store_keys_watcher = StoreWatcher(
+                self._connection, dao=self._store_dao
+            )
+        for name in self._store_keys_watcher.poll():
+            self._store_keys.pop(name, None)
+
+        key = self._store_keys.get(store.name)
+        if key is None:
+            if private_identities is None:
+                private_identities = self._get_private_identities()
+            key = self._find_store_key(store, private_identities)
+            self._store_keys[store.name] = key
+        return key
+
+    def _find_store_key(
+        self,
+        store: Store | EncryptedStore,
+        private_identities: Iterable[PrivateIdentity],
+    ) -> bytes:
+        """
+        Look for the encryption key of a store in its guardians, then in its group guardians
 
         :param store: The store to decrypt
+        :param private_identities: The unlocked identities to use
         :return: The encryption key
         """
-        for private_identity in self.identity_manager.get_privates_identities():
+        unlocked = []
+        for private_identity in private_identities:
+            unlocked.append(private_identity)
             key = self.guardian_manager.get_store_encryption_key(
                 store.name, private_identity
             )
             if key is not None:
+                self._key_holders[store.name] = private_identity.fingerprint
                 return key
+
+        # Not shared directly with an identity, look through the groups
+        found = self.group_manager.get_store_encryption_key(store.name, unlocked)
+        if found is not None:
+            key, self._key_holders[store.name] = found
+            return key
         raise NoIdentityForStoreFound(store.name)
 
+    def _load_expiries(self, store: Store | SecretStore, key: bytes):
+        """
+        Attach the expiry times of its fields to a decrypted store and remove its expired fields
 
-def encrypt_store(store: Store, key: bytes) -> EncryptedStore:
-    """
-    Encrypt store data with ChaCha20. A 8 bytes Nonce is generated each time.
+        :param store: The decrypted store
+        :param key: The store encryption key
+        """
+        fields = store.data if isinstance(store, Store) else store.fields()
+        store.expires_at = self.expiry_manager.get_expiries(store.name, fields, key)
+        _discard_expired(store)
 
-    :param store: The store to encrypt
-    :param key: The key to use for encryption. (32 bytes)
-    :return: The Store with encrypted data
-    """
-    nonce = get_random_bytes(8)
-    cipher = ChaCha20.new(key=key, nonce=nonce)
-    plaintext = json.dumps(store.data).encode()
-    ciphertext = cipher.encrypt(plaintext)
-    return EncryptedStore(store.name, ciphertext, nonce)
+    def _audit(self, action: str, store_name: str):
+        """
+        Record an access in the audit log, for the identity which opened the store key.
+        A deletion doesn't open the key, the first identity of the ssh agent is recorded then
+
+        :param action: The AuditManager action
+        :param store_name: The store accessed
+        """
+        fingerprint = self._key_holders.get(store_name)
+        if fingerprint is None:
+            try:
+                fingerprints = self.identity_manager.get_fingerprints_based_ssh_agent()
+            except SSHKeyNotFound:
+                fingerprints = []
+            fingerprint = next(iter(fingerprints), None)
+        self.audit_manager.record(action, store_name, fingerprint)
+
+
+def _discard_expired(store: Store | SecretStore):
+    """Remove the fields of a store whose expiry time has passed"""
+    now = int(time.time())
+    for field, expires_at in list(store.expires_at.items()):
+        if expires_at <= now:
+            store.discard(field)
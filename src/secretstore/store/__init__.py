@@ -1,4 +1,5 @@
-from secretstore.store.dao import StoreDAO
+from secretstore.store.dao import AbstractStoreDAO, StoreDAO
 from secretstore.store.entity import EncryptedStore, Store
+from secretstore.store.secret import SecretStore
 
-__all__ = ["EncryptedStore", "Store", "StoreDAO"]
+__all__ = ["AbstractStoreDAO", "EncryptedStore", "SecretStore", "Store", "StoreDAO"]
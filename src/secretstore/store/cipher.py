@@ -0,0 +1,160 @@
+import json
+import struct
+import zlib
+from typing import Iterator
+
+from Crypto.Cipher import ChaCha20
+from Crypto.Random import get_random_bytes
+
+from secretstore.buffer import SecretBuffer
+from secretstore.exceptions import CorruptedStore
+from secretstore.store.entity import EncryptedStore, Store
+
+# Serialized data smaller than this is not compressed, it would not be worth it
+COMPRESSION_THRESHOLD = 1024
+# Compressed data is encrypted and decompressed by chunks of this size
+CHUNK_SIZE = 1 << 16
+# The largest ratio zlib reaches, a larger uncompressed size in a header is corrupted
+MAX_RATIO = 1032
+
+# The plaintext of a compressed store starts with this flag and the uncompressed size.
+# An uncompressed store is plain json, which never starts with this byte
+FLAG_ZLIB = 0x01
+_HEADER = struct.Struct(">BI")
+
+
+def _chunks(data: bytes | memoryview) -> Iterator[memoryview]:
+    view = memoryview(data)
+    for start in range(0, len(view), CHUNK_SIZE):
+        yield view[start : start + CHUNK_SIZE]
+
+
+def _compress(plaintext: bytes) -> list[bytes] | None:
+    """Compress by chunks, return None if the data doesn't get smaller"""
+    compressor = zlib.compressobj()
+    chunks = [_HEADER.pack(FLAG_ZLIB, len(plaintext))]
+    chunks.extend(compressor.compress(chunk) for chunk in _chunks(plaintext))
+    chunks.append(compressor.flush())
+    if sum(len(chunk) for chunk in chunks) >= len(plaintext):
+        return None
+    return chunks
+
+
+def encrypt_store(store: Store, key: bytes, compress: bool = False) -> EncryptedStore:
+    """
+    Encrypt store data with ChaCha20. A 8 bytes Nonce is generated each time.
+    With compress, data larger than COMPRESSION_THRESHOLD is compressed before encryption, unless it doesn't get smaller.
+    The ciphertext size then depends on the content: don't compress a store mixing secrets with values set by others.
+
+    :param store: The store to encrypt
+    :param key: The key to use for encryption. (32 bytes)
+    :param compress: Allow compression
+    :return: The Store with encrypted data
+    """
+    nonce = get_random_bytes(8)
+    cipher = ChaCha20.new(key=key, nonce=nonce)
+    plaintext = json.dumps(store.data).encode()
+
+    chunks = None
+    if compress and len(plaintext) >= COMPRESSION_THRESHOLD:
+        chunks = _compress(plaintext)
+    if chunks is None:
+        return EncryptedStore(store.name, cipher.encrypt(plaintext), nonce)
+    return EncryptedStore(
+        store.name, b"".join(cipher.encrypt(chunk) for chunk in chunks), nonce
+    )
+
+
+def _decrypt_header(cipher, enc_store: EncryptedStore) -> int | None:
+    """
+    Decrypt the compression header, return the uncompressed size or None if the data is not compressed.
+    The header is not authenticated, the size is only trusted within the zlib ratio
+    """
+    ciphertext = enc_store.ciphertext
+    if len(ciphertext) < _HEADER.size:
+        return None
+    flag, size = _HEADER.unpack(cipher.decrypt(ciphertext[: _HEADER.size]))
+    if flag != FLAG_ZLIB:
+        return None
+    if size > (len(ciphertext) - _HEADER.size) * MAX_RATIO:
+        raise CorruptedStore(enc_store.name)
+    return size
+
+
+def _decompress(
+    enc_store: EncryptedStore, compressed: memoryview, size: int
+) -> Iterator[bytes]:
+    """
+    Decompress by chunks of CHUNK_SIZE compressed bytes, never producing more than size bytes.
+    Raise CorruptedStore if the data doesn't decompress to exactly size bytes
+    """
+    decompressor = zlib.decompressobj()
+    written = 0
+    try:
+        for chunk in _chunks(compressed):
+            # One byte more than announced is enough to tell a longer data
+            data = decompressor.decompress(chunk, size + 1 - written)
+            written += len(data)
+            if written > size:
+                raise CorruptedStore(enc_store.name)
+            yield data
+            if decompressor.eof:
+                break
+    except zlib.error as e:
+        raise CorruptedStore(enc_store.name) from e
+    if written != size or not decompressor.eof:
+        raise CorruptedStore(enc_store.name)
+
+
+def decrypt_store(enc_store: EncryptedStore, key: bytes) -> Store:
+    """
+    Decrypt store data encrypted by encrypt_store
+
+    :param enc_store: The store to decrypt
+    :param key: The key used for encryption. (32 bytes)
+    :return: The Store with decrypted data
+    """
+    cipher = ChaCha20.new(key=key, nonce=enc_store.nonce)
+    size = _decrypt_header(cipher, enc_store)
+    if size is None:
+        cipher = ChaCha20.new(key=key, nonce=enc_store.nonce)
+        plaintext = cipher.decrypt(enc_store.ciphertext)
+    else:
+        compressed = cipher.decrypt(memoryview(enc_store.ciphertext)[_HEADER.size :])
+        plaintext = b"".join(_decompress(enc_store, memoryview(compressed), size))
+    return Store(enc_store.name, json.loads(plaintext))
+
+
+def decrypt_store_buffer(enc_store: EncryptedStore, key: SecretBuffer) -> SecretBuffer:
+    """
+    Decrypt store data encrypted by encrypt_store, in place in a preallocated SecretBuffer.
+    Compressed data is decrypted in place too, then decompressed into the buffer by chunks bounded by its size.
+    zlib returns each decompressed chunk as bytes, which can't be wiped: only stores written without compression,
+    the default, never leave a copy of their data.
+
+    :param enc_store: The store to decrypt
+    :param key: The key used for encryption. (32 bytes)
+    :return: The buffer holding the serialized data
+    """
+    cipher = ChaCha20.new(key=key.view(), nonce=enc_store.nonce)
+    size = _decrypt_header(cipher, enc_store)
+    if size is None:
+        plaintext = SecretBuffer(len(enc_store.ciphertext))
+        cipher = ChaCha20.new(key=key.view(), nonce=enc_store.nonce)
+        cipher.decrypt(enc_store.ciphertext, output=plaintext.view())
+        return plaintext
+
+    ciphertext = memoryview(enc_store.ciphertext)[_HEADER.size :]
+    plaintext = SecretBuffer(size)
+    with SecretBuffer(len(ciphertext)) as compressed:
+        cipher.decrypt(ciphertext, output=compressed.view())
+        output = plaintext.view()
+        offset = 0
+        try:
+            for data in _decompress(enc_store, compressed.view(), size):
+                output[offset : offset + len(data)] = data
+                offset += len(data)
+        except CorruptedStore:
+            plaintext.wipe()
+            raise
+    return plaintext
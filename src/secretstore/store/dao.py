@@ -1,7 +1,11 @@
+import sqlite3
+from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
+from secretstore.changelog import ChangeLogDAO
+from secretstore.exceptions import AlreadyExists
 from secretstore.store.entity import EncryptedStore
-from secretstore.utils import Singleton
+from secretstore.utils import Singleton, transaction
 
 if TYPE_CHECKING:
     from sqlite3 import Connection
@@ -16,7 +20,69 @@ _TABLE = f"""create table if not exists
 )"""
 
 
-class StoreDAO(metaclass=Singleton):
+class AbstractStoreDAO(ABC):
+    """Storage of the encrypted stores, implemented by each backend."""
+
+    @abstractmethod
+    def save(self, encrypted_store: EncryptedStore):
+        """
+        Save a new store. Saving a store that already exists raises AlreadyExists.
+
+        :param encrypted_store: The store to save with its data already encrypted
+        """
+
+    @abstractmethod
+    def save_many(self, encrypted_stores: list[EncryptedStore]):
+        """
+        Save new stores in bulk. Backends with transactions don't commit, the caller owns the transaction.
+        Saving a store that already exists raises AlreadyExists.
+
+        :param encrypted_stores: The stores to save with their data already encrypted
+        """
+
+    @abstractmethod
+    def find(self, name: str) -> EncryptedStore | None:
+        """
+        Find a store based on its name.
+
+        :return: The encrypted store or None if nothing was found
+        """
+
+    @abstractmethod
+    def find_nonces(self, names: list[str] | None = None) -> dict[str, bytes]:
+        """
+        Find the nonces of stores.
+
+        :param names: The names of the stores. All stores if None
+        :return: The nonce of each store found
+        """
+
+    @abstractmethod
+    def update(self, enc_store: EncryptedStore):
+        """
+        Update an existing store
+
+        :param enc_store: The store to update
+        """
+
+    @abstractmethod
+    def update_many(self, enc_stores: list[EncryptedStore]):
+        """
+        Update existing stores in bulk. Backends with transactions don't commit, the caller owns the transaction.
+
+        :param enc_stores: The stores to update
+        """
+
+    @abstractmethod
+    def delete(self, store: "Store"):
+        """
+        Delete a store.
+
+        :param store: The store to delete
+        """
+
+
+class StoreDAO(AbstractStoreDAO, metaclass=Singleton):
     """Data Access Object for Store Object."""
 
     def __init__(self, connection: "Connection"):
@@ -27,6 +93,7 @@ class StoreDAO(metaclass=Singleton):
         """
         self._connection = connection
         self._connection.execute(_TABLE)
+        self._changelog = ChangeLogDAO(connection)
 
     def save(self, encrypted_store: EncryptedStore):
         """
@@ -34,15 +101,37 @@ class StoreDAO(metaclass=Singleton):
 
         :param encrypted_store: The store to save with its data already encrypted
         """
-        with self._connection as conn:
-            conn.execute(
+        with transaction(self._connection) as conn:
+            try:
+                conn.execute(
+                    f"insert into {_TABLE_NAME} values(?,?,?)",
+                    (
+                        encrypted_store.name,
+                        encrypted_store.ciphertext,
+                        encrypted_store.nonce,
+                    ),
+                )
+            except sqlite3.IntegrityError as e:
+                raise AlreadyExists(encrypted_store.name) from e
+            self._changelog.append(_TABLE_NAME, encrypted_store.name)
+
+    def save_many(self, encrypted_stores: list[EncryptedStore]):
+        """
+        Save new stores in bulk. Nothing is committed, the caller owns the transaction.
+
+        :param encrypted_stores: The stores to save with their data already encrypted
+        """
+        inserted = self._connection.total_changes
+        try:
+            self._connection.executemany(
                 f"insert into {_TABLE_NAME} values(?,?,?)",
-                (
-                    encrypted_store.name,
-                    encrypted_store.ciphertext,
-                    encrypted_store.nonce,
-                ),
+                [(s.name, s.ciphertext, s.nonce) for s in encrypted_stores],
             )
+        except sqlite3.IntegrityError as e:
+            # The rows are inserted in order, the failed one follows those inserted
+            failed = encrypted_stores[self._connection.total_changes - inserted]
+            raise AlreadyExists(failed.name) from e
+        self._changelog.append_many(_TABLE_NAME, [s.name for s in encrypted_stores])
 
     def find(self, name: str) -> EncryptedStore | None:
         """
@@ -56,17 +145,47 @@ class StoreDAO(metaclass=Singleton):
             return EncryptedStore(*result)
         return None
 
+    def find_nonces(self, names: list[str] | None = None) -> dict[str, bytes]:
+        """
+        Find the nonces of stores. A new nonce is generated each time a store is saved,
+        so comparing nonces tells if a store changed without reading its data.
+
+        :param names: The names of the stores. All stores if None
+        :return: The nonce of each store found
+        """
+        if names is None:
+            cur = self._connection.execute(f"select name, nonce from {_TABLE_NAME}")
+        else:
+            cur = self._connection.execute(
+                f"select name, nonce from {_TABLE_NAME} where name in ({','.join(['?']*len(names))})",
+                names,
+            )
+        return dict(cur.fetchall())
+
     def update(self, enc_store: EncryptedStore):
         """
         Update an existing store
 
         :param enc_store: The store to update
         """
-        with self._connection as conn:
+        with transaction(self._connection) as conn:
             conn.execute(
                 f"update {_TABLE_NAME} set ciphertext=?, nonce=? where name=?",
                 [enc_store.ciphertext, enc_store.nonce, enc_store.name],
             )
+            self._changelog.append(_TABLE_NAME, enc_store.name)
+
+    def update_many(self, enc_stores: list[EncryptedStore]):
+        """
+        Update existing stores in bulk. Nothing is committed, the caller owns the transaction.
+
+        :param enc_stores: The stores to update
+        """
+        self._connection.executemany(
+            f"update {_TABLE_NAME} set ciphertext=?, nonce=? where name=?",
+            [(s.ciphertext, s.nonce, s.name) for s in enc_stores],
+        )
+        self._changelog.append_many(_TABLE_NAME, [s.name for s in enc_stores])
 
     def delete(self, store: "Store"):
         """
@@ -74,5 +193,6 @@ class StoreDAO(metaclass=Singleton):
 
         :param store: The store to delete
         """
-        with self._connection as conn:
+        with transaction(self._connection) as conn:
             conn.execute(f"delete from {_TABLE_NAME} where name=?", [store.name])
+            self._changelog.append(_TABLE_NAME, store.name)
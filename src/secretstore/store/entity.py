@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -8,10 +9,23 @@ class Store:
     Fields:
         - name: The store name
         - data: the dict that store all the data
+        - expires_at: The expiry time of the fields which have one, in seconds since the epoch. Not encrypted
     """
 
     name: str
     data: dict[str, str]
+    expires_at: dict[str, int] = field(default_factory=dict)
+
+    def ttl(self, field_name: str) -> int | None:
+        """Return the seconds left before the field expires, None if it doesn't expire"""
+        if field_name not in self.expires_at:
+            return None
+        return max(0, self.expires_at[field_name] - int(time.time()))
+
+    def discard(self, field_name: str):
+        """Remove a field and its expiry time"""
+        self.data.pop(field_name, None)
+        self.expires_at.pop(field_name, None)
 
 
 @dataclass
@@ -0,0 +1,222 @@
+import json
+import time
+from typing import Iterator
+
+from secretstore.buffer import SecretBuffer
+from secretstore.exceptions import CorruptedStore
+
+_WHITESPACES = b" \t\n\r"
+_HEX_DIGITS = b"0123456789abcdefABCDEF"
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_ESCAPES = {
+    ord('"'): ord('"'),
+    ord("\\"): ord("\\"),
+    ord("/"): ord("/"),
+    ord("b"): ord("\b"),
+    ord("f"): ord("\f"),
+    ord("n"): ord("\n"),
+    ord("r"): ord("\r"),
+    ord("t"): ord("\t"),
+}
+
+
+class SecretStore:
+    """
+    Decrypted store whose data stays in a SecretBuffer.
+    Values are handed out as memoryviews of their utf-8 encoding, and are wiped when the store is closed.
+    Field names are not considered secret and are regular str.
+    """
+
+    def __init__(self, name: str, plaintext: SecretBuffer):
+        """
+        Initialize the store.
+        Raise CorruptedStore if the data isn't a json object of strings, the data is wiped then
+
+        :param name: The store name
+        :param plaintext: The decrypted store data, as serialized by encrypt_store. The store owns it
+        """
+        self.name = name
+        self.expires_at: dict[str, int] = {}
+        self._buffers = [plaintext]
+        self._values: dict[str, memoryview] = {}
+
+        data = plaintext.view()
+        try:
+            for field, start, end, escaped in _parse(data):
+                if escaped:
+                    # The value must be unescaped in its own buffer
+                    value = SecretBuffer(end - start)
+                    self._buffers.append(value)
+                    size = _unescape(data[start:end], value.view())
+                    self._values[field] = value.view(0, size)
+                else:
+                    self._values[field] = plaintext.view(start, end)
+        except (IndexError, KeyError, ValueError) as e:
+            # Truncated data reads past the end, unknown escapes aren't in _ESCAPES
+            self.close()
+            raise CorruptedStore(name) from e
+
+    def fields(self) -> list[str]:
+        """Return the fields of the store"""
+        return list(self._values.keys())
+
+    def __contains__(self, field: str) -> bool:
+        return field in self._values
+
+    def __getitem__(self, field: str) -> memoryview:
+        return self._values[field]
+
+    def get(self, field: str) -> memoryview | None:
+        """Return the value of a field, None if the field doesn't exist"""
+        return self._values.get(field)
+
+    def items(self) -> Iterator[tuple[str, memoryview]]:
+        """Iterate over the fields and their values"""
+        return iter(self._values.items())
+
+    def ttl(self, field: str) -> int | None:
+        """Return the seconds left before the field expires, None if it doesn't expire"""
+        if field not in self.expires_at:
+            return None
+        return max(0, self.expires_at[field] - int(time.time()))
+
+    def discard(self, field: str):
+        """Remove a field. Its value is wiped when the store is closed"""
+        self._values.pop(field, None)
+        self.expires_at.pop(field, None)
+
+    def close(self):
+        """Wipe all the decrypted data"""
+        self._values.clear()
+        for buffer in self._buffers:
+            buffer.wipe()
+
+    def __enter__(self) -> "SecretStore":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def _skip(data: memoryview, pos: int) -> int:
+    """Skip whitespaces"""
+    while data[pos] in _WHITESPACES:
+        pos += 1
+    return pos
+
+
+def _expect(data: memoryview, pos: int, char: bytes) -> int:
+    """Check the character at pos and return the next position"""
+    if data[pos] != char[0]:
+        raise ValueError(f"Invalid store data, expected {char!r} at {pos}")
+    return pos + 1
+
+
+def _string(data: memoryview, pos: int) -> tuple[int, int, bool]:
+    """
+    Locate a json string
+
+    :return: The start and the end of its content, and if it contains escape sequences
+    """
+    pos = _expect(data, pos, b'"')
+    start = pos
+    escaped = False
+    while data[pos] != _QUOTE:
+        if data[pos] == _BACKSLASH:
+            escaped = True
+            pos += 1
+        pos += 1
+    return start, pos, escaped
+
+
+def _parse(data: memoryview) -> Iterator[tuple[str, int, int, bool]]:
+    """
+    Locate the values of a json object of strings, without copying them
+
+    :return: For each field, its name, the start and end of its value and if the value is escaped
+    """
+    pos = _expect(data, _skip(data, 0), b"{")
+    pos = _skip(data, pos)
+    if data[pos] == ord("}"):
+        return
+    while True:
+        start, end, escaped = _string(data, pos)
+        if escaped:
+            field = json.loads(bytes(data[start - 1 : end + 1]))
+        else:
+            field = str(data[start:end], "utf-8")
+        pos = _expect(data, _skip(data, end + 1), b":")
+
+        start, end, escaped = _string(data, _skip(data, pos))
+        yield field, start, end, escaped
+
+        pos = _skip(data, end + 1)
+        if data[pos] == ord("}"):
+            return
+        pos = _skip(data, _expect(data, pos, b","))
+
+
+def _unescape(src: memoryview, dst: memoryview) -> int:
+    """
+    Decode a json string content into utf-8
+
+    :param src: The escaped string content
+    :param dst: The output, at least as large as src
+    :return: The size written in dst
+    """
+    i = 0
+    o = 0
+    while i < len(src):
+        c = src[i]
+        if c != _BACKSLASH:
+            dst[o] = c
+            o += 1
+            i += 1
+        elif src[i + 1] != ord("u"):
+            dst[o] = _ESCAPES[src[i + 1]]
+            o += 1
+            i += 2
+        else:
+            code = _code_unit(src, i + 2)
+            i += 6
+            if 0xD800 <= code < 0xDC00 and src[i : i + 2] == b"\\u":
+                low = _code_unit(src, i + 2)
+                if not 0xDC00 <= low < 0xE000:
+                    raise ValueError(f"Invalid store data, lone surrogate at {i - 6}")
+                code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                i += 6
+            elif 0xD800 <= code < 0xE000:
+                # utf-8 can't encode a surrogate alone
+                raise ValueError(f"Invalid store data, lone surrogate at {i - 6}")
+            o = _write_utf8(dst, o, code)
+    return o
+
+
+def _code_unit(src: memoryview, i: int) -> int:
+    """Read the 4 hex digits of a \\u escape"""
+    digits = bytes(src[i : i + 4])
+    if len(digits) != 4 or any(c not in _HEX_DIGITS for c in digits):
+        raise ValueError(f"Invalid store data, invalid \\u escape at {i - 2}")
+    return int(digits, 16)
+
+
+def _write_utf8(dst: memoryview, o: int, code: int) -> int:
+    """Write a code point in utf-8 and return the next position"""
+    if code < 0x80:
+        dst[o] = code
+        return o + 1
+    if code < 0x800:
+        dst[o] = 0xC0 | code >> 6
+        dst[o + 1] = 0x80 | code & 0x3F
+        return o + 2
+    if code < 0x10000:
+        dst[o] = 0xE0 | code >> 12
+        dst[o + 1] = 0x80 | code >> 6 & 0x3F
+        dst[o + 2] = 0x80 | code & 0x3F
+        return o + 3
+    dst[o] = 0xF0 | code >> 18
+    dst[o + 1] = 0x80 | code >> 12 & 0x3F
+    dst[o + 2] = 0x80 | code >> 6 & 0x3F
+    dst[o + 3] = 0x80 | code & 0x3F
+    return o + 4
@@ -0,0 +1,30 @@
+import re
+from typing import Iterable, TextIO
+
+# {{ store.field }}, the store name cannot contain a dot
+REFERENCE = re.compile(r"\{\{\s*([^\s.{}]+)\.([^\s{}]+?)\s*\}\}")
+
+
+def find_references(lines: Iterable[str]) -> set[tuple[str, str]]:
+    """
+    Find all the secret references of a template.
+
+    :param lines: The template lines
+    :return: The distinct (store, field) references
+    """
+    references = set()
+    for line in lines:
+        references.update(REFERENCE.findall(line))
+    return references
+
+
+def render(lines: Iterable[str], values: dict[tuple[str, str], str], output: TextIO):
+    """
+    Write the template with its references replaced, line by line.
+
+    :param lines: The template lines
+    :param values: The value of each (store, field) reference
+    :param output: Where to write the rendered template
+    """
+    for line in lines:
+        output.write(REFERENCE.sub(lambda m: values[(m[1], m[2])], line))
@@ -1,5 +1,9 @@
 from abc import ABCMeta
-from typing import Any
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Generator
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
 
 
 class Singleton(ABCMeta):
@@ -9,3 +13,29 @@ class Singleton(ABCMeta):
         if cls not in cls._instances:
             cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
         return cls._instances[cls]
+
+
+@contextmanager
+def transaction(connection: "Connection") -> Generator["Connection", None, None]:
+    """
+    Open a transaction committed at the end of the block, or rolled back on error.
+    If a transaction is already open, the block joins it and the outermost block commits,
+    so nested operations are atomic and cost a single commit.
+    The write lock is taken when the block opens: most operations read before their first write,
+    and a deferred transaction failing to upgrade its lock doesn't wait for the busy timeout.
+
+    :param connection: The sqlite connection
+    :return: The connection
+    """
+    if connection.in_transaction:
+        yield connection
+        return
+
+    connection.execute("begin immediate")
+    try:
+        yield connection
+        connection.commit()
+    except BaseException:
+        # A commit failing on a locked database leaves the transaction open, it is given up too
+        connection.rollback()
+        raise
@@ -0,0 +1,69 @@
+import time
+from typing import TYPE_CHECKING, Generator
+
+from secretstore.store import AbstractStoreDAO, StoreDAO
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+
+class StoreWatcher:
+    """
+    Detect the stores changed by other connections, without decrypting them.
+    PRAGMA data_version tells cheaply if anything was committed, and only then the store nonces are compared.
+    Stores of other backends have no data version, their nonces are compared on each poll.
+    """
+
+    def __init__(
+        self,
+        connection: "Connection",
+        names: list[str] | None = None,
+        dao: AbstractStoreDAO | None = None,
+    ):
+        """
+        Initialize the watcher with the current state of the stores
+
+        :param connection: The sqlite connection to use
+        :param names: The names of the stores to watch. All stores if None
+        :param dao: The store storage to watch. The sqlite one per default
+        """
+        self._connection = connection
+        self._dao = dao if dao is not None else StoreDAO(connection)
+        self._names = names
+        self._data_version = self._get_data_version()
+        self._nonces = self._dao.find_nonces(names)
+
+    def _get_data_version(self) -> int | None:
+        if not isinstance(self._dao, StoreDAO):
+            return None
+        return self._connection.execute("pragma data_version").fetchone()[0]
+
+    def poll(self) -> list[str]:
+        """
+        Return the names of the stores created, updated or deleted since the last poll
+        """
+        data_version = self._get_data_version()
+        if data_version is not None and data_version == self._data_version:
+            return []
+        self._data_version = data_version
+
+        nonces = self._dao.find_nonces(self._names)
+        changed = [
+            name
+            for name in nonces.keys() | self._nonces.keys()
+            if nonces.get(name) != self._nonces.get(name)
+        ]
+        self._nonces = nonces
+        return sorted(changed)
+
+    def watch(self, interval: float = 1.0) -> Generator[list[str], None, None]:
+        """
+        Poll forever and yield the changed stores names, when there are some
+
+        :param interval: The time to wait between polls, in seconds
+        """
+        while True:
+            time.sleep(interval)
+            changed = self.poll()
+            if changed:
+                yield changed
@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+from Crypto.PublicKey import ECC
+
+from fakeagent import FakeAgent, FakeKey
+
+from secretstore.backend import KVBackend, MemoryBackend, SQLiteBackend
+from secretstore.identity.entity import PrivateIdentity
+from secretstore.utils import Singleton
+
+__all__ = ["FakeAgent", "FakeKey"]
+
+
+@pytest.fixture
+def connection():
+    # DAOs are singletons, each test needs its own
+    Singleton._instances.clear()
+    connection = sqlite3.connect(":memory:")
+    yield connection
+    connection.close()
+    Singleton._instances.clear()
+
+
+@pytest.fixture(params=["sqlite", "memory", "kv"])
+def backend(request, connection, tmp_path):
+    if request.param == "sqlite":
+        backend = SQLiteBackend(connection)
+    elif request.param == "memory":
+        backend = MemoryBackend()
+    else:
+        backend = KVBackend(str(tmp_path / "kv.db"))
+    yield backend
+    backend.close()
+
+
+class TestIdentity(PrivateIdentity):
+    """Private identity encrypting its private key once, the key derivation is slow"""
+
+    __test__ = False
+
+    def __init__(self, name: str):
+        key = FakeKey(name)
+        private_key = ECC.generate(curve="p256")
+        super().__init__(key.fingerprint, private_key.public_key(), private_key, key)
+        self._enc_priv_key = super().get_bin_enc_priv_key()
+
+    def get_bin_enc_priv_key(self) -> bytes:
+        return self._enc_priv_key
+
+
+@pytest.fixture(scope="session")
+def identities() -> dict[str, TestIdentity]:
+    return {name: TestIdentity(name) for name in ("alice", "bob", "carol")}
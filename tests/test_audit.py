@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+from secretstore.audit import AuditManager
+from secretstore.exceptions import AuditEventsNotWritten
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+from secretstore.utils import Singleton
+
+from conftest import FakeAgent
+
+
+@pytest.fixture
+def database(tmp_path):
+    Singleton._instances.clear()
+    path = str(tmp_path / "audit.db")
+    connection = sqlite3.connect(path, timeout=0.1)
+    ssm = SecretStoreManager(connection, FakeAgent("alice"), keep_unlocked=True)
+    ssm.identity_manager.create_identities()
+    ssm.new_store(Store("api", {"token": "abc"}))
+    ssm.close()
+    yield path, ssm, connection
+    connection.close()
+    Singleton._instances.clear()
+
+
+def count(path: str) -> int:
+    with sqlite3.connect(path) as connection:
+        return connection.execute("select count(*) from audit_log").fetchone()[0]
+
+
+def test_rolled_back_transaction(database, monkeypatch):
+    path, ssm, _ = database
+    monkeypatch.setattr(AuditManager, "FLUSH_INTERVAL", 0)
+    monkeypatch.setattr(AuditManager, "MAX_PENDING", 1 << 20)
+    monkeypatch.setattr(AuditManager, "MAX_QUEUED", 1 << 20)
+
+    with pytest.raises(RuntimeError):
+        with ssm.transaction():
+            ssm.get_store("api")
+            ssm.get_store("api")
+            raise RuntimeError()
+    ssm.get_store("api")
+    assert count(path) == 4
+
+
+def test_locked(database, monkeypatch):
+    path, ssm, _ = database
+    monkeypatch.setattr(AuditManager, "MAX_PENDING", 2)
+    monkeypatch.setattr(AuditManager, "MAX_QUEUED", 5)
+
+    other = sqlite3.connect(path)
+    other.execute("begin immediate")
+    # The batch flushes fail at once without failing the reads
+    for _ in range(4):
+        ssm.get_store("api")
+    # The queue is full, the flush waits for the busy timeout then fails
+    with pytest.raises(AuditEventsNotWritten, match="^5 audit events"):
+        ssm.get_store("api")
+    with pytest.raises(AuditEventsNotWritten):
+        ssm.close()
+
+    other.rollback()
+    other.close()
+    ssm.close()
+    assert count(path) == 1 + 5
+
+
+def test_locked_by_a_reader(database, monkeypatch):
+    path, ssm, connection = database
+    monkeypatch.setattr(AuditManager, "MAX_PENDING", 1)
+
+    reader = sqlite3.connect(path)
+    reader.execute("begin")
+    reader.execute("select count(*) from store").fetchone()
+    # The flush can't commit while the reader holds its lock, its transaction is rolled back
+    ssm.get_store("api")
+    assert not connection.in_transaction
+
+    reader.rollback()
+    reader.close()
+    ssm.close()
+    assert count(path) == 1 + 1
@@ -0,0 +1,262 @@
+"""Conformance suite: every backend implements the abstract DAOs the same way"""
+
+import pytest
+
+from secretstore.exceptions import AlreadyExists
+from secretstore.guardian.entity import Guardian
+from secretstore.identity import IdentityManager
+from secretstore.identity.entity import RawIdentity
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import EncryptedStore, Store
+
+from conftest import FakeAgent
+
+
+def encrypted(name: str, version: int = 0) -> EncryptedStore:
+    return EncryptedStore(name, f"{name}-{version}".encode(), bytes([version]) * 12)
+
+
+def guardian(store_name: str, fingerprint: str, version: int = 0) -> Guardian:
+    return Guardian(store_name, fingerprint, b"aead", f"key-{version}".encode())
+
+
+class TestStoreDAO:
+    def test_save_find(self, backend):
+        backend.store_dao.save(encrypted("a"))
+        assert backend.store_dao.find("a") == encrypted("a")
+        assert backend.store_dao.find("b") is None
+
+    def test_save_existing(self, backend):
+        backend.store_dao.save(encrypted("a"))
+        with pytest.raises(AlreadyExists):
+            backend.store_dao.save(encrypted("a", 1))
+        assert backend.store_dao.find("a") == encrypted("a")
+
+    def test_save_many(self, backend):
+        backend.store_dao.save_many([encrypted("a"), encrypted("b")])
+        assert backend.store_dao.find("a") == encrypted("a")
+        assert backend.store_dao.find("b") == encrypted("b")
+
+    def test_save_many_existing(self, backend):
+        backend.store_dao.save(encrypted("b"))
+        with pytest.raises(AlreadyExists, match="^b "):
+            backend.store_dao.save_many([encrypted("a"), encrypted("b", 1)])
+
+    def test_find_nonces(self, backend):
+        backend.store_dao.save_many([encrypted("a", 1), encrypted("b", 2)])
+        assert backend.store_dao.find_nonces() == {
+            "a": encrypted("a", 1).nonce,
+            "b": encrypted("b", 2).nonce,
+        }
+        assert backend.store_dao.find_nonces(["b", "missing"]) == {
+            "b": encrypted("b", 2).nonce
+        }
+
+    def test_update(self, backend):
+        backend.store_dao.save(encrypted("a"))
+        backend.store_dao.update(encrypted("a", 1))
+        assert backend.store_dao.find("a") == encrypted("a", 1)
+
+    def test_update_missing(self, backend):
+        backend.store_dao.update(encrypted("a"))
+        assert backend.store_dao.find("a") is None
+
+    def test_update_many(self, backend):
+        backend.store_dao.save_many([encrypted("a"), encrypted("b")])
+        backend.store_dao.update_many([encrypted("a", 1), encrypted("b", 2)])
+        assert backend.store_dao.find("a") == encrypted("a", 1)
+        assert backend.store_dao.find("b") == encrypted("b", 2)
+
+    def test_delete(self, backend):
+        backend.store_dao.save_many([encrypted("a"), encrypted("b")])
+        backend.store_dao.delete(Store("a", {}))
+        assert backend.store_dao.find("a") is None
+        assert list(backend.store_dao.find_nonces()) == ["b"]
+        backend.store_dao.save(encrypted("a", 1))
+        assert backend.store_dao.find("a") == encrypted("a", 1)
+
+
+class TestGuardianDAO:
+    def test_save_find(self, backend):
+        backend.guardian_dao.save(guardian("a", "f1"))
+        assert backend.guardian_dao.find("a", "f1") == guardian("a", "f1")
+        assert backend.guardian_dao.find("a", "f2") is None
+        assert backend.guardian_dao.find("b", "f1") is None
+
+    def test_save_existing(self, backend):
+        backend.guardian_dao.save(guardian("a", "f1"))
+        with pytest.raises(AlreadyExists):
+            backend.guardian_dao.save(guardian("a", "f1", 1))
+
+    def test_save_many_existing(self, backend):
+        backend.guardian_dao.save(guardian("a", "f2"))
+        with pytest.raises(AlreadyExists, match="^a/f2 "):
+            backend.guardian_dao.save_many([guardian("a", "f1"), guardian("a", "f2")])
+
+    def test_find_identity_guardians(self, backend):
+        backend.guardian_dao.save_many(
+            [guardian("b", "f1"), guardian("a", "f1"), guardian("a", "f2")]
+        )
+        found = backend.guardian_dao.find_identity_guardians("f1")
+        assert sorted(found, key=lambda g: g.store_name) == [
+            guardian("a", "f1"),
+            guardian("b", "f1"),
+        ]
+        assert backend.guardian_dao.find_identity_guardians("f3") == []
+
+    def test_update_many(self, backend):
+        backend.guardian_dao.save_many([guardian("a", "f1"), guardian("b", "f1")])
+        backend.guardian_dao.update_many([guardian("a", "f1", 1), guardian("c", "f1")])
+        assert backend.guardian_dao.find("a", "f1") == guardian("a", "f1", 1)
+        assert backend.guardian_dao.find("b", "f1") == guardian("b", "f1")
+        assert backend.guardian_dao.find("c", "f1") is None
+
+    def test_find_stores_names(self, backend):
+        backend.guardian_dao.save_many(
+            [guardian("b", "f1"), guardian("a", "f1"), guardian("a", "f2")]
+        )
+        assert backend.guardian_dao.find_stores_names(["f1", "f2"]) == ["a", "b"]
+        assert backend.guardian_dao.find_stores_names(["f2"]) == ["a"]
+        assert backend.guardian_dao.find_stores_names(["f3"]) == []
+        assert backend.guardian_dao.find_stores_names([]) == []
+
+    def test_delete_store_guardians(self, backend):
+        backend.guardian_dao.save_many(
+            [guardian("a", "f1"), guardian("a", "f2"), guardian("b", "f1")]
+        )
+        backend.guardian_dao.delete_store_guardians("a")
+        assert backend.guardian_dao.find("a", "f1") is None
+        assert backend.guardian_dao.find_stores_names(["f1", "f2"]) == ["b"]
+        backend.guardian_dao.save(guardian("a", "f1", 1))
+        assert backend.guardian_dao.find("a", "f1") == guardian("a", "f1", 1)
+
+
+class TestIdentityDAO:
+    def raw(self, identity) -> RawIdentity:
+        return RawIdentity(
+            identity.fingerprint,
+            identity.get_bin_public_key(),
+            identity.get_bin_enc_priv_key(),
+        )
+
+    def test_empty(self, backend):
+        assert backend.identity_dao.get_identities() == []
+        assert backend.identity_dao.get_identities_by_fingerprints(["f1"]) == []
+        assert backend.identity_dao.get_fingerprints() == []
+        assert backend.identity_dao.get_keys_by_fingerprint("f1") is None
+
+    def test_save_get(self, backend, identities):
+        alice, bob = identities["alice"], identities["bob"]
+        backend.identity_dao.save_identity(alice)
+        backend.identity_dao.save_identity(bob)
+
+        found = backend.identity_dao.get_identities()
+        assert isinstance(found, list)
+        assert sorted(found, key=lambda i: i.fingerprint) == sorted(
+            [self.raw(alice), self.raw(bob)], key=lambda i: i.fingerprint
+        )
+        assert backend.identity_dao.get_keys_by_fingerprint(alice.fingerprint) == (
+            alice.get_bin_public_key(),
+            alice.get_bin_enc_priv_key(),
+        )
+
+    def test_get_identities_by_fingerprints(self, backend, identities):
+        alice, bob = identities["alice"], identities["bob"]
+        backend.identity_dao.save_identity(alice)
+        backend.identity_dao.save_identity(bob)
+
+        found = backend.identity_dao.get_identities_by_fingerprints(
+            [alice.fingerprint, "missing", alice.fingerprint]
+        )
+        assert found == [self.raw(alice)]
+
+    def test_get_fingerprints(self, backend, identities):
+        alice, bob = identities["alice"], identities["bob"]
+        backend.identity_dao.save_identity(alice)
+        backend.identity_dao.save_identity(bob)
+
+        assert sorted(backend.identity_dao.get_fingerprints()) == sorted(
+            [alice.fingerprint, bob.fingerprint]
+        )
+        assert backend.identity_dao.get_fingerprints([bob.fingerprint, "missing"]) == [
+            bob.fingerprint
+        ]
+
+    def test_save_existing(self, backend, identities):
+        backend.identity_dao.save_identity(identities["alice"])
+        with pytest.raises(AlreadyExists):
+            backend.identity_dao.save_identity(identities["alice"])
+
+
+class TestTransaction:
+    def test_commit(self, backend):
+        with backend.transaction():
+            backend.store_dao.save(encrypted("a"))
+            backend.guardian_dao.save(guardian("a", "alice"))
+            # Writes are visible in the unit of work
+            assert backend.store_dao.find("a") == encrypted("a")
+            assert backend.guardian_dao.find_stores_names(["alice"]) == ["a"]
+        assert backend.store_dao.find("a") == encrypted("a")
+        assert backend.guardian_dao.find_stores_names(["alice"]) == ["a"]
+
+    def test_rollback(self, backend):
+        backend.store_dao.save(encrypted("a"))
+        backend.guardian_dao.save(guardian("a", "alice"))
+        with pytest.raises(RuntimeError):
+            with backend.transaction():
+                backend.store_dao.update(encrypted("a", 1))
+                backend.store_dao.save(encrypted("b"))
+                backend.guardian_dao.delete_store_guardians("a")
+                backend.guardian_dao.save(guardian("b", "alice"))
+                with backend.transaction():
+                    backend.store_dao.delete(Store("a", {}))
+                raise RuntimeError()
+        assert backend.store_dao.find("a") == encrypted("a")
+        assert backend.store_dao.find("b") is None
+        assert backend.store_dao.find_nonces() == {"a": encrypted("a").nonce}
+        assert backend.guardian_dao.find("a", "alice") == guardian("a", "alice")
+        assert backend.guardian_dao.find_stores_names(["alice"]) == ["a"]
+
+
+class TestManagers:
+    def test_get_identity(self, backend, connection, identities):
+        alice = identities["alice"]
+        backend.identity_dao.save_identity(alice)
+        manager = IdentityManager(connection, FakeAgent(), backend.identity_dao)
+
+        assert manager.get_identity(alice.fingerprint).fingerprint == alice.fingerprint
+        assert manager.get_identity("missing") is None
+
+    def test_share_store(self, backend, connection):
+        alice = SecretStoreManager(connection, FakeAgent("alice"), backend)
+        alice.identity_manager.create_identities()
+        alice.new_store(Store("api", {"token": "abc"}))
+
+        bob = SecretStoreManager(connection, FakeAgent("bob"), backend)
+        bob.identity_manager.create_identities()
+        assert bob.list_stores_name() == []
+
+        identity = alice.identity_manager.get_identity(
+            FakeAgent("bob")._keys[0].fingerprint
+        )
+        alice.share_store(alice.get_encrypted_store("api"), identity)
+        assert bob.list_stores_name() == ["api"]
+        assert bob.get_store("api").data == {"token": "abc"}
+
+    def test_rollback(self, backend, connection):
+        ssm = SecretStoreManager(
+            connection, FakeAgent("alice"), backend, keep_unlocked=True
+        )
+        ssm.identity_manager.create_identities()
+        ssm.new_store(Store("api", {"token": "abc"}))
+        with pytest.raises(RuntimeError):
+            with ssm.transaction():
+                ssm.import_stores(
+                    [Store("api", {"token": "def"}), Store("db", {"password": "ghi"})]
+                )
+                raise RuntimeError()
+        # The backend and the sqlite tables are rolled back together
+        assert ssm.list_stores_name() == ["api"]
+        assert ssm.get_store("api").data == {"token": "abc"}
+        assert ssm.get_store("db") is None
+        assert [v.version for v in ssm.history_manager.find_versions("api")] == [1]
@@ -0,0 +1,53 @@
+import io
+import sqlite3
+
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+from secretstore.utils import Singleton
+
+from conftest import FakeAgent
+
+
+def manager(path) -> SecretStoreManager:
+    Singleton._instances.clear()
+    return SecretStoreManager(
+        sqlite3.connect(str(path)), FakeAgent("alice"), keep_unlocked=True
+    )
+
+
+def test_restore_keeps_the_index(tmp_path):
+    ssm = manager(tmp_path / "a.db")
+    ssm.identity_manager.create_identities()
+    ssm.new_store(Store("api", {"token": "abc"}))
+    ssm.reindex()
+    archive = io.BytesIO()
+    ssm.backup(archive)
+
+    ssm = manager(tmp_path / "b.db")
+    ssm.restore(io.BytesIO(archive.getvalue()))
+    assert ssm.find_stores_names("token") == ["api"]
+
+
+def test_sync_carries_the_index(tmp_path):
+    ssm = manager(tmp_path / "a.db")
+    ssm.identity_manager.create_identities()
+    ssm.reindex()
+    ssm.new_store(Store("api", {"token": "abc"}))
+    changes = io.BytesIO()
+    ssm.export_changes(changes)
+
+    ssm = manager(tmp_path / "b.db")
+    ssm.apply_changes(io.BytesIO(changes.getvalue()))
+    assert ssm.find_stores_names("token") == ["api"]
+
+
+def test_backup_and_restore_in_a_transaction(tmp_path):
+    ssm = manager(tmp_path / "a.db")
+    ssm.identity_manager.create_identities()
+    archive = io.BytesIO()
+    with ssm.transaction():
+        ssm.new_store(Store("api", {"token": "abc"}))
+        ssm.backup(archive)
+        ssm.new_store(Store("db", {"password": "def"}))
+        ssm.restore(io.BytesIO(archive.getvalue()))
+    assert ssm.list_stores_name() == ["api"]
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from secretstore.bin.batch import handle
+from secretstore.ssm import SecretStoreManager
+
+from conftest import FakeAgent
+
+
+@pytest.fixture
+def ssm(connection):
+    ssm = SecretStoreManager(connection, FakeAgent("alice"), keep_unlocked=True)
+    ssm.identity_manager.create_identities()
+    return ssm
+
+
+def request(ssm: SecretStoreManager, **members) -> dict:
+    return handle(ssm, json.dumps(members))
+
+
+def test_set(ssm):
+    assert request(ssm, op="set", store="api", data={"token": "abc"}) == {
+        "ok": True,
+        "created": True,
+    }
+    response = request(
+        ssm, op="set", store="api", data={"user": "def"}, ttl={"token": 60}
+    )
+    assert response == {"ok": True, "created": False}
+    response = request(ssm, op="get", store="api")
+    assert response["data"] == {"token": "abc", "user": "def"}
+    assert 0 < response["ttl"]["token"] <= 60
+
+    assert request(ssm, op="set", store="api", data={}, ttl={"token": None})["ok"]
+    assert request(ssm, op="get", store="api")["ttl"] == {}
+
+
+@pytest.mark.parametrize(
+    "data", [{"token": 1}, {"token": None}, {"token": ["a"]}, {"token": {"a": "b"}}]
+)
+def test_set_invalid_data(ssm, data):
+    response = request(ssm, op="set", store="api", data=data)
+    assert response == {
+        "ok": False,
+        "error": "Invalid request: 'data' must be a json object of strings",
+    }
+    assert request(ssm, op="list") == {"ok": True, "stores": []}
+
+
+@pytest.mark.parametrize("ttl", [{"token": True}, {"token": 0}, {"token": -5}, [60]])
+def test_set_invalid_ttl(ssm, ttl):
+    response = request(ssm, op="set", store="api", data={"token": "abc"}, ttl=ttl)
+    assert response["ok"] is False
+    assert response["error"].startswith("Invalid request: 'ttl' must be")
+    assert request(ssm, op="list") == {"ok": True, "stores": []}
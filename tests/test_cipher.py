@@ -0,0 +1,70 @@
+import json
+import zlib
+
+import pytest
+from Crypto.Cipher import ChaCha20
+
+from secretstore.buffer import SecretBuffer
+from secretstore.exceptions import CorruptedStore
+from secretstore.store.cipher import (
+    _HEADER,
+    FLAG_ZLIB,
+    decrypt_store,
+    decrypt_store_buffer,
+    encrypt_store,
+)
+from secretstore.store.entity import EncryptedStore, Store
+
+KEY = bytes(range(32))
+STORE = Store("certs", {"chain": "-----BEGIN CERTIFICATE-----\n" * 200})
+
+
+def forge(plaintext: bytes) -> EncryptedStore:
+    """Encrypt a plaintext as is, like a tampered ciphertext would decrypt"""
+    nonce = bytes(8)
+    return EncryptedStore(
+        "certs", ChaCha20.new(key=KEY, nonce=nonce).encrypt(plaintext), nonce
+    )
+
+
+def test_not_compressed_per_default():
+    enc_store = encrypt_store(STORE, KEY)
+    assert len(enc_store.ciphertext) == len(json.dumps(STORE.data).encode())
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip(compress):
+    enc_store = encrypt_store(STORE, KEY, compress)
+    assert decrypt_store(enc_store, KEY) == STORE
+    with decrypt_store_buffer(enc_store, SecretBuffer(KEY)) as plaintext:
+        assert json.loads(bytes(plaintext.view())) == STORE.data
+
+
+def test_compressed():
+    enc_store = encrypt_store(STORE, KEY, compress=True)
+    assert len(enc_store.ciphertext) < len(json.dumps(STORE.data)) / 10
+
+
+@pytest.mark.parametrize(
+    "size, data",
+    [
+        # Longer than announced
+        (10, b'{"a": "' + b"b" * 100 + b'"}'),
+        # Shorter than announced
+        (200, b'{"a": "b"}'),
+        # More than zlib can announce
+        (1 << 30, b'{"a": "b"}'),
+    ],
+)
+def test_corrupted_size(size, data):
+    enc_store = forge(_HEADER.pack(FLAG_ZLIB, size) + zlib.compress(data))
+    with pytest.raises(CorruptedStore):
+        decrypt_store(enc_store, KEY)
+    with pytest.raises(CorruptedStore):
+        decrypt_store_buffer(enc_store, SecretBuffer(KEY))
+
+
+def test_corrupted_data():
+    enc_store = forge(_HEADER.pack(FLAG_ZLIB, 10) + b"not zlib data")
+    with pytest.raises(CorruptedStore):
+        decrypt_store_buffer(enc_store, SecretBuffer(KEY))
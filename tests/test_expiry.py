@@ -0,0 +1,61 @@
+import argparse
+import time
+
+import pytest
+
+from secretstore.bin.utils import positive_int
+from secretstore.snapshot import Snapshot
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+
+from conftest import FakeAgent
+
+
+@pytest.fixture
+def ssm(connection):
+    ssm = SecretStoreManager(connection, FakeAgent("alice"), keep_unlocked=True)
+    ssm.identity_manager.create_identities()
+    now = int(time.time())
+    ssm.new_store(
+        Store(
+            "aws",
+            {"key_id": "abc", "session": "def", "token": "ghi"},
+            {"session": now - 10, "token": now + 3600},
+        )
+    )
+    return ssm
+
+
+def test_get_store(ssm):
+    store = ssm.get_store("aws")
+    assert store.data == {"key_id": "abc", "token": "ghi"}
+    assert 3590 < store.ttl("token") <= 3600
+    assert store.ttl("key_id") is None
+
+
+def test_snapshot(ssm, tmp_path):
+    path = str(tmp_path / "aws.snap")
+    ssm.build_snapshot(path)
+    with Snapshot(path) as snapshot:
+        store = snapshot.get_store("aws", FakeAgent("alice"))
+    assert store.data == {"key_id": "abc", "token": "ghi"}
+    assert 3590 < store.ttl("token") <= 3600
+
+
+def test_version(ssm):
+    assert ssm.expire_fields() == {"aws": ["session"]}
+    ssm.update_store(Store("aws", {"key_id": "jkl"}))
+
+    # The expired field was removed from the store, its value must not come back from the history
+    store = ssm.get_store_version("aws", 1)
+    assert store.data == {"key_id": "abc", "token": "ghi"}
+    assert 3590 < store.ttl("token") <= 3600
+    assert ssm.get_store_version("aws", 2).data == {"key_id": "abc", "token": "ghi"}
+    assert ssm.get_store_version("aws", 3).data == {"key_id": "jkl"}
+
+
+@pytest.mark.parametrize("value", ["0", "-5", "x"])
+def test_positive_int(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        positive_int(value)
+    assert positive_int("60") == 60
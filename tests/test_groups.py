@@ -0,0 +1,43 @@
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+
+from conftest import FakeAgent
+
+
+def test_members(connection):
+    alice = SecretStoreManager(connection, FakeAgent("alice"), keep_unlocked=True)
+    bob = SecretStoreManager(connection, FakeAgent("bob"), keep_unlocked=True)
+    alice.identity_manager.create_identities()
+    bob.identity_manager.create_identities()
+    fingerprint = FakeAgent("bob")._keys[0].fingerprint
+    identity = alice.identity_manager.get_identity(fingerprint)
+
+    alice.new_store(Store("api", {"token": "abc"}))
+    alice.create_group("ops")
+    alice.share_store_with_group(alice.get_encrypted_store("api"), "ops")
+
+    assert alice.add_group_member("ops", identity)
+    assert not alice.add_group_member("ops", identity)
+    assert bob.get_store("api").data == {"token": "abc"}
+
+    assert alice.remove_group_member("ops", fingerprint)
+    assert not alice.remove_group_member("ops", fingerprint)
+    assert alice.list_groups() == {"ops": [FakeAgent("alice")._keys[0].fingerprint]}
+    assert bob.list_stores_name() == []
+
+
+def test_remove_with_a_deleted_identity(connection):
+    alice = SecretStoreManager(connection, FakeAgent("alice"), keep_unlocked=True)
+    alice.identity_manager.create_identities()
+    for name in ("bob", "carol"):
+        other = SecretStoreManager(connection, FakeAgent(name), keep_unlocked=True)
+        other.identity_manager.create_identities()
+    bob, carol = (FakeAgent(name)._keys[0].fingerprint for name in ("bob", "carol"))
+
+    alice.create_group("ops")
+    alice.add_group_member("ops", alice.identity_manager.get_identity(bob))
+    alice.add_group_member("ops", alice.identity_manager.get_identity(carol))
+    connection.execute("delete from identities where fingerprint=?", [carol])
+
+    assert alice.remove_group_member("ops", bob)
+    assert alice.list_groups() == {"ops": [FakeAgent("alice")._keys[0].fingerprint]}
@@ -0,0 +1,70 @@
+import os
+
+from secretstore.history import HistoryManager
+from secretstore.store import Store
+
+KEY = os.urandom(32)
+
+
+def record_versions(history: HistoryManager, name: str, count: int) -> list[dict]:
+    """Record count versions of a store, each changing a field. Return the data of each version"""
+    data = {"user": "admin", "password": "0"}
+    versions = [dict(data)]
+    history.record(Store(name, dict(data)), KEY)
+    for i in range(1, count):
+        previous = dict(data)
+        data["password"] = str(i)
+        if i % 7 == 0:
+            data.pop("user", None)
+        elif i % 7 == 3:
+            data["user"] = f"admin-{i}"
+        history.record(Store(name, dict(data)), KEY, previous)
+        versions.append(dict(data))
+    return versions
+
+
+def test_get_version_across_checkpoints(connection):
+    history = HistoryManager(connection)
+    versions = record_versions(history, "api", 25)
+
+    saved = history.find_versions("api")
+    assert [v.version for v in saved] == list(range(1, 26))
+    # A checkpoint every CHECKPOINT_INTERVAL versions, deltas in between
+    assert [v.version for v in saved if v.checkpoint] == [1, 11, 21]
+
+    for number, data in enumerate(versions, 1):
+        assert history.get_version("api", number, KEY).data == data
+    assert history.get_version("api", 26, KEY) is None
+    assert history.get_version("db", 1, KEY) is None
+
+
+def test_get_version_with_expiry(connection):
+    history = HistoryManager(connection)
+    history.record(Store("api", {"token": "abc"}, {"token": 100}), KEY)
+    history.record(
+        Store("api", {"token": "def"}), KEY, {"token": "abc"}, {"token": 100}
+    )
+
+    first = history.get_version("api", 1, KEY)
+    assert (first.data, first.expires_at) == ({"token": "abc"}, {"token": 100})
+    second = history.get_version("api", 2, KEY)
+    assert (second.data, second.expires_at) == ({"token": "def"}, {})
+
+
+def test_prune_keeps_the_checkpoint_of_the_oldest_version(connection):
+    history = HistoryManager(connection)
+    versions = record_versions(history, "api", 25)
+    record_versions(history, "db", 3)
+
+    # Version 14 is rebuilt from the checkpoint 11, the versions before it can go
+    assert history.prune(12) == 10
+    assert [v.version for v in history.find_versions("api")] == list(range(11, 26))
+    assert [v.version for v in history.find_versions("db")] == [1, 2, 3]
+    for number in range(11, 26):
+        assert history.get_version("api", number, KEY).data == versions[number - 1]
+
+    assert history.prune(5) == 10
+    assert [v.version for v in history.find_versions("api")] == list(range(21, 26))
+    # The oldest kept version is the checkpoint, nothing more to delete
+    assert history.prune(3) == 0
+    assert [v.version for v in history.find_versions("db")] == [1, 2, 3]
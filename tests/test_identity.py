@@ -0,0 +1,46 @@
+import threading
+import time
+
+from secretstore.identity import manager
+from secretstore.identity.manager import IdentityManager
+
+from conftest import FakeAgent
+
+NAMES = ("alice", "bob", "carol", "dave")
+
+
+def test_unlock_several(connection):
+    agent = FakeAgent(*NAMES)
+    identity_manager = IdentityManager(connection, agent)
+    identity_manager.create_identities()
+
+    unlocked = list(identity_manager.get_privates_identities())
+    assert sorted(i.fingerprint for i in unlocked) == sorted(
+        key.fingerprint for key in agent.get_keys()
+    )
+
+
+def test_early_close_cancels_the_pending_unlocks(connection, monkeypatch):
+    agent = FakeAgent(*NAMES)
+    identity_manager = IdentityManager(connection, agent)
+    identity_manager.create_identities()
+
+    started = []
+    lock = threading.Lock()
+
+    def unlock(raw_identity, agent_key, signature=None):
+        with lock:
+            started.append(raw_identity.fingerprint)
+        time.sleep(0.05)
+        return raw_identity
+
+    monkeypatch.setattr(manager, "create_private_key_from_raw", unlock)
+    # A single worker, so the unlocks run one after the other
+    monkeypatch.setattr(manager.os, "cpu_count", lambda: 1)
+
+    identities = identity_manager.get_privates_identities()
+    next(identities)
+    identities.close()
+    time.sleep(0.2)
+    # The first one, and the one the worker took while the first was yielded
+    assert len(started) <= 2
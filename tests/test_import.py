@@ -0,0 +1,51 @@
+import io
+
+import pytest
+
+from secretstore.bin.store import _read_import
+from secretstore.exceptions import InvalidImport
+
+
+def test_csv():
+    source = io.StringIO("store,field,value\napi,token,abc\n\napi,user,def\n")
+    assert _read_import(source, "csv", None) == {"api": {"token": "abc", "user": "def"}}
+
+
+def test_csv_columns():
+    source = io.StringIO("store,field,value\napi,token,abc\napi,user\n")
+    with pytest.raises(InvalidImport, match="line 3 has 2 columns"):
+        _read_import(source, "csv", None)
+
+
+def test_json():
+    source = io.StringIO('{"api": {"token": "abc", "port": 443, "tls": true}}')
+    assert _read_import(source, "json", None) == {
+        "api": {"token": "abc", "port": "443", "tls": "true"}
+    }
+
+
+@pytest.mark.parametrize("value", ["null", "[1]", '{"a": "b"}'])
+def test_json_not_scalar(value):
+    source = io.StringIO(f'{{"api": {{"token": {value}}}}}')
+    with pytest.raises(InvalidImport, match="api.token must be"):
+        _read_import(source, "json", None)
+
+
+@pytest.mark.parametrize("content", ["[]", '{"api": "abc"}', "{"])
+def test_json_structure(content):
+    with pytest.raises(InvalidImport):
+        _read_import(io.StringIO(content), "json", None)
+
+
+def test_env():
+    source = io.StringIO('# api\nexport TOKEN="abc"\n\nUSER = def\nEMPTY=\n')
+    assert _read_import(source, "env", "api") == {
+        "api": {"TOKEN": "abc", "USER": "def", "EMPTY": ""}
+    }
+
+
+@pytest.mark.parametrize("line", ["TOKEN", "=abc", " = abc", "export =abc"])
+def test_env_invalid_line(line):
+    source = io.StringIO(f"USER=def\n\n{line}\n")
+    with pytest.raises(InvalidImport, match="line 3 is not KEY=VALUE"):
+        _read_import(source, "env", "api")
@@ -0,0 +1,26 @@
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+
+from conftest import FakeAgent
+
+
+def test_update_keeps_the_tokens_of_other_keys(connection):
+    alice = SecretStoreManager(connection, FakeAgent("alice"), keep_unlocked=True)
+    bob = SecretStoreManager(connection, FakeAgent("bob"), keep_unlocked=True)
+    alice.identity_manager.create_identities()
+    bob.identity_manager.create_identities()
+
+    alice.new_store(Store("api", {"token": "abc"}))
+    alice.reindex()
+    alice.share_store(
+        alice.get_encrypted_store("api"),
+        alice.identity_manager.get_identity(FakeAgent("bob")._keys[0].fingerprint),
+    )
+
+    # bob has no index key, his update can't replace alice's tokens
+    bob.update_store(Store("api", {"token": "def"}))
+    assert alice.find_stores_names("token") == ["api"]
+
+    alice.update_store(Store("api", {"password": "ghi"}))
+    assert alice.find_stores_names("token") == []
+    assert alice.find_stores_names("password") == ["api"]
@@ -0,0 +1,106 @@
+import json
+import os
+
+import pytest
+
+from secretstore.buffer import SecretBuffer
+from secretstore.exceptions import CorruptedStore
+from secretstore.store import Store
+from secretstore.store.cipher import decrypt_store_buffer, encrypt_store
+from secretstore.store.secret import SecretStore
+
+DATA = {
+    "plain": "admin",
+    "empty": "",
+    "quotes": 'say "hi" \\o/',
+    "controls": "a\nb\tc\rd\be\ff\x01",
+    "accents": "pässwörd €",
+    "astral": "🔑 𝄞 key",
+    'ünïcode field "name"': "value",
+}
+
+
+def parse(text: str) -> SecretStore:
+    return SecretStore("api", SecretBuffer(text.encode()))
+
+
+def values(store: SecretStore) -> dict[str, str]:
+    return {field: str(value, "utf-8") for field, value in store.items()}
+
+
+def test_round_trip():
+    key = os.urandom(32)
+    with SecretBuffer(key) as buffer:
+        plaintext = decrypt_store_buffer(encrypt_store(Store("api", DATA), key), buffer)
+    with SecretStore("api", plaintext) as store:
+        assert values(store) == DATA
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "{}",
+        " {\n} ",
+        '{ "a" : "b" ,\t"c":"d" }',
+        '{"a":"\\/\\"\\\\\\b\\f\\n\\r\\t"}',
+        '{"a":"\\u00e9\\u20AC\\ud83d\\udd11"}',
+        '{"\\u00e9":"raw é"}',
+        json.dumps(DATA),
+        json.dumps(DATA, ensure_ascii=False),
+    ],
+)
+def test_parse_like_json(text):
+    with parse(text) as store:
+        assert values(store) == json.loads(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "[]",
+        '{"a":1}',
+        '{"a" "b"}',
+        '{"a":"b",}',
+        '{"a":"b"',
+        '{"a":"b',
+        '{"a":"\\x"}',
+        '{"a":"\\u12"}',
+        '{"a":"\\u12g4"}',
+        '{"a":"\\ud83d"}',
+        '{"a":"\\ud83d\\u0041"}',
+        '{"a":"\\udd11"}',
+        '{"\\x":"b"}',
+        b'{"\xff":"b"}',
+    ],
+)
+def test_invalid(text):
+    raw = text.encode() if isinstance(text, str) else text
+    plaintext = SecretBuffer(raw)
+    with pytest.raises(CorruptedStore):
+        SecretStore("api", plaintext)
+    # Nothing decrypted is left behind
+    assert bytes(plaintext.view()) == bytes(len(raw))
+
+
+def test_wipe():
+    buffer = SecretBuffer(b"secret")
+    view = buffer.view(1, 4)
+    assert bytes(view) == b"ecr"
+    buffer.wipe()
+    assert bytes(buffer.view()) == bytes(6)
+    # Views handed out before can't read the buffer anymore
+    with pytest.raises(ValueError):
+        bytes(view)
+
+
+def test_close_wipes_the_unescaped_values():
+    plaintext = SecretBuffer(b'{"a":"plain","b":"esc\\"aped"}')
+    store = SecretStore("api", plaintext)
+    buffers = list(store._buffers)
+    assert values(store) == {"a": "plain", "b": 'esc"aped'}
+    store.close()
+    assert len(buffers) == 2
+    for buffer in buffers:
+        assert bytes(buffer.view()) == bytes(len(buffer))
+    assert store.fields() == []
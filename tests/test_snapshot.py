@@ -0,0 +1,35 @@
+from secretstore.snapshot import Snapshot
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+
+from conftest import FakeAgent
+
+
+def test_group_stores(connection, tmp_path):
+    alice = SecretStoreManager(connection, FakeAgent("alice"), keep_unlocked=True)
+    bob = SecretStoreManager(connection, FakeAgent("bob"), keep_unlocked=True)
+    alice.identity_manager.create_identities()
+    bob.identity_manager.create_identities()
+
+    alice.new_store(Store("api", {"token": "abc"}))
+    alice.create_group("ops")
+    alice.add_group_member(
+        "ops",
+        alice.identity_manager.get_identity(FakeAgent("bob")._keys[0].fingerprint),
+    )
+    alice.share_store_with_group(alice.get_encrypted_store("api"), "ops")
+    bob.new_store(Store("db", {"password": "def"}))
+
+    path = str(tmp_path / "bob.snap")
+    # api is only reachable through the group
+    assert bob.build_snapshot(path) == 2
+    with Snapshot(path) as snapshot:
+        assert snapshot.get_store("api", FakeAgent("bob")).data == {"token": "abc"}
+        assert snapshot.get_store("db", FakeAgent("bob")).data == {"password": "def"}
+        assert snapshot.get_store("missing", FakeAgent("bob")) is None
+
+    path = str(tmp_path / "alice.snap")
+    assert alice.build_snapshot(path) == 1
+    with Snapshot(path) as snapshot:
+        assert snapshot.get_store("api", FakeAgent("alice")).data == {"token": "abc"}
+        assert snapshot.get_store("db", FakeAgent("alice")) is None
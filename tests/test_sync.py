@@ -0,0 +1,49 @@
+import io
+import sqlite3
+
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+from secretstore.utils import Singleton
+
+from conftest import FakeAgent
+
+
+class Node:
+    """A database synced with the others, opened for each operation since the DAOs are singletons"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.exported = 0
+
+    def manager(self) -> SecretStoreManager:
+        Singleton._instances.clear()
+        return SecretStoreManager(
+            sqlite3.connect(self.path), FakeAgent("alice"), keep_unlocked=True
+        )
+
+    def send(self, other: "Node"):
+        output = io.BytesIO()
+        self.exported = self.manager().export_changes(output, self.exported)
+        other.manager().apply_changes(io.BytesIO(output.getvalue()))
+
+
+def test_chained_sync(tmp_path):
+    a, b, c = (Node(tmp_path / f"{name}.db") for name in "abc")
+    ssm = a.manager()
+    ssm.identity_manager.create_identities()
+    ssm.new_store(Store("api", {"token": "abc"}))
+    ssm.new_store(Store("db", {"password": "def"}))
+
+    a.send(b)
+    b.send(c)
+    assert c.manager().get_store("api").data == {"token": "abc"}
+
+    ssm = a.manager()
+    ssm.update_store(Store("api", {"token": "ghi"}))
+    ssm.delete_store(Store("db", {}))
+    a.send(b)
+    b.send(c)
+
+    ssm = c.manager()
+    assert ssm.get_store("api").data == {"token": "ghi"}
+    assert ssm.list_stores_name() == ["api"]
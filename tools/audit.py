@@ -0,0 +1,93 @@
+"""
+Audit benchmark: time reads of a store with and without the audit log, and count their commits.
+
+The identities and the store key are kept unlocked, so a read is a select and a decryption,
+and the measure shows what recording the access adds to it.
+
+    python tools/audit.py --reads 1000 --repeat 5
+"""
+
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from commits import CountingConnection
+from fakeagent import FakeAgent
+
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+from secretstore.utils import Singleton
+
+
+def measure(args: argparse.Namespace, path: str, audit: bool) -> tuple[float, int]:
+    """Read the store args.reads times, return the microseconds per read and the commits, close included"""
+    Singleton._instances.clear()
+    connection = sqlite3.connect(path, factory=CountingConnection)
+    connection.execute(f"pragma journal_mode={args.journal_mode}")
+    connection.execute(f"pragma synchronous={args.synchronous}")
+    ssm = SecretStoreManager(connection, FakeAgent("reader"), keep_unlocked=True)
+    if not audit:
+        ssm._audit = lambda action, store_name: None
+    # Unlock and cache the store key before the clock starts
+    ssm.get_store("store")
+    ssm.audit_manager.flush()
+
+    connection.commits = 0
+    began = time.perf_counter()
+    for _ in range(args.reads):
+        ssm.get_store("store")
+    ssm.close()
+    elapsed = time.perf_counter() - began
+    commits = connection.commits
+    connection.close()
+    return elapsed * 1e6 / args.reads, commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--reads", type=int, default=1000, help="Reads per run")
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs of each measure, the median is kept"
+    )
+    parser.add_argument(
+        "--journal-mode",
+        default="delete",
+        choices=["delete", "truncate", "persist", "wal"],
+        help="The sqlite journal mode",
+    )
+    parser.add_argument(
+        "--synchronous",
+        default="full",
+        choices=["off", "normal", "full", "extra"],
+        help="The sqlite synchronous setting",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "audit.db")
+        Singleton._instances.clear()
+        connection = sqlite3.connect(path)
+        ssm = SecretStoreManager(connection, FakeAgent("reader"), keep_unlocked=True)
+        ssm.identity_manager.create_identities()
+        ssm.new_store(Store("store", {"user": "admin", "password": "secret"}))
+        ssm.close()
+        connection.close()
+
+        print(
+            f"{args.reads} reads, median of {args.repeat} runs, "
+            f"journal_mode={args.journal_mode}, synchronous={args.synchronous}"
+        )
+        print(f"{'audit':8}{'µs/read':>10}{'commits':>9}")
+        for audit in (False, True):
+            runs = [measure(args, path, audit) for _ in range(args.repeat)]
+            print(
+                f"{'on' if audit else 'off':8}"
+                f"{statistics.median(us for us, _ in runs):10.1f}{runs[-1][1]:9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
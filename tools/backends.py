@@ -0,0 +1,146 @@
+"""
+Backend benchmark: run the same workloads against the sqlite, memory and key-value backends.
+
+The DAOs are called directly with random ciphertexts, so the measures show the storage and not the encryption.
+
+    python tools/backends.py --stores 2000 --identities 10 --lookups 20000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from secretstore.backend import Backend, KVBackend, MemoryBackend, SQLiteBackend
+from secretstore.guardian.entity import Guardian
+from secretstore.store import EncryptedStore
+from secretstore.utils import Singleton, transaction
+
+BACKENDS = ("sqlite", "memory", "kv")
+
+
+def open_backend(name: str, directory: Path) -> Backend:
+    if name == "sqlite":
+        # DAOs are singletons, each sqlite backend needs its own
+        Singleton._instances.clear()
+        return SQLiteBackend(sqlite3.connect(str(directory / "bench.db")))
+    if name == "memory":
+        return MemoryBackend()
+    return KVBackend(str(directory / "bench.kv"))
+
+
+def unit_of_work(backend: Backend):
+    """The bulk writes don't commit on the backends with transactions, the caller does"""
+    if isinstance(backend, SQLiteBackend):
+        return transaction(backend.connection)
+    return nullcontext()
+
+
+def workloads(args: argparse.Namespace, backend: Backend):
+    """Yield (workload, operations count, function) in order, each one depends on the previous ones"""
+    rng = random.Random(0)
+    names = [f"store-{i}" for i in range(args.stores)]
+    fingerprints = [f"SHA256:identity-{i}" for i in range(args.identities)]
+    store_dao, guardian_dao = backend.store_dao, backend.guardian_dao
+
+    def save():
+        with unit_of_work(backend):
+            store_dao.save_many(
+                [
+                    EncryptedStore(name, os.urandom(256), os.urandom(12))
+                    for name in names
+                ]
+            )
+            guardian_dao.save_many(
+                [
+                    Guardian(name, fingerprint, os.urandom(65), os.urandom(48))
+                    for name in names
+                    for fingerprint in fingerprints
+                ]
+            )
+
+    def find():
+        for _ in range(args.lookups):
+            name = rng.choice(names)
+            store_dao.find(name)
+            guardian_dao.find(name, rng.choice(fingerprints))
+
+    def list_stores():
+        for fingerprint in fingerprints:
+            guardian_dao.find_stores_names([fingerprint])
+
+    def nonces():
+        for _ in range(args.lookups // 100):
+            store_dao.find_nonces()
+
+    def update():
+        for name in rng.sample(names, min(args.updates, len(names))):
+            with unit_of_work(backend):
+                store_dao.update(EncryptedStore(name, os.urandom(256), os.urandom(12)))
+
+    def delete():
+        for name in names[: args.updates]:
+            with unit_of_work(backend):
+                guardian_dao.delete_store_guardians(name)
+
+    yield "save stores+guardians", args.stores * (1 + args.identities), save
+    yield "find store+guardian", args.lookups, find
+    yield "list stores/identity", args.identities, list_stores
+    yield "all nonces", args.lookups // 100, nonces
+    yield "update store", min(args.updates, args.stores), update
+    yield "delete guardians", min(args.updates, args.stores), delete
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--stores", type=int, default=2000, help="Number of stores")
+    parser.add_argument(
+        "--identities", type=int, default=10, help="Guardians per store"
+    )
+    parser.add_argument(
+        "--lookups", type=int, default=20000, help="Random lookups by name"
+    )
+    parser.add_argument(
+        "--updates", type=int, default=500, help="Stores updated then deleted"
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        choices=BACKENDS,
+        help="The backends to compare, all per default",
+    )
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    counts: dict[str, int] = {}
+    for name in args.backend or BACKENDS:
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = open_backend(name, Path(tmp))
+            for workload, count, f in workloads(args, backend):
+                began = time.perf_counter()
+                f()
+                results.setdefault(workload, {})[name] = time.perf_counter() - began
+                counts[workload] = count
+            backend.close()
+            if isinstance(backend, SQLiteBackend):
+                backend.connection.close()
+
+    names = args.backend or BACKENDS
+    print(
+        f"{args.stores} stores, {args.identities} identities, {args.lookups} lookups, µs per operation"
+    )
+    print(f"{'workload':24}{'ops':>8}" + "".join(f"{name:>10}" for name in names))
+    for workload, timings in results.items():
+        count = max(counts[workload], 1)
+        print(
+            f"{workload:24}{count:8}"
+            + "".join(f"{timings[name] * 1e6 / count:10.1f}" for name in names)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Commit benchmark: count the commits of each SecretStoreManager operation and time it on a file database.
+
+Each commit of a rollback journal database costs several fsyncs with synchronous=full,
+so the commit count is what an operation pays on the disk, the time shows it.
+Each operation runs twice: in its unit of work, and with the per DAO commits it had before,
+when no transaction was opened around an operation and each DAO committed its own writes.
+
+    python tools/commits.py --identities 3 --repeat 50
+"""
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from unittest.mock import patch
+
+from fakeagent import FakeAgent
+
+from secretstore.identity import manager as identity_manager
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+from secretstore.utils import Singleton
+
+
+class CountingConnection(sqlite3.Connection):
+    """Connection counting the commits, the explicit and the implicit ones"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commits = 0
+        self.set_trace_callback(self._trace)
+
+    def _trace(self, statement: str):
+        if statement.lstrip()[:6].upper() in ("COMMIT", "END"):
+            self.commits += 1
+
+
+def measure(connection: CountingConnection, f, repeat: int) -> tuple[float, float]:
+    """Run f repeat times, return the commits and the milliseconds per run"""
+    connection.commits = 0
+    began = time.perf_counter()
+    for i in range(repeat):
+        f(i)
+    elapsed = time.perf_counter() - began
+    return connection.commits / repeat, elapsed * 1000 / repeat
+
+
+def run(args: argparse.Namespace, path: str) -> list[tuple[str, int, float, float]]:
+    """Run each operation on a new database, return its name, its runs, its commits and its ms per run"""
+    connection = sqlite3.connect(path, factory=CountingConnection)
+    connection.execute(f"pragma journal_mode={args.journal_mode}")
+    connection.execute(f"pragma synchronous={args.synchronous}")
+    Singleton._instances.clear()
+    agent = FakeAgent(*(f"identity-{i}" for i in range(args.identities)))
+    ssm = SecretStoreManager(connection, agent, keep_unlocked=True)
+
+    repeat = args.repeat
+    operations = [
+        ("create_identities", lambda i: ssm.identity_manager.create_identities(), 1),
+        ("new_store", lambda i: ssm.new_store(Store(f"s{i}", {"k": "v"})), repeat),
+        (
+            "update_store",
+            lambda i: ssm.update_store(Store(f"s{i}", {"k": "w"})),
+            repeat,
+        ),
+        ("reindex", lambda i: ssm.reindex(), 1),
+        ("delete_store", lambda i: ssm.delete_store(Store(f"s{i}", {})), repeat),
+    ]
+    results = [
+        (name, runs, *measure(connection, f, runs)) for name, f, runs in operations
+    ]
+    ssm.close()
+    connection.close()
+    return results
+
+
+def run_per_dao(
+    args: argparse.Namespace, path: str
+) -> list[tuple[str, int, float, float]]:
+    """Run the operations without their unit of work, each DAO opens and commits its own transaction"""
+    with (
+        patch.object(
+            SecretStoreManager,
+            "transaction",
+            lambda self: nullcontext(self._connection),
+        ),
+        patch.object(identity_manager, "transaction", nullcontext),
+    ):
+        return run(args, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--identities", type=int, default=3, help="Identities sharing each store"
+    )
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per operation")
+    parser.add_argument(
+        "--journal-mode",
+        default="delete",
+        choices=["delete", "truncate", "persist", "wal"],
+        help="The sqlite journal mode",
+    )
+    parser.add_argument(
+        "--synchronous",
+        default="full",
+        choices=["off", "normal", "full", "extra"],
+        help="The sqlite synchronous setting",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = run_per_dao(args, str(Path(tmp) / "per-dao.db"))
+        after = run(args, str(Path(tmp) / "unit-of-work.db"))
+
+    print(
+        f"{args.identities} identities, journal_mode={args.journal_mode}, synchronous={args.synchronous}"
+    )
+    print(
+        f"{'':26}{'per DAO commits':>18}{'unit of work':>18}\n"
+        f"{'operation':20}{'runs':>6}{'commits':>9}{'ms':>9}{'commits':>9}{'ms':>9}"
+    )
+    for (name, runs, commits_before, ms_before), (_, _, commits, ms) in zip(
+        before, after
+    ):
+        print(
+            f"{name:20}{runs:6}{commits_before:9.1f}{ms_before:9.2f}{commits:9.1f}{ms:9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
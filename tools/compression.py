@@ -0,0 +1,154 @@
+"""
+Compression benchmark: size ratio and CPU cost of the store compression on realistic secrets.
+
+Each payload is generated from a fixed seed, key material is random so it compresses like real keys and certificates.
+The ratio is the ciphertext size with compression over the ciphertext size without it.
+
+    python tools/compression.py --repeat 2000
+
+Columns: enc and dec are encrypt_store and decrypt_store without and with (+z) compression,
+buf is decrypt_store_buffer.
+"""
+
+import argparse
+import base64
+import json
+import random
+import statistics
+import textwrap
+import time
+
+from secretstore.buffer import SecretBuffer
+from secretstore.store.cipher import decrypt_store, decrypt_store_buffer, encrypt_store
+from secretstore.store.entity import Store
+
+
+def pem(rng: random.Random, label: str, size: int) -> str:
+    """A PEM block of size random bytes"""
+    body = "\n".join(textwrap.wrap(base64.b64encode(rng.randbytes(size)).decode(), 64))
+    return f"-----BEGIN {label}-----\n{body}\n-----END {label}-----\n"
+
+
+def pem_chain(rng: random.Random) -> dict[str, str]:
+    """A leaf certificate, two intermediates and a root"""
+    return {"chain.pem": "".join(pem(rng, "CERTIFICATE", 950) for _ in range(4))}
+
+
+def service_account(rng: random.Random) -> dict[str, str]:
+    """A cloud service account key file, stored as one field"""
+    project = "payments-prod-4821"
+    email = f"deployer@{project}.iam.gserviceaccount.com"
+    return {
+        "credentials.json": json.dumps(
+            {
+                "type": "service_account",
+                "project_id": project,
+                "private_key_id": rng.randbytes(20).hex(),
+                "private_key": pem(rng, "PRIVATE KEY", 1190),
+                "client_email": email,
+                "client_id": str(rng.randrange(10**20, 10**21)),
+                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+                "token_uri": "https://oauth2.googleapis.com/token",
+                "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+                "client_x509_cert_url": f"https://www.googleapis.com/robot/v1/metadata/x509/{email}",
+                "universe_domain": "googleapis.com",
+            }
+        )
+    }
+
+
+def kubeconfig(rng: random.Random) -> dict[str, str]:
+    """A kubeconfig with three clusters and their client certificates, as base64 data like kubectl writes them"""
+
+    def data(label: str, size: int) -> str:
+        return base64.b64encode(pem(rng, label, size).encode()).decode()
+
+    lines = ["apiVersion: v1", "kind: Config", "clusters:"]
+    for name in ("prod", "staging", "dev"):
+        lines += [
+            "- cluster:",
+            f"    certificate-authority-data: {data('CERTIFICATE', 700)}",
+            f"    server: https://{name}.k8s.example.com:6443",
+            f"  name: {name}",
+        ]
+    lines.append("contexts:")
+    for name in ("prod", "staging", "dev"):
+        lines += [
+            "- context:",
+            f"    cluster: {name}",
+            f"    user: {name}-admin",
+            f"  name: {name}",
+        ]
+    lines += ["current-context: prod", "preferences: {}", "users:"]
+    for name in ("prod", "staging", "dev"):
+        lines += [
+            f"- name: {name}-admin",
+            "  user:",
+            f"    client-certificate-data: {data('CERTIFICATE', 700)}",
+            f"    client-key-data: {data('EC PRIVATE KEY', 120)}",
+        ]
+    return {"config": "\n".join(lines) + "\n"}
+
+
+def small(rng: random.Random) -> dict[str, str]:
+    """A database login, under the compression threshold"""
+    return {"username": "app", "password": rng.randbytes(24).hex(), "port": "5432"}
+
+
+PAYLOADS = {
+    "pem chain": pem_chain,
+    "service account": service_account,
+    "kubeconfig": kubeconfig,
+    "db login": small,
+}
+
+
+def timed(repeat: int, f) -> float:
+    """Median time of f in ms"""
+    times = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - began)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1000,
+        help="Runs of each measure, the median is kept",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    key = rng.randbytes(32)
+    secret_key = SecretBuffer(key)
+
+    print(f"ms, median of {args.repeat} runs")
+    print(
+        f"{'payload':16}{'kB':>7}{'ratio':>7}{'enc':>8}{'enc+z':>8}{'dec':>8}{'dec+z':>8}{'buf':>8}{'buf+z':>8}"
+    )
+    for name, payload in PAYLOADS.items():
+        store = Store(name, payload(rng))
+        plain = encrypt_store(store, key, compress=False)
+        compressed = encrypt_store(store, key, compress=True)
+        columns = [
+            timed(args.repeat, lambda: encrypt_store(store, key, compress=False)),
+            timed(args.repeat, lambda: encrypt_store(store, key, compress=True)),
+            timed(args.repeat, lambda: decrypt_store(plain, key)),
+            timed(args.repeat, lambda: decrypt_store(compressed, key)),
+            timed(args.repeat, lambda: decrypt_store_buffer(plain, secret_key)),
+            timed(args.repeat, lambda: decrypt_store_buffer(compressed, secret_key)),
+        ]
+        print(
+            f"{name:16}{len(plain.ciphertext) / 1000:7.1f}"
+            f"{len(compressed.ciphertext) / len(plain.ciphertext):7.2f}"
+            + "".join(f"{column:8.3f}" for column in columns)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Fake ssh agent shared by the tools and the tests: signatures are computed in process, without any real key.
+"""
+
+import hashlib
+import hmac
+
+
+class FakeKey:
+    """Ssh agent key with a deterministic signature, computed in process"""
+
+    algorithm_name = "ED25519"
+
+    def __init__(self, name: str):
+        self.fingerprint = f"SHA256:test-{name}"
+        self._secret = name.encode()
+
+    def sign_ssh_data(self, data: bytes) -> bytes:
+        return hmac.new(self._secret, data, hashlib.sha256).digest()
+
+
+class FakeAgent:
+    def __init__(self, *names: str):
+        self._keys = tuple(FakeKey(name) for name in names)
+
+    def get_keys(self) -> tuple[FakeKey, ...]:
+        return self._keys
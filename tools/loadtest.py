@@ -0,0 +1,322 @@
+"""
+Contention load test: reader and writer processes hammer a temporary database through SecretStoreManager.
+
+Each process has its own connection. Identities are unlocked with a fake in-process ssh agent,
+once per process unless --unlock-each-op is set, so the measures show the database contention and not the key derivation.
+
+    python tools/loadtest.py --readers 50 --writers 2 --duration 30 --journal-mode wal
+"""
+
+import argparse
+import multiprocessing
+import queue
+import random
+import re
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fakeagent import FakeAgent, FakeKey
+
+from secretstore.ssm import SecretStoreManager
+from secretstore.store import Store
+
+OPERATIONS = ("read", "new", "update", "share")
+
+# The sleeps of the sqlite default busy handler, in ms. The last one repeats
+_BUSY_DELAYS = (1, 2, 5, 10, 15, 20, 25, 25, 25, 50, 50, 100)
+_BUSY_TIMEOUT = re.compile(r"\s*pragma\s+busy_timeout\s*(?:=\s*(\d+))?\s*;?\s*$", re.I)
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor retrying its statements with the busy handler of its connection"""
+
+    def execute(self, *args):
+        return self.connection._timed(super().execute, *args)
+
+    def executemany(self, *args):
+        return self.connection._timed(super().executemany, *args)
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    Connection measuring apart the time spent waiting for the locks and the time spent in sqlite calls.
+    Python can't set a sqlite busy handler, so sqlite fails at once on a locked database
+    and the calls are retried here with the sleeps of the default busy handler, until the busy timeout.
+    The busy_timeout pragmas set the timeout of this handler, like they set the sqlite one.
+    """
+
+    def __init__(self, *args, busy_timeout: float = 5.0, **kwargs):
+        super().__init__(*args, timeout=0, **kwargs)
+        self.busy_timeout = busy_timeout
+        self.sqlite_time = 0.0
+        self.lock_wait = 0.0
+
+    def _timed(self, f, *args):
+        began = time.perf_counter()
+        waited = 0.0
+        attempt = 0
+        try:
+            while True:
+                try:
+                    return f(*args)
+                except sqlite3.OperationalError as e:
+                    if "locked" not in str(e) or waited >= self.busy_timeout:
+                        raise
+                # Inside an immediate transaction, only the commit waits for the readers to leave,
+                # the failed statement made no change and can run again
+                delay = _BUSY_DELAYS[min(attempt, len(_BUSY_DELAYS) - 1)] / 1000
+                slept = time.perf_counter()
+                time.sleep(min(delay, self.busy_timeout - waited))
+                waited += time.perf_counter() - slept
+                attempt += 1
+        finally:
+            self.lock_wait += waited
+            self.sqlite_time += time.perf_counter() - began - waited
+
+    def execute(self, sql, *args):
+        match = _BUSY_TIMEOUT.match(sql)
+        if match:
+            # The sqlite timeout stays 0, the retries above apply this one
+            if match[1] is not None:
+                self.busy_timeout = int(match[1]) / 1000
+            return super().execute("select ?", (round(self.busy_timeout * 1000),))
+        return self._timed(super().execute, sql, *args)
+
+    def executemany(self, *args):
+        return self._timed(super().executemany, *args)
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def commit(self):
+        return self._timed(super().commit)
+
+
+def connect(args: argparse.Namespace) -> TimedConnection:
+    connection = sqlite3.connect(
+        args.database, busy_timeout=args.busy_timeout, factory=TimedConnection
+    )
+    connection.execute(f"pragma journal_mode={args.journal_mode}")
+    connection.execute(f"pragma synchronous={args.synchronous}")
+    return connection
+
+
+def manager(args: argparse.Namespace, connection: TimedConnection, *keys: str):
+    # DAOs are singletons, a forked process must not reuse the parent connection
+    from secretstore.utils import Singleton
+
+    Singleton._instances.clear()
+    return SecretStoreManager(
+        connection, FakeAgent(*keys), keep_unlocked=not args.unlock_each_op
+    )
+
+
+def setup(args: argparse.Namespace):
+    """Create the identities and the initial stores"""
+    connection = connect(args)
+    ssm = manager(args, connection, "operator", "other")
+    ssm.identity_manager.create_identities()
+    with ssm.transaction():
+        for i in range(args.stores):
+            ssm.new_store(Store(f"store-{i}", {"user": f"user-{i}", "password": "x"}))
+    ssm.close()
+    connection.close()
+
+
+def run(ssm: SecretStoreManager, operation: str, name: str, value: str, other):
+    if operation == "read":
+        ssm.get_store(name)
+    elif operation == "new":
+        ssm.new_store(Store(name, {"value": value}))
+    elif operation == "update":
+        ssm.update_store(Store(name, {"user": name, "password": value}))
+    else:
+        ssm.share_store(Store(name, {}), other)
+
+
+def worker(
+    args: argparse.Namespace,
+    role: str,
+    index: int,
+    start: multiprocessing.Event,
+    results: multiprocessing.Queue,
+):
+    samples = []
+    failure = None
+    try:
+        connection = connect(args)
+        ssm = manager(args, connection, "operator")
+        other = ssm.identity_manager.get_identity(FakeKey("other").fingerprint)
+        rng = random.Random(index)
+        # Unlock before the clock starts
+        if not args.unlock_each_op:
+            ssm.list_stores_name()
+
+        created = []
+        start.wait()
+        deadline = time.perf_counter() + args.duration
+        count = 0
+        while time.perf_counter() < deadline:
+            count += 1
+            operation = "read" if role == "reader" else OPERATIONS[1 + count % 3]
+            if operation == "new":
+                name = f"{role}-{index}-{count}"
+            elif operation == "share":
+                if not created:
+                    continue
+                name = created.pop()
+            else:
+                name = f"store-{rng.randrange(args.stores)}"
+
+            connection.sqlite_time = 0.0
+            connection.lock_wait = 0.0
+            began = time.perf_counter()
+            error = None
+            try:
+                run(ssm, operation, name, str(count), other)
+            except Exception as e:
+                # The unit of work rolled back already, unless the error came from outside of it
+                if connection.in_transaction:
+                    connection.rollback()
+                if isinstance(e, sqlite3.OperationalError) and "locked" in str(e):
+                    error = "locked"
+                else:
+                    error = f"{type(e).__name__}: {e}"
+            if operation == "new" and error is None:
+                created.append(name)
+            samples.append(
+                (
+                    operation,
+                    time.perf_counter() - began,
+                    connection.lock_wait,
+                    connection.sqlite_time,
+                    error,
+                )
+            )
+        ssm.close()
+        connection.close()
+    except Exception as e:
+        failure = f"{role} {index}: {type(e).__name__}: {e}"
+    finally:
+        results.put((role, samples, failure))
+
+
+def percentile(values: list[float], p: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def report(args: argparse.Namespace, samples: list[tuple]):
+    print(
+        f"{args.readers} readers, {args.writers} writers, {args.duration}s, "
+        f"journal_mode={args.journal_mode}, synchronous={args.synchronous}, busy timeout {args.busy_timeout}s"
+    )
+    print(
+        "lock: time waiting for the database locks, sqlite: time in the sqlite calls without the lock waits"
+    )
+    print(
+        f"{'operation':10}{'ops':>8}{'ops/s':>9}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'lock s':>9}{'p99 lock ms':>13}{'sqlite s':>10}{'locked':>8}{'errors':>8}"
+    )
+    for operation in OPERATIONS:
+        rows = [s for s in samples if s[0] == operation]
+        if not rows:
+            continue
+        ok = [latency for _, latency, _, _, error in rows if error is None]
+        waits = [wait for _, _, wait, _, _ in rows]
+        sqlite_times = [sqlite_time for _, _, _, sqlite_time, _ in rows]
+        locked = sum(1 for *_, error in rows if error == "locked")
+        errors = sum(1 for *_, error in rows if error not in (None, "locked"))
+        print(
+            f"{operation:10}{len(ok):8}{len(ok) / args.duration:9.1f}"
+            f"{percentile(ok, 50) * 1000 if ok else 0:9.1f}{percentile(ok, 99) * 1000 if ok else 0:9.1f}"
+            f"{sum(waits):9.2f}{percentile(waits, 99) * 1000:13.1f}{sum(sqlite_times):10.2f}{locked:8}{errors:8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--readers", type=int, default=8, help="Reader processes")
+    parser.add_argument("--writers", type=int, default=1, help="Writer processes")
+    parser.add_argument(
+        "--duration", type=float, default=10, help="Test duration in seconds"
+    )
+    parser.add_argument(
+        "--stores", type=int, default=100, help="Number of stores created first"
+    )
+    parser.add_argument(
+        "--database", help="The database path. A temporary one per default"
+    )
+    parser.add_argument(
+        "--journal-mode",
+        default="delete",
+        choices=["delete", "truncate", "persist", "wal", "memory"],
+        help="The sqlite journal mode",
+    )
+    parser.add_argument(
+        "--synchronous",
+        default="full",
+        choices=["off", "normal", "full", "extra"],
+        help="The sqlite synchronous setting",
+    )
+    parser.add_argument(
+        "--busy-timeout",
+        type=float,
+        default=5.0,
+        help="Seconds to wait for a lock before failing with 'database is locked'",
+    )
+    parser.add_argument(
+        "--unlock-each-op",
+        action="store_true",
+        help="Unlock the identities for each operation, like separate cli invocations",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.database is None:
+            args.database = str(Path(tmp) / "loadtest.db")
+        setup(args)
+
+        start = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=worker, args=(args, role, index, start, results)
+            )
+            for role, count in (("reader", args.readers), ("writer", args.writers))
+            for index in range(count)
+        ]
+        for process in processes:
+            process.start()
+        start.set()
+
+        samples = []
+        failures = []
+        received = 0
+        while received < len(processes):
+            try:
+                _, worker_samples, failure = results.get(timeout=1)
+            except queue.Empty:
+                # A process killed before sending its results never will
+                if any(process.is_alive() for process in processes):
+                    continue
+                failures.append(f"{len(processes) - received} workers died")
+                break
+            received += 1
+            samples.extend(worker_samples)
+            if failure is not None:
+                failures.append(failure)
+        for process in processes:
+            process.join()
+
+    report(args, samples)
+    for failure in failures:
+        print(f"worker failed: {failure}")
+
+
+if __name__ == "__main__":
+    main()
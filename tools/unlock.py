@@ -0,0 +1,78 @@
+"""
+Unlock benchmark: time the unlocking of 1 identity against N identities, concurrent and one after the other.
+
+Each unlock is a 390k rounds PBKDF2 and a key import. The concurrent path runs them in a thread pool sized to the cores,
+so with enough cores N identities take about as long as one.
+
+    python tools/unlock.py --identities 4 --repeat 3
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import time
+
+from fakeagent import FakeAgent
+
+from secretstore.identity.manager import IdentityManager, create_private_key_from_raw
+from secretstore.utils import Singleton
+
+
+def timed(repeat: int, f) -> float:
+    """Median time of f in seconds"""
+    times = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - began)
+    return statistics.median(times)
+
+
+def sequential(manager: IdentityManager, agent: FakeAgent):
+    """The unlock path before the concurrent one: each identity after the other"""
+    keys = {key.fingerprint: key for key in agent.get_keys()}
+    for raw in manager._dao.get_identities_by_fingerprints(list(keys)):
+        create_private_key_from_raw(raw, keys[raw.fingerprint])
+
+
+def first(manager: IdentityManager):
+    """Stop at the first identity unlocked, the others are cancelled"""
+    identities = manager.get_privates_identities()
+    next(identities)
+    identities.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--identities", type=int, default=4, help="Identities unlocked together"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs of each measure, the median is kept"
+    )
+    args = parser.parse_args()
+
+    Singleton._instances.clear()
+    connection = sqlite3.connect(":memory:")
+    names = [f"identity-{i}" for i in range(args.identities)]
+    IdentityManager(connection, FakeAgent(*names)).create_identities()
+
+    one = IdentityManager(connection, FakeAgent(names[0]))
+    agent = FakeAgent(*names)
+    many = IdentityManager(connection, agent)
+
+    print(f"{os.cpu_count()} cores, median of {args.repeat} runs, seconds")
+    print(f"{'unlock':28}{'s':>8}")
+    for label, f in (
+        ("1 identity", lambda: list(one.get_privates_identities())),
+        (f"{args.identities} one after the other", lambda: sequential(many, agent)),
+        (f"{args.identities} concurrent", lambda: list(many.get_privates_identities())),
+        (f"first of {args.identities} concurrent", lambda: first(many)),
+    ):
+        print(f"{label:28}{timed(args.repeat, f):8.3f}")
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()